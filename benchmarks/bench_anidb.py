@@ -0,0 +1,109 @@
+"""
+Benchmark AniDB reply parsing.
+
+Compares the previous string parser, which decoded and split every line up
+front, against ``AniDBResponse.from_bytes`` on MTU-sized MYLIST and
+NOTIFYLIST replies: reading only the return code, as for most commands and
+cache checks, and reading one field of every row.
+
+Run from the repository root with ``python -m benchmarks.bench_anidb``.
+"""
+
+from time import perf_counter
+from typing import Callable
+
+from bokusu.services.anidb.models import AniDBResponse, AniDBResponseCode
+
+ROUNDS = 20_000
+"""Parses per case."""
+
+
+def legacy_from_string(data: str) -> tuple:
+    """
+    The string parser ``from_bytes`` replaced, fixed to keep single-line
+    data rows so both parsers return the same rows.
+
+    :param data: Reply to parse.
+    :type data: str
+    :return: Code, tag and rows.
+    :rtype: tuple
+    """
+    procdat = data.split("\n")
+    header = procdat[0].split(" ")
+    tag = header[0]
+    retcode = int(header[1])
+    rows: list[list[str]] = []
+    if len(procdat) > 1:
+        retdat = "`n".join(procdat[1:])
+        for line in retdat.split("`n"):
+            if "|" in line:
+                rows.append(line.split("|"))
+    return AniDBResponseCode(retcode), tag, rows
+
+
+def make_mylist() -> bytes:
+    """
+    A MYLIST reply with several entries, close to the 1400 bytes MTU.
+
+    :return: Reply.
+    :rtype: bytes
+    """
+    row = "4213|1875|9912|12|1|1372550400|1|1372550400|HDD|Some Storage|Other notes|0"
+    lines = [row.replace("4213", str(4213 + i)) for i in range(18)]
+    return ("b12 312 MULTIPLE MYLIST ENTRIES\n" + "\n".join(lines) + "\n").encode()
+
+
+def make_notifylist() -> bytes:
+    """
+    A NOTIFYLIST reply, many short rows.
+
+    :return: Reply.
+    :rtype: bytes
+    """
+    lines = [f"{'M' if i % 3 else 'N'}|{100000 + i}" for i in range(120)]
+    return ("b13 291 NOTIFYLIST\n" + "\n".join(lines) + "\n").encode()
+
+
+def measure(parse: Callable[[], object]) -> float:
+    """
+    Time parses.
+
+    :param parse: Parses one reply.
+    :type parse: Callable[[], object]
+    :return: Microseconds per parse.
+    :rtype: float
+    """
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        parse()
+    return (perf_counter() - start) / ROUNDS * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(f"{'reply':<11} {'bytes':>6} {'case':<6} {'legacy µs':>10} {'bytes µs':>9} {'speedup':>8}")
+    for name, payload in (("MYLIST", make_mylist()), ("NOTIFYLIST", make_notifylist())):
+        text = payload.decode()
+        legacy_rows = legacy_from_string(text)[2]
+        assert [list(row) for row in AniDBResponse.from_bytes(payload).data] == legacy_rows
+        cases: dict[str, tuple[Callable[[], object], Callable[[], object]]] = {
+            "code": (
+                lambda: legacy_from_string(payload.decode())[0],
+                lambda: AniDBResponse.from_bytes(payload).return_code,
+            ),
+            "rows": (
+                lambda: [row[0] for row in legacy_from_string(payload.decode())[2]],
+                lambda: [row[0] for row in AniDBResponse.from_bytes(payload).data],
+            ),
+        }
+        for case, (legacy, current) in cases.items():
+            before = measure(legacy)
+            after = measure(current)
+            print(
+                f"{name:<11} {len(payload):>6} {case:<6} {before:>10.2f} "
+                f"{after:>9.2f} {before / after:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
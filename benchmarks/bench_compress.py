@@ -0,0 +1,79 @@
+"""
+Benchmark block-parallel compression of large exports.
+
+Compresses a ~32 MB MAL XML dump with ``ParallelCompressor`` for 1 worker up
+to the number of CPUs, against single-threaded ``gzip.compress``, and checks
+that the multi-member output decompresses back to the input.
+
+Run from the repository root with ``python -m benchmarks.bench_compress``.
+"""
+
+from gzip import compress, decompress
+from io import BytesIO
+from os import cpu_count
+from time import perf_counter
+
+from benchmarks.bench_malxml import make_anime
+from bokusu.core.output import ParallelCompressor
+from bokusu.models.malxml import AnimeMyStatus, ExportType, MalXML
+
+SIZE = 40_000
+"""Number of entries of the dump."""
+
+
+class _KeepOpen(BytesIO):
+    """BytesIO whose content survives ``close``."""
+
+    def close(self) -> None:
+        pass
+
+
+def compress_parallel(data: bytes, workers: int) -> bytes:
+    """
+    Compress data with ``ParallelCompressor``.
+
+    :param data: Data to compress.
+    :type data: bytes
+    :param workers: Compression threads.
+    :type workers: int
+    :return: Multi-member gzip.
+    :rtype: bytes
+    """
+    out = _KeepOpen()
+    compressor = ParallelCompressor(out, workers=workers)  # type: ignore[arg-type]
+    view = memoryview(data)
+    for start in range(0, len(data), 1 << 16):
+        compressor.write(view[start : start + (1 << 16)])  # type: ignore[arg-type]
+    compressor.close()
+    return out.getvalue()
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    export = MalXML(
+        user=AnimeMyStatus(user_export_type=ExportType.ANIME, user_total_anime=SIZE),
+        entries=make_anime(SIZE),
+    )
+    data = "".join(export.iter_string()).encode("utf-8")
+    mbytes = len(data) / 2**20
+
+    start = perf_counter()
+    baseline = compress(data, 6)
+    single = perf_counter() - start
+    print(f"input {mbytes:.1f} MiB, gzip.compress {single:.2f}s ({mbytes / single:.1f} MiB/s)")
+    print(f"{'workers':>7} {'seconds':>8} {'MiB/s':>7} {'speedup':>8} {'ratio':>6}")
+    workers = 1
+    while workers <= (cpu_count() or 1):
+        start = perf_counter()
+        output = compress_parallel(data, workers)
+        elapsed = perf_counter() - start
+        assert decompress(output) == data
+        print(
+            f"{workers:>7} {elapsed:>8.2f} {mbytes / elapsed:>7.1f} "
+            f"{single / elapsed:>7.1f}x {len(output) / len(baseline):>6.3f}"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark MAL XML entry serialization.
+
+Compares the ``Tag`` tree path (``as_tag.to_string()``) against the compiled
+template path (``as_string``) for lists of 1k, 10k and 100k entries.
+
+Run from the repository root with ``python -m benchmarks.bench_malxml``.
+"""
+
+from datetime import datetime
+from time import perf_counter
+from typing import Callable
+
+from bokusu.models.malxml import (
+    Anime,
+    AnimeStatus,
+    AnimeType,
+    Manga,
+    MangaStatus,
+    Priority,
+)
+
+SIZES = (1_000, 10_000, 100_000)
+"""List sizes to benchmark."""
+
+
+def make_anime(count: int) -> list[Anime]:
+    """
+    Generate anime entries with a realistic mix of fields.
+
+    :param count: Number of entries.
+    :type count: int
+    :return: Anime entries.
+    :rtype: list[Anime]
+    """
+    return [
+        Anime(
+            series_animedb_id=i,
+            series_title=f"Series #{i}: The Movie",
+            series_type=AnimeType.TV,
+            series_episodes=12,
+            my_watched_episodes=i % 13,
+            my_start_date=datetime(2020, 1 + i % 12, 1 + i % 28),
+            my_finish_date=datetime(2021, 1 + i % 12, 1 + i % 28) if i % 2 else None,
+            my_score=i % 11,
+            my_status=AnimeStatus.COMPLETED,
+            my_comments="Watched with friends & family" if i % 10 == 0 else "",
+            my_priority=Priority.LOW,
+            my_tags=["rewatch", "favorite"] if i % 5 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def make_manga(count: int) -> list[Manga]:
+    """
+    Generate manga entries with a realistic mix of fields.
+
+    :param count: Number of entries.
+    :type count: int
+    :return: Manga entries.
+    :rtype: list[Manga]
+    """
+    return [
+        Manga(
+            manga_mangadb_id=i,
+            manga_title=f"Manga <{i}>",
+            manga_volumes=10,
+            manga_chapters=100,
+            my_read_volumes=i % 11,
+            my_read_chapters=i % 101,
+            my_start_date=datetime(2019, 1 + i % 12, 1 + i % 28),
+            my_score=i % 11,
+            my_status=MangaStatus.READING,
+            my_priority=Priority.MEDIUM,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(entries: list[Anime] | list[Manga], render: Callable) -> float:
+    """
+    Measure entries serialized per second.
+
+    :param entries: Entries to serialize.
+    :type entries: list[Anime] | list[Manga]
+    :param render: Function serializing one entry.
+    :type render: Callable
+    :return: Entries per second.
+    :rtype: float
+    """
+    start = perf_counter()
+    for entry in entries:
+        render(entry)
+    return len(entries) / (perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(f"{'kind':<6} {'entries':>8} {'tag tree/s':>12} {'template/s':>12} {'speedup':>8}")
+    for kind, factory in (("anime", make_anime), ("manga", make_manga)):
+        for size in SIZES:
+            entries = factory(size)
+            tree = measure(entries, lambda entry: entry.as_tag.to_string())
+            template = measure(entries, lambda entry: entry.as_string)
+            print(
+                f"{kind:<6} {size:>8} {tree:>12,.0f} {template:>12,.0f} {template / tree:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark MAL XML outputs for ``MalXmlSettings.compress_to_gzip``.
+
+Compares writing only the XML, only the gzip, both from a single stream,
+and both by serializing twice, for a 100k entries list.
+
+Run from the repository root with ``python -m benchmarks.bench_output``.
+"""
+
+from gzip import open as gzip_open
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Callable
+
+from benchmarks.bench_malxml import make_anime
+from bokusu.models.malxml import AnimeMyStatus, ExportType, MalXML
+
+SIZE = 100_000
+"""Number of entries."""
+
+
+def naive_both(export: MalXML, path: Path) -> None:
+    """
+    Write the XML and the gzip copy by serializing twice.
+
+    :param export: The export.
+    :type export: MalXML
+    :param path: Path of the uncompressed XML.
+    :type path: Path
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        export.write_to(file)
+    with gzip_open(f"{path}.gz", "wb") as file:
+        export.write_to(file)
+
+
+def measure(write: Callable[[Path], object], folder: Path) -> tuple[float, float]:
+    """
+    Measure wall time of a write, then its peak traced memory in a second
+    run since tracing slows it down.
+
+    :param write: Function writing to the given path.
+    :type write: Callable[[Path], object]
+    :param folder: Folder to write in.
+    :type folder: Path
+    :return: Seconds and peak MiB.
+    :rtype: tuple[float, float]
+    """
+    begin = perf_counter()
+    write(folder / "anime.xml")
+    elapsed = perf_counter() - begin
+    start()
+    write(folder / "anime.xml")
+    peak = get_traced_memory()[1] / 2**20
+    stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    export = MalXML(
+        user=AnimeMyStatus(user_export_type=ExportType.ANIME, user_total_anime=SIZE),
+        entries=make_anime(SIZE),
+    )
+    cases: dict[str, Callable[[Path], object]] = {
+        "xml only": lambda path: export.save(path, False),
+        "gzip only": lambda path: export.save(path, True),
+        "both, tee": lambda path: export.save(path, "both"),
+        "both, twice": lambda path: naive_both(export, path),
+    }
+    print(f"{'output':<12} {'seconds':>8} {'peak MiB':>9}")
+    for name, write in cases.items():
+        with TemporaryDirectory() as folder:
+            elapsed, peak = measure(write, Path(folder))
+        print(f"{name:<12} {elapsed:>8.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
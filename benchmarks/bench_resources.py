@@ -0,0 +1,79 @@
+"""
+Benchmark loading AniList queries.
+
+Times ``load_anilist_gql`` against the previous loader, which imported the
+package and read the query from disk on every call, and reports how much
+minification shrinks each query and its JSON request body.
+
+Run from the repository root with ``python -m benchmarks.bench_resources``.
+"""
+
+from importlib import import_module
+from pathlib import Path
+from time import perf_counter
+
+from bokusu.core.codec import dumpb
+from bokusu.services.anilist.anilist import load_anilist_gql
+
+CALLS = 20_000
+"""Loads per case."""
+
+QUERIES = [
+    (media_type, kind) for media_type in ("anime", "manga") for kind in ("query", "updates")
+]
+"""Media type and kind of every AniList query."""
+
+
+def legacy_load(media_type: str, kind: str) -> dict:
+    """
+    Stand-in for the previous loader, reading the file on every call.
+
+    :param media_type: Media type target.
+    :type media_type: str
+    :param kind: Query kind.
+    :type kind: str
+    :return: Request body.
+    :rtype: dict
+    """
+    package = import_module("bokusu")
+    folder = Path(package.__path__[0]) / "services/anilist"
+    query = []
+    for name in (f"{media_type}_{kind}.gql", f"{media_type}_entry.gql"):
+        path = folder / name
+        if not path.is_file():
+            raise FileNotFoundError(path)
+        with open(path, "r") as f:
+            query.append(f.read())
+    return {"query": "\n".join(query), "variables": {"name": "user"}}
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    loaders = {
+        "legacy": legacy_load,
+        "cached": lambda media_type, kind: load_anilist_gql(
+            media_type, {"name": "user"}, kind  # type: ignore[arg-type]
+        ),
+    }
+    print(f"{'loader':<8} {'us/call':>8}")
+    for name, loader in loaders.items():
+        start = perf_counter()
+        for i in range(CALLS):
+            loader(*QUERIES[i % len(QUERIES)])
+        elapsed = perf_counter() - start
+        print(f"{name:<8} {elapsed / CALLS * 1e6:>8.2f}")
+
+    print()
+    print(f"{'query':<14} {'raw B':>7} {'min B':>7} {'body raw':>9} {'body min':>9}")
+    for media_type, kind in QUERIES:
+        raw = legacy_load(media_type, kind)["query"]
+        body = load_anilist_gql(media_type, {"name": "user"}, kind)  # type: ignore[arg-type]
+        raw_body = dumpb({**body, "query": raw})
+        print(
+            f"{media_type + '_' + kind:<14} {len(raw):>7} {len(body['query']):>7}"  # type: ignore[arg-type]
+            f" {len(raw_body):>9} {len(dumpb(body)):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark opening RYMSF files.
+
+Compares eager validation (``HeaderedRymsf``) against the lazy loader
+(``LazyRymsf``) when only the header and the entry count are needed. The
+"file" columns time opening a YAML file end to end, parsing included, as
+``LazyRymsf.load`` does; the "validation" columns start from an already
+parsed document, so they only show what lazy validation saves.
+
+Run from the repository root with ``python -m benchmarks.bench_rymsf``.
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+
+from yaml import dump as yaml_dump
+from yaml import load as yaml_load
+
+from bokusu.models.rymsf import HeaderedRymsf, LazyRymsf, YamlLoader
+
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as YamlDumper  # type: ignore
+
+SIZES = (1_000, 10_000, 50_000)
+"""Entry counts to benchmark."""
+
+
+def make_document(count: int) -> dict[str, Any]:
+    """
+    Generate a parsed RYMSF document.
+
+    :param count: Number of entries.
+    :type count: int
+    :return: RYMSF document.
+    :rtype: dict[str, Any]
+    """
+    statuses = ("current", "completed", "onhold", "dropped", "planned")
+    return {
+        "header": {"version": 1, "media_type": "animation", "name": "bench"},
+        "data": [
+            {
+                "id": {"type": "int", "value": i},
+                "title": {"native": f"作品{i}", "transliterated": f"Sakuhin {i}"},
+                "type": "animation",
+                "subtype": "TV",
+                "status": statuses[i % len(statuses)],
+                "progress": {"episode": i % 12},
+                "upstream_progress": {"episode": 12},
+                "date": {"start": "2020-01-02T00:00:00+00:00", "finish": None},
+                "score": {"value": i % 101, "maximum": 100},
+                "tags": ["bench"],
+                "mappings": {"myanimelist": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def load_eager(path: Path) -> HeaderedRymsf:
+    """
+    Open a YAML RYMSF file and validate every entry.
+
+    :param path: Path to the file.
+    :type path: Path
+    :return: Validated RYMSF.
+    :rtype: HeaderedRymsf
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return HeaderedRymsf.model_validate(yaml_load(file, Loader=YamlLoader))
+
+
+def timed(func: Any, *args: Any) -> tuple[Any, float]:
+    """Call a function, returning its result and the elapsed seconds."""
+    start = perf_counter()
+    result = func(*args)
+    return result, perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(
+        f"{'entries':>8} {'file eager':>11} {'file lazy':>10} {'speedup':>8}"
+        f" {'valid. eager':>13} {'valid. lazy':>12} {'speedup':>8}"
+    )
+    with TemporaryDirectory() as tmp:
+        for size in SIZES:
+            document = make_document(size)
+            path = Path(tmp) / f"bench_{size}.yaml"
+            with open(path, "w", encoding="utf-8") as file:
+                yaml_dump(document, file, Dumper=YamlDumper, allow_unicode=True)
+            eager, eager_file = timed(load_eager, path)
+            lazy, lazy_file = timed(LazyRymsf.load, path)
+            assert len(lazy.data) == len(eager.data)
+            _, eager_valid = timed(HeaderedRymsf.model_validate, document)
+            _, lazy_valid = timed(LazyRymsf.from_dict, document)
+            print(
+                f"{size:>8} {eager_file:>11.3f} {lazy_file:>10.3f}"
+                f" {eager_file / lazy_file:>7.1f}x {eager_valid:>13.4f}"
+                f" {lazy_valid:>12.4f} {eager_valid / lazy_valid:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark CLI startup.
+
+Times ``bokusu version``, which must not load the CLI framework, against a
+bare interpreter, and against loading the CLI and every command module as
+``bokusu --help`` does. Exits with status 1 if ``bokusu version`` costs more
+than ``BUDGET_MS`` over the bare interpreter, so it can guard regressions.
+
+Run from the repository root with ``python -m benchmarks.bench_startup``.
+"""
+
+import sys
+
+from bokusu.commands.debug import startup_time
+
+RUNS = 15
+"""Invocations per case, the median is reported."""
+
+BUDGET_MS = 50.0
+"""Allowed startup cost of ``bokusu version`` over ``python -c pass``."""
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    cases = {
+        "python -c pass": ["-c", "pass"],
+        "bokusu version": ["-m", "bokusu", "version"],
+        "bokusu --help": ["-m", "bokusu", "--help"],
+    }
+    results = {name: startup_time(args, RUNS) for name, args in cases.items()}
+    bare = results["python -c pass"]
+    print(f"{'case':<16} {'median ms':>10} {'over bare':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:<16} {elapsed:>10.1f} {elapsed - bare:>+10.1f}")
+    overhead = results["bokusu version"] - bare
+    if overhead > BUDGET_MS:
+        print(f"bokusu version is {overhead:.1f} ms over budget of {BUDGET_MS:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
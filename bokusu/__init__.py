@@ -0,0 +1 @@
+"""Bokusu, a CLI to assist on exporting your media lists."""
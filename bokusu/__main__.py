@@ -1,105 +1,89 @@
-from os import getenv
-from platform import (
-    architecture,
-    platform,
-    processor,
-    python_build,
-    python_implementation,
-    python_version,
-    system,
-)
-from re import sub
-from sys import executable
-from typing import Annotated
-
-import typer as ty
-
-app = ty.Typer(no_args_is_help=True)
-
-
-def ci(text: str, ansi: str) -> str:
-    return f"\033[1;{ansi}m{text}\033[0m"
-
-
-@app.command(
-    name="about",
-    help="Show the about information of the application",
-)
-def cli_about(
-    hide_logo: Annotated[
-        bool,
-        ty.Option(
-            "--hide-logo",
-            help="Hide the logo",
-        ),
-    ] = False,
-    monochrome: Annotated[
-        bool,
-        ty.Option(
-            "--monochrome",
-            help="Use monochrome logo",
-        ),
-    ] = False,
-):
-    from bokusu.core.commons import read_resource
-    from bokusu.core.const import __version__
-
-    user = getenv("USERPROFILE") or getenv("HOME") or ""
-    exe = executable.replace(user, "~")
-
-    infos = [
-        f"Bokusu v{__version__}",
-        "A CLI to assist on exporting your media lists.",
-        "",
-        "Licensed under the AGPL-3.0 License.",
-        "Homepage: https://github.com/bokusu/bokusu",
-        "",
-        f"Python {python_version()} ({python_implementation()} {python_build()})",
-        f"{exe}",
-        "",
-        f"Platform: {platform()}",
-        f"Processor: {processor()}",
-        f"Architecture: {architecture()[0]}",
-    ]
-    # if platform is windows, remove ansii color
-    catinabox = read_resource("assets", "logo.ans")
-    if system() == "Windows" or monochrome:
-        catinabox = sub(r"\033\[[0-9;]*m", "", catinabox)
-    max_info = max(len(info) for info in infos)
-    if not hide_logo:
-        lines = catinabox.split("\n")
-        # TODO: Bro, this is a mess, refactor this :'D
-        for i, info in enumerate(infos, 1):
-            border = "│" if i not in [1, len(infos) + 1] else "╭─" if i == 1 else "╰─"
-            end_border = "│" if i != len(infos) + 1 else "╯"
-            # add end border after calculating the length of the info
-            if info == "":
-                # change to dashes if the info is empty
-                info = ci("─" * max_info, "37")
-            if i != 1:
-                info += " " * (max_info - len(info)) + " " + end_border
-            lines[i] += "  " + border + " " + info  # type: ignore
-            if i == 1:
-                lines[i] += " " + "─" * (max_info - len(info) - 1) + "╮"
-            elif i == len(infos):
-                lines[i + 1] += "  " + "╰" + "─" * (max_info + 2) + "╯"
-        ty.echo("\n".join(lines))
-    else:
-        ty.echo("\n".join(infos))
-
-
-# use grey color for aliases
-@app.command(
-    name="version",
-    help=f"Show the version of the application. Aliases: {ci('ver', '34')}, {ci('v', '34')}",
-)
-@app.command(name="ver", hidden=True)
-@app.command(name="v", hidden=True)
-def version():
-    from bokusu.core.const import __version__
-
-    ty.echo(f"Bokusu v{__version__}")
+"""
+Command line entry point
+
+Commands are listed in ``COMMANDS`` and their module is only imported when
+the command runs, or when help lists it. ``bokusu version`` is answered
+before the CLI framework is even imported.
+"""
+
+import sys
+from typing import NamedTuple
+
+
+class CommandEntry(NamedTuple):
+    """Where a command lives"""
+
+    module: str
+    """Module defining the command on its ``app``"""
+    name: str
+    """Command name in that module, the module's ``app`` itself if it is a group"""
+    hidden: bool = False
+    """Hide the command from help, for aliases"""
+
+
+COMMANDS: dict[str, CommandEntry] = {
+    "about": CommandEntry("bokusu.commands.about", "about"),
+    "version": CommandEntry("bokusu.commands.version", "version"),
+    "ver": CommandEntry("bokusu.commands.version", "ver", hidden=True),
+    "v": CommandEntry("bokusu.commands.version", "v", hidden=True),
+    "backup": CommandEntry("bokusu.commands.backup", "backup"),
+    "snapshots": CommandEntry("bokusu.commands.snapshots", "snapshots"),
+    "restore": CommandEntry("bokusu.commands.snapshots", "restore"),
+    "debug": CommandEntry("bokusu.commands.debug", "debug"),
+}
+"""Command registry, in help order"""
+
+VERSION_COMMANDS = frozenset({"version", "ver", "v"})
+"""Commands answered without loading the CLI"""
+
+
+def get_app():
+    """
+    Build the CLI, commands are resolved from ``COMMANDS`` on demand
+
+    :return: Typer application
+    :rtype: typer.Typer
+    """
+    from importlib import import_module
+
+    import typer as ty
+    from typer.core import TyperGroup
+    from typer.main import get_command
+
+    class LazyGroup(TyperGroup):
+        def list_commands(self, ctx):  # type: ignore[no-untyped-def]
+            return [name for name, entry in COMMANDS.items() if not entry.hidden]
+
+        def get_command(self, ctx, cmd_name):  # type: ignore[no-untyped-def]
+            entry = COMMANDS.get(cmd_name)
+            if entry is None:
+                return None
+            command = get_command(import_module(entry.module).app)
+            commands = getattr(command, "commands", {})
+            if entry.name in commands:
+                return commands[entry.name]
+            command.name = cmd_name
+            return command
+
+    app = ty.Typer(cls=LazyGroup, no_args_is_help=True)
+
+    @app.callback()
+    def cli():
+        """A CLI to assist on exporting your media lists."""
+
+    return app
+
+
+def main() -> None:
+    """Run the CLI"""
+    args = sys.argv[1:]
+    if len(args) == 1 and args[0] in VERSION_COMMANDS:
+        from bokusu.core.const import __version__
+
+        print(f"Bokusu v{__version__}")
+        return
+    get_app()()
 
 
 if __name__ == "__main__":
-    app()
+    main()
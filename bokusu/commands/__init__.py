@@ -0,0 +1,5 @@
+"""CLI commands, each module is only imported when one of its commands runs."""
+
+
+def ci(text: str, ansi: str) -> str:
+    return f"\033[1;{ansi}m{text}\033[0m"
@@ -0,0 +1,72 @@
+"""``bokusu backup``: run every enabled profile and service."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer as ty
+
+from bokusu.commands import ci
+
+app = ty.Typer(add_completion=False)
+
+
+@app.command(
+    name="backup",
+    help="Backup media lists of every enabled profile and service concurrently",
+)
+def cli_backup(
+    config: Annotated[
+        Path | None,
+        ty.Option(
+            "--config",
+            "-c",
+            help="Path to the configuration file",
+        ),
+    ] = None,
+    profile: Annotated[
+        list[str] | None,
+        ty.Option(
+            "--profile",
+            "-p",
+            help="Only backup this profile, can be repeated",
+        ),
+    ] = None,
+    concurrency: Annotated[
+        int,
+        ty.Option(
+            "--concurrency",
+            help="Maximum number of jobs running at once",
+            min=1,
+        ),
+    ] = 8,
+    per_host: Annotated[
+        int,
+        ty.Option(
+            "--per-host",
+            help="Maximum number of jobs running at once against the same site",
+            min=1,
+        ),
+    ] = 2,
+    snapshot: Annotated[
+        bool,
+        ty.Option(
+            "--snapshot/--no-snapshot",
+            help="Record each export in the deduplicated snapshot store",
+        ),
+    ] = True,
+):
+    from asyncio import run
+
+    from bokusu.core.backup import run_backup
+    from bokusu.core.config import load_config
+
+    results = run(
+        run_backup(load_config(config), profile, concurrency, per_host, snapshot)
+    )
+    for result in results:
+        status = ci("done", "32") if result.success else ci("failed", "31")
+        ty.echo(
+            f"[{status}] {result.job.profile}: {result.job.name} ({result.elapsed:.1f}s)"
+        )
+    if not all(result.success for result in results):
+        raise ty.Exit(code=1)
@@ -0,0 +1,124 @@
+"""``bokusu debug``: diagnostics of bokusu itself."""
+
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Annotated
+
+import typer as ty
+
+app = ty.Typer(add_completion=False)
+
+
+@app.callback()
+def cli_debug():
+    """Diagnostics of bokusu itself"""
+
+
+def import_times(statement: str) -> list[tuple[str, int, int]]:
+    """
+    Import times of a statement, in a fresh interpreter
+
+    :param statement: Python statement, e.g. ``import bokusu.commands.backup``
+    :type statement: str
+    :return: Module, self and cumulative microseconds, in import order
+    :rtype: list[tuple[str, int, int]]
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: list[tuple[str, int, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        # one space after the separator, then two more per nesting level
+        times.append((name[1:].rstrip(), int(own), int(cumulative)))
+    return times
+
+
+def startup_time(args: list[str], runs: int) -> float:
+    """
+    Median wall time of an interpreter invocation
+
+    :param args: Interpreter arguments
+    :type args: list[str]
+    :param runs: Invocations to time
+    :type runs: int
+    :return: Milliseconds
+    :rtype: float
+    """
+    samples = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        samples.append((perf_counter() - start) * 1000)
+    return median(samples)
+
+
+@app.command(
+    name="import-time",
+    help="Report what a command imports on startup, and how long `bokusu version` takes",
+)
+def cli_import_time(
+    command: Annotated[
+        str,
+        ty.Argument(help="Command to inspect, its module is imported but not run"),
+    ] = "version",
+    top: Annotated[
+        int,
+        ty.Option("--top", "-n", help="Number of top-level imports to list", min=1),
+    ] = 15,
+    runs: Annotated[
+        int,
+        ty.Option("--runs", help="Invocations timed for the startup figures", min=1),
+    ] = 5,
+):
+    from bokusu.__main__ import COMMANDS
+
+    if command not in COMMANDS:
+        raise ty.BadParameter(f"Unknown command {command!r}", param_hint="COMMAND")
+    module = COMMANDS[command].module
+    times = import_times(f"import bokusu.__main__, {module}")
+    # top-level imports carry the cost of everything they pull in
+    roots = [entry for entry in times if not entry[0].startswith(" ")]
+    roots.sort(key=lambda entry: entry[2], reverse=True)
+    ty.echo(f"Imports of {module}: {len(times)} modules")
+    ty.echo(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for name, own, cumulative in roots[:top]:
+        ty.echo(f"{cumulative / 1000:>13.1f} {own / 1000:>8.1f}  {name}")
+
+    bare = startup_time(["-c", "pass"], runs)
+    version = startup_time(["-m", "bokusu", "version"], runs)
+    ty.echo("")
+    ty.echo(f"python -c pass        {bare:>7.1f} ms")
+    ty.echo(f"bokusu version        {version:>7.1f} ms (+{version - bare:.1f} ms)")
+
+
+@app.command(
+    name="config",
+    help="Load the configuration file and show whether its validated cache was used",
+)
+def cli_config(
+    config: Annotated[
+        Path | None,
+        ty.Option("--config", "-c", help="Path to the configuration file"),
+    ] = None,
+    cache: Annotated[
+        bool,
+        ty.Option("--cache/--no-cache", help="Use the validated configuration cache"),
+    ] = True,
+):
+    from bokusu.core.config import load_config_info
+
+    info = load_config_info(config, cache)
+    ty.echo(f"Configuration: {info.path}")
+    ty.echo(f"Cache:         {info.cache_path or '-'}")
+    ty.echo(f"Status:        {info.status}")
+    ty.echo(f"Profiles:      {len(info.config.profiles)}")
+    ty.echo(f"Loaded in      {info.elapsed * 1000:.1f} ms")
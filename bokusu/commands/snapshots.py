@@ -0,0 +1,65 @@
+"""``bokusu snapshots`` and ``bokusu restore``: browse and restore the snapshot store."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer as ty
+
+app = ty.Typer(add_completion=False)
+
+
+@app.command(
+    name="snapshots",
+    help="List backed up files, or the snapshots of one of them",
+)
+def cli_snapshots(
+    source: Annotated[
+        str | None,
+        ty.Argument(help="Backed up file, e.g. default/anilist_anime.json"),
+    ] = None,
+):
+    from bokusu.core.snapshot import SnapshotStore
+
+    store = SnapshotStore()
+    if source is None:
+        for name in store.sources():
+            ty.echo(name)
+        return
+    for manifest in store.snapshots(source):
+        ty.echo(
+            f"{manifest.snapshot_id}  {manifest.created}  {manifest.size} bytes"
+        )
+
+
+@app.command(
+    name="restore",
+    help="Restore a backed up file from the snapshot store",
+)
+def cli_restore(
+    source: Annotated[
+        str,
+        ty.Argument(help="Backed up file, e.g. default/anilist_anime.json"),
+    ],
+    output: Annotated[
+        Path,
+        ty.Option(
+            "--output",
+            "-o",
+            help="Path to write the restored file to",
+        ),
+    ],
+    snapshot_id: Annotated[
+        str | None,
+        ty.Option(
+            "--snapshot",
+            "-s",
+            help="Snapshot ID, defaults to the latest one",
+        ),
+    ] = None,
+):
+    from bokusu.core.snapshot import SnapshotStore
+
+    store = SnapshotStore()
+    manifest = store.get(source, snapshot_id)
+    store.restore(manifest, output)
+    ty.echo(f"Restored {manifest.snapshot_id} to {output}")
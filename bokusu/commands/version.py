@@ -0,0 +1,20 @@
+"""``bokusu version``, also reached without the CLI framework by ``bokusu.__main__.main``."""
+
+import typer as ty
+
+from bokusu.commands import ci
+
+app = ty.Typer(add_completion=False)
+
+
+# use grey color for aliases
+@app.command(
+    name="version",
+    help=f"Show the version of the application. Aliases: {ci('ver', '34')}, {ci('v', '34')}",
+)
+@app.command(name="ver", hidden=True)
+@app.command(name="v", hidden=True)
+def version():
+    from bokusu.core.const import __version__
+
+    ty.echo(f"Bokusu v{__version__}")
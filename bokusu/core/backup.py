@@ -0,0 +1,239 @@
+"""This module builds and runs backup jobs for every enabled profile."""
+
+from typing import Iterable, Literal
+
+from bokusu.core.http import HttpClient, resolve_user_agent
+from bokusu.core.output import run_io
+from bokusu.core.scheduler import BackupJob, BackupScheduler, JobResult, RateLimiter
+from bokusu.core.snapshot import Manifest, SnapshotStore
+from bokusu.models.config import Config, MalXmlSettings, WaybackConfig
+from bokusu.services.wayback.index import ArchiveIndex
+from bokusu.services.wayback.submitter import WaybackSubmitter
+
+MEDIA_TYPES: tuple[Literal["anime", "manga"], ...] = ("anime", "manga")
+"""Media types exported by list services"""
+
+ANIMEPLANET_USER = "https://www.anime-planet.com/users/{username}"
+"""Anime-Planet profile page, lists are under it"""
+
+
+def _animeplanet_urls(
+    username: str, media_type: Literal["anime", "manga"], settings: WaybackConfig | None
+) -> list[str]:
+    """Anime-Planet pages to capture after an export, following ``wayback_settings``"""
+    if settings is None:
+        return []
+    home = ANIMEPLANET_USER.format(username=username)
+    urls = [f"{home}/{media_type}"] if settings.snap_urls else []
+    if settings.snap_homepage:
+        urls.append(home)
+    return urls
+
+
+def _archive(
+    wayback: WaybackSubmitter | None, urls: list[str], settings: WaybackConfig | None
+) -> None:
+    """Queue pages for capture, skipping the ones archived recently"""
+    if wayback is None or settings is None:
+        return
+    for url in urls:
+        wayback.submit(
+            url,
+            max_age=settings.skip_recent_hours * 3600,
+            lookup=settings.check_availability,
+        )
+
+
+def _anilist_job(
+    http: HttpClient,
+    profile: str,
+    user_agent: str,
+    username: str | None,
+    access_token: str,
+    media_type: Literal["anime", "manga"],
+    incremental: bool = False,
+    store: SnapshotStore | None = None,
+    malxml_settings: MalXmlSettings | None = None,
+) -> BackupJob:
+    async def run(limiter: RateLimiter | None) -> Manifest | None:
+        from bokusu.services.anilist.anilist import export_anilist
+
+        path, success = await export_anilist(
+            media_type,
+            username,
+            access_token,
+            http.session,
+            user_agent=user_agent,
+            profile=profile,
+            limiter=limiter,
+            incremental=incremental,
+            malxml_settings=malxml_settings,
+        )
+        if not success or path is None:
+            raise RuntimeError(
+                f"AniList {media_type} export failed for {username or profile}"
+            )
+        if store is None:
+            return None
+        return await run_io(store.save_file, f"{profile}/{path.name}", path)
+
+    return BackupJob(
+        profile=profile,
+        service="anilist",
+        host="graphql.anilist.co",
+        name=f"AniList {media_type}",
+        run=run,
+    )
+
+
+def _animeplanet_job(
+    http: HttpClient,
+    profile: str,
+    user_agent: str,
+    username: str,
+    media_type: Literal["anime", "manga"],
+    store: SnapshotStore | None = None,
+    wayback: WaybackSubmitter | None = None,
+    wayback_settings: WaybackConfig | None = None,
+    malxml_settings: MalXmlSettings | None = None,
+) -> BackupJob:
+    async def run(limiter: RateLimiter | None) -> Manifest | None:
+        from bokusu.services.animeplanet.animeplanet import export_animeplanet
+
+        export, success = await export_animeplanet(
+            media_type,
+            username,
+            http.session,
+            user_agent=user_agent,
+            profile=profile,
+            limiter=limiter,
+            malxml_settings=malxml_settings,
+        )
+        if not success or export is None:
+            raise RuntimeError(f"Anime-Planet {media_type} export failed for {username}")
+        _archive(
+            wayback,
+            _animeplanet_urls(username, media_type, wayback_settings),
+            wayback_settings,
+        )
+        if store is None:
+            return None
+        return await run_io(
+            store.save, f"{profile}/animeplanet_{media_type}.xml", export.encode("utf-8")
+        )
+
+    return BackupJob(
+        profile=profile,
+        service="animeplanet",
+        host="malscraper.azurewebsites.net",
+        name=f"Anime-Planet {media_type}",
+        run=run,
+    )
+
+
+def build_jobs(
+    config: Config,
+    http: HttpClient,
+    profiles: Iterable[str] | None = None,
+    store: SnapshotStore | None = None,
+    wayback: WaybackSubmitter | None = None,
+) -> list[BackupJob]:
+    """
+    Build jobs for every enabled profile and service.
+
+    :param config: The configuration.
+    :type config: Config
+    :param http: Shared HTTP client, injected in every service.
+    :type http: HttpClient
+    :param profiles: Only build jobs for these profiles. Defaults to all.
+    :type profiles: Iterable[str] | None
+    :param store: Snapshot store to record each export in. Defaults to None.
+    :type store: SnapshotStore | None
+    :param wayback: Queue pages are submitted to for capture. Defaults to None.
+    :type wayback: WaybackSubmitter | None
+    :return: The jobs.
+    :rtype: list[BackupJob]
+    :raises KeyError: If a requested profile is not configured.
+    """
+    names = list(profiles) if profiles else list(config.profiles)
+    jobs: list[BackupJob] = []
+    for name in names:
+        profile = config.profiles[name]
+        if not profile.user_settings.enabled:
+            continue
+        user_agent = resolve_user_agent(config, name)
+        if profile.anilist and profile.anilist.enabled:
+            for media_type in MEDIA_TYPES:
+                jobs.append(
+                    _anilist_job(
+                        http,
+                        name,
+                        user_agent,
+                        profile.anilist.username,
+                        profile.anilist.credentials.access_token,
+                        media_type,
+                        profile.anilist.incremental,
+                        store,
+                        profile.anilist.malxml_settings,
+                    )
+                )
+        if profile.animeplanet and profile.animeplanet.enabled:
+            ap_user_agent = profile.animeplanet.override_useragent or user_agent
+            for media_type in MEDIA_TYPES:
+                jobs.append(
+                    _animeplanet_job(
+                        http,
+                        name,
+                        ap_user_agent.strip(),
+                        profile.animeplanet.username,
+                        media_type,
+                        store,
+                        wayback,
+                        profile.animeplanet.wayback_settings,
+                        profile.animeplanet.malxml_settings,
+                    )
+                )
+    return jobs
+
+
+async def run_backup(
+    config: Config,
+    profiles: Iterable[str] | None = None,
+    max_concurrency: int = 8,
+    per_host: int = 2,
+    snapshot: bool = True,
+) -> list[JobResult]:
+    """
+    Run backups of every enabled profile and service concurrently, sharing
+    one pooled HTTP session for the whole run. Pages queued for the Wayback
+    Machine are captured alongside, the run ends once they are done.
+
+    :param config: The configuration.
+    :type config: Config
+    :param profiles: Only back up these profiles. Defaults to all.
+    :type profiles: Iterable[str] | None
+    :param max_concurrency: Maximum number of jobs running at once.
+    :type max_concurrency: int
+    :param per_host: Maximum number of jobs and connections at once on the same host.
+    :type per_host: int
+    :param snapshot: Record each export in the snapshot store. Defaults to True.
+    :type snapshot: bool
+    :return: The job results.
+    :rtype: list[JobResult]
+    """
+    scheduler = BackupScheduler(max_concurrency=max_concurrency, per_host=per_host)
+    async with HttpClient(
+        user_agent=resolve_user_agent(config), limit_per_host=per_host
+    ) as http:
+        index = ArchiveIndex()
+        try:
+            async with WaybackSubmitter(
+                http.session, scheduler.limiter("wayback"), index=index
+            ) as wayback:
+                store = SnapshotStore() if snapshot else None
+                for job in build_jobs(config, http, profiles, store, wayback):
+                    scheduler.add(job)
+                # captures keep running after the exports, until the submitter exits
+                return await scheduler.run()
+        finally:
+            index.close()
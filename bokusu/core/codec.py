@@ -0,0 +1,236 @@
+"""JSON codec, using orjson or msgspec when installed and the standard library otherwise."""
+
+import json
+import re
+from typing import Any, Callable, Iterator, TextIO
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore
+
+JsonPath = tuple[str | int, ...]
+"""Keys and indexes leading to a value"""
+
+_PLAIN = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+"""Run of text without brackets, complete strings included"""
+
+_STRING_BODY = re.compile(r'[^"\\]*')
+"""Run of string characters that neither escape nor close it"""
+
+_SCALAR_END = re.compile(r"[\s,:\]}]")
+"""Characters that end a number or a literal"""
+
+if orjson is not None:
+    BACKEND = "orjson"
+    """Name of the JSON library in use"""
+    _loads: Callable[[bytes | str], Any] = orjson.loads
+    _dumpb: Callable[[Any], bytes] = orjson.dumps
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _loads = msgspec.json.Decoder().decode
+    _dumpb = msgspec.json.Encoder().encode
+else:
+    BACKEND = "json"
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Decode JSON
+
+    :param data: JSON document, bytes are decoded without an intermediate str
+    :type data: bytes | str
+    :return: Decoded value
+    :rtype: Any
+    """
+    return _loads(data)
+
+
+def dumpb(obj: Any) -> bytes:
+    """
+    Encode to compact UTF-8 JSON
+
+    :param obj: Value to encode
+    :type obj: Any
+    :return: JSON document
+    :rtype: bytes
+    """
+    return _dumpb(obj)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Encode to compact JSON
+
+    :param obj: Value to encode
+    :type obj: Any
+    :return: JSON document
+    :rtype: str
+    """
+    return dumpb(obj).decode("utf-8")
+
+
+class JsonStream:
+    """
+    Incremental JSON decoder over a text file
+
+    Only the value being decoded and one read chunk are held in memory, so
+    large documents can be walked value by value. The end of a value is
+    found by a scan that resumes where it stopped after each read, and the
+    complete value is then decoded at once with :func:`loads`.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = 65536) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # scan state of the value starting at pos, kept between reads
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+
+    def _fill(self, size: int = 0) -> None:
+        """Read the next chunk, at least ``size`` characters, dropping what has been consumed"""
+        if self.pos:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        chunk = self.file.read(max(self.chunk_size, size))
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, empty on EOF"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos : self.pos + 1]
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        """Consume the next character, which must be ``char``"""
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of JSON chunk")
+        self.pos += 1
+
+    def _scan(self) -> int:
+        """
+        Continue scanning the value starting at ``pos``
+
+        :return: End offset of the value in the buffer, -1 if it is not complete yet
+        :rtype: int
+        """
+        buffer = self.buffer
+        size = len(buffer)
+        index = self.pos + self._scanned
+        if self._scanned:
+            depth, in_string = self._depth, self._in_string
+        else:
+            first = buffer[index]
+            if first not in "[{\"":
+                # number or literal, ends with the next delimiter
+                match = _SCALAR_END.search(buffer, index)
+                if match is not None:
+                    return match.start()
+                return size if self.eof else -1
+            depth, in_string = (0, True) if first == '"' else (1, False)
+            index += 1
+        plain, body = _PLAIN.match, _STRING_BODY.match
+        while index < size:
+            if in_string:
+                index = body(buffer, index).end()  # type: ignore[union-attr]
+                if index >= size:
+                    break
+                if buffer[index] == "\\":
+                    if index + 1 >= size:
+                        break
+                    index += 2
+                    continue
+                index += 1
+                in_string = False
+                if not depth:
+                    return index
+                continue
+            index = plain(buffer, index).end()  # type: ignore[union-attr]
+            if index >= size:
+                break
+            char = buffer[index]
+            index += 1
+            if char == "]" or char == "}":
+                depth -= 1
+                if not depth:
+                    return index
+            elif char == '"':
+                # string cut by the end of the buffer
+                in_string = True
+            else:
+                depth += 1
+        self._scanned = index - self.pos
+        self._depth, self._in_string = depth, in_string
+        return -1
+
+    def value(self) -> Any:
+        """Decode the next complete value"""
+        if not self.peek():
+            raise ValueError("Unexpected end of JSON document")
+        self._scanned = 0
+        while True:
+            end = self._scan()
+            if end >= 0:
+                break
+            if self.eof:
+                raise ValueError(f"Unterminated JSON value at offset {self.pos} of JSON chunk")
+            # read as much as is pending, so a large value is copied a bounded number of times
+            self._fill(len(self.buffer) - self.pos)
+        obj = loads(self.buffer[self.pos : end])
+        self.pos = end
+        self._scanned = 0
+        return obj
+
+    def walk(
+        self, descend: Callable[[JsonPath], bool], path: JsonPath = ()
+    ) -> Iterator[tuple[JsonPath, Any]]:
+        """
+        Iterate values of the document, descending in the containers chosen
+        by ``descend`` instead of decoding them whole
+
+        :param descend: Whether to descend in the object or array at a path
+        :type descend: Callable[[JsonPath], bool]
+        :param path: Path of the next value
+        :type path: JsonPath
+        :return: Iterator of paths and values that were not descended in
+        :rtype: Iterator[tuple[JsonPath, Any]]
+        """
+        char = self.peek()
+        if char == "{" and descend(path):
+            self.expect("{")
+            while self.peek() != "}":
+                key = self.value()
+                self.expect(":")
+                yield from self.walk(descend, path + (key,))
+                if self.peek() == ",":
+                    self.expect(",")
+            self.expect("}")
+        elif char == "[" and descend(path):
+            self.expect("[")
+            index = 0
+            while self.peek() != "]":
+                yield from self.walk(descend, path + (index,))
+                index += 1
+                if self.peek() == ",":
+                    self.expect(",")
+            self.expect("]")
+        else:
+            yield path, self.value()
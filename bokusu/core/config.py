@@ -0,0 +1,216 @@
+"""This module contains functions for loading the configuration file."""
+
+import pickle
+from dataclasses import dataclass
+from functools import cache
+from hashlib import blake2b
+from json import loads as json_loads
+from pathlib import Path
+from time import perf_counter
+from typing import Literal
+
+from bokusu.core import const
+from bokusu.core.const import __version__
+from bokusu.core.folder import get_box_root
+from bokusu.core.resources import ResourceNotFoundError, read_bytes
+from bokusu.models.config import Config
+
+CACHE_FORMAT = 1
+"""Version of the cache file layout, bump when it changes"""
+
+CacheStatus = Literal["hit", "touched", "miss", "disabled"]
+"""
+How the configuration was loaded
+
+- ``hit``: from the cache, the file is unchanged
+- ``touched``: from the cache, the file was rewritten with the same content
+- ``miss``: parsed and validated, then cached
+- ``disabled``: parsed and validated, the cache was not used
+"""
+
+
+@dataclass
+class ConfigLoad:
+    """Loaded configuration and how it was loaded"""
+
+    config: Config
+    """The configuration"""
+    path: Path
+    """Path to the configuration file"""
+    status: CacheStatus
+    """How the configuration was loaded"""
+    cache_path: Path | None
+    """Path to the cache file, None if the cache was not used"""
+    elapsed: float
+    """Seconds spent loading"""
+
+
+def get_config_path() -> Path:
+    """
+    Get the path to the configuration file.
+
+    Uses the configured path if set, otherwise ``config.yaml`` on Bokusu root.
+
+    :return: The path to the configuration file.
+    :rtype: Path
+    """
+    if const.CONFIG_PATH:
+        return Path(const.CONFIG_PATH)
+    return get_box_root() / "config.yaml"
+
+
+def get_cache_path(path: Path) -> Path:
+    """
+    Get the path to the validated configuration cache of a configuration file.
+
+    :param path: The path to the configuration file.
+    :type path: Path
+    :return: The path to the cache file, one per configuration file.
+    :rtype: Path
+    """
+    name = blake2b(str(path.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return get_box_root() / "cache" / f"config-{name}.pickle"
+
+
+def _parse(path: Path, content: bytes) -> Config:
+    """Parse and validate a configuration file, JSON or YAML by extension"""
+    if path.suffix.lower() == ".json":
+        raw = json_loads(content)
+    else:
+        import yaml
+
+        raw = yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    return Config.model_validate(raw)
+
+
+@cache
+def _schema_digest() -> str:
+    """
+    Digest of the source of the configuration models, cached entries of
+    another schema are stale
+    """
+    try:
+        source = read_bytes("models/config.py")
+    except ResourceNotFoundError:
+        # installed without sources, CACHE_FORMAT and __version__ still apply
+        return ""
+    return blake2b(source, digest_size=16).hexdigest()
+
+
+def _read_cache(cache_path: Path, path: Path, content: bytes | None) -> tuple[dict, bool]:
+    """
+    Read a cache entry and check it against the configuration file
+
+    Without ``content``, only the file size and modification time are
+    compared; with it, its digest is.
+    """
+    with open(cache_path, "rb") as file:
+        entry = pickle.load(file)
+    if (
+        entry["format"] != CACHE_FORMAT
+        or entry["version"] != __version__
+        or entry["schema"] != _schema_digest()
+    ):
+        return entry, False
+    if content is None:
+        stat = path.stat()
+        return entry, (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size)
+    return entry, entry["digest"] == blake2b(content).hexdigest()
+
+
+def _write_cache(cache_path: Path, path: Path, content: bytes, config: Config) -> None:
+    """Store a validated configuration, keyed by the file it was loaded from"""
+    from bokusu.core.output import atomic_write
+
+    stat = path.stat()
+    entry = {
+        "format": CACHE_FORMAT,
+        "version": __version__,
+        "schema": _schema_digest(),
+        "digest": blake2b(content).hexdigest(),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        # unset fields are left out, so they stay unset once validated again
+        "data": config.model_dump(exclude_unset=True),
+    }
+    with atomic_write(cache_path, fsync=False) as file:
+        pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_config_info(path: str | Path | None = None, cache: bool = True) -> ConfigLoad:
+    """
+    Load the configuration file, from the validated configuration cache when possible.
+
+    The cache is used when the file has the same size and modification time
+    as when it was cached, or the same content if only those changed, and
+    the configuration models are the same. The cached configuration is then
+    validated again, which is much faster than parsing YAML. Otherwise, the
+    file is parsed, validated and cached again. The cache is not used on GitHub
+    Actions, where the Bokusu root is the workspace.
+
+    :param path: The path to the configuration file. Defaults to None.
+    :type path: str | Path | None
+    :param cache: Use the cache. Defaults to True, except on GitHub Actions.
+    :type cache: bool
+    :return: The configuration and how it was loaded.
+    :rtype: ConfigLoad
+    """
+    start = perf_counter()
+    path = Path(path) if path else get_config_path()
+    if not cache or const.GITHUB_ACTIONS:
+        config = _parse(path, path.read_bytes())
+        return ConfigLoad(config, path, "disabled", None, perf_counter() - start)
+
+    cache_path = get_cache_path(path)
+    content: bytes | None = None
+    status: CacheStatus = "miss"
+    try:
+        entry, fresh = _read_cache(cache_path, path, None)
+        if not fresh:
+            content = path.read_bytes()
+            entry, fresh = _read_cache(cache_path, path, content)
+            status = "touched"
+        if fresh:
+            config = Config.model_validate(entry["data"])
+            if status == "touched":
+                _write_cache(cache_path, path, content, config)  # type: ignore[arg-type]
+            else:
+                status = "hit"
+            return ConfigLoad(config, path, status, cache_path, perf_counter() - start)
+    except (
+        OSError,
+        EOFError,
+        ImportError,
+        pickle.UnpicklingError,
+        LookupError,
+        TypeError,
+        ValueError,
+        AttributeError,
+    ):
+        # missing, unreadable or outdated cache, validate the file again
+        pass
+
+    status = "miss"
+    if content is None:
+        content = path.read_bytes()
+    config = _parse(path, content)
+    try:
+        _write_cache(cache_path, path, content, config)
+    except OSError:
+        cache_path = None  # type: ignore[assignment]
+    return ConfigLoad(config, path, status, cache_path, perf_counter() - start)
+
+
+def load_config(path: str | Path | None = None, cache: bool = True) -> Config:
+    """
+    Load and validate the configuration file, JSON or YAML by extension.
+
+    :param path: The path to the configuration file. Defaults to None.
+    :type path: str | Path | None
+    :param cache: Reuse the validated configuration when the file is
+        unchanged, see :func:`load_config_info`. Defaults to True.
+    :type cache: bool
+    :return: The configuration.
+    :rtype: Config
+    """
+    return load_config_info(path, cache).config
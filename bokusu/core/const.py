@@ -1,9 +1,7 @@
 from os import getenv as env
 from os import path
 from pathlib import Path
-
-from librensetsu.const import IS_GITHUB_WORKFLOW  # type: ignore
-from librensetsu.prettyprint import Platform, PrettyPrint, Status  # type: ignore
+from typing import Any
 
 # script path
 __file__: str = path.abspath(__name__)
@@ -16,18 +14,36 @@ IS_VERBOSE: bool = False
 USER_AGENT: str = env("USER_AGENT") or ""
 """User agent for HTTP requests"""
 
-GITHUB_ACTIONS: bool = IS_GITHUB_WORKFLOW
-"""Check if the program runs on GitHub Actions"""
-
-
 OVERRIDE_PATH: Path | str = ""
 """The path to the user's configured folder to store data"""
 
 CONFIG_PATH: Path | str = ""
 """The path to the configuration file"""
 
-pp = PrettyPrint(Platform.SYSTEM)
-"""Pretty print object"""
+_LAZY = frozenset({"GITHUB_ACTIONS", "pp", "Status"})
+"""Names backed by librensetsu, imported on first access to keep startup fast"""
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Resolve the librensetsu-backed names on first access
+
+    - ``GITHUB_ACTIONS``: check if the program runs on GitHub Actions
+    - ``pp``: pretty print object
+    - ``Status``: pretty print statuses
+    """
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from librensetsu.const import IS_GITHUB_WORKFLOW  # type: ignore
+    from librensetsu.prettyprint import Platform, PrettyPrint, Status  # type: ignore
+
+    values = {
+        "GITHUB_ACTIONS": IS_GITHUB_WORKFLOW,
+        "pp": PrettyPrint(Platform.SYSTEM),
+        "Status": Status,
+    }
+    globals().update(values)
+    return values[name]
 
 __all__ = [
     "IS_VERBOSE",
@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 
-from bokusu.core.const import GITHUB_ACTIONS, OVERRIDE_PATH, Status, pp
+from bokusu.core import const
 
 
 def create_folder(*path: str) -> Path:
@@ -30,12 +30,12 @@ def get_box_root() -> Path:
     :return: The path to the root directory.
     :rtype: Path
     """
-    if GITHUB_ACTIONS:
+    if const.GITHUB_ACTIONS:
         return Path(".").resolve()
     path = Path("~/.bokusu").expanduser()
     if path.exists():
         return path
-    pp.print(Status.ERROR, "Bokusu root directory not found. Creating one...")
+    const.pp.print(const.Status.ERROR, "Bokusu root directory not found. Creating one...")
     return create_folder(str(path))
 
 
@@ -50,12 +50,12 @@ def add_directory(*path: str, name: str | None = None) -> Path:
     :return: The path to the directory.
     :rtype: Path
     """
-    root = Path(OVERRIDE_PATH) or get_box_root()
+    root = Path(const.OVERRIDE_PATH) or get_box_root()
     target = os.path.join(str(root), *path)
     if name:
-        pp.print(Status.INFO, f"Creating directory for {name} on {target}...")
+        const.pp.print(const.Status.INFO, f"Creating directory for {name} on {target}...")
     else:
-        pp.print(Status.INFO, f"Creating directory on {target}...")
+        const.pp.print(const.Status.INFO, f"Creating directory on {target}...")
 
     target = create_folder(target)
 
@@ -0,0 +1,110 @@
+"""Shared, connection-pooled HTTP session for every service client."""
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from bokusu.core.const import USER_AGENT, __version__
+from bokusu.models.config import Config
+
+DEFAULT_USER_AGENT: str = f"bokusu/{__version__} (+https://github.com/bokusu/bokusu)"
+"""User agent used when neither the environment nor the config sets one"""
+
+
+def resolve_user_agent(config: Config | None = None, profile: str | None = None) -> str:
+    """
+    Resolve the user agent, from the most specific setting to the least.
+
+    Order: profile ``user_settings.useragent``, global ``useragent``,
+    ``USER_AGENT`` environment variable, then ``DEFAULT_USER_AGENT``.
+
+    :param config: The configuration. Defaults to None.
+    :type config: Config | None
+    :param profile: Profile name. Defaults to None.
+    :type profile: str | None
+    :return: The user agent.
+    :rtype: str
+    """
+    if config is not None:
+        if profile is not None and profile in config.profiles:
+            useragent = config.profiles[profile].user_settings.useragent
+            if useragent:
+                return useragent.strip()
+        if config.useragent:
+            return config.useragent.strip()
+    return USER_AGENT or DEFAULT_USER_AGENT
+
+
+class HttpClient:
+    """
+    Long-lived keep-alive session, opened once per run and injected in every
+    service client.
+
+    Connections are pooled and reused across requests and services, so DNS
+    lookups and TLS handshakes are only paid once per host. aiohttp does not
+    pipeline requests; sequential requests reuse idle keep-alive connections.
+    """
+
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        limit: int = 100,
+        limit_per_host: int = 4,
+        keepalive_timeout: float = 60.0,
+        timeout: float = 300.0,
+    ):
+        """
+        Initialize the client, the session is created on enter.
+
+        :param user_agent: Default user agent. Defaults to ``resolve_user_agent()``.
+        :type user_agent: str | None
+        :param limit: Maximum number of open connections.
+        :type limit: int
+        :param limit_per_host: Maximum number of open connections per host.
+        :type limit_per_host: int
+        :param keepalive_timeout: Seconds to keep an idle connection open.
+        :type keepalive_timeout: float
+        :param timeout: Total timeout of a request in seconds.
+        :type timeout: float
+        """
+        self.user_agent = user_agent or resolve_user_agent()
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: ClientSession | None = None
+
+    async def __aenter__(self) -> "HttpClient":
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self._session = ClientSession(
+            connector=connector,
+            headers={"User-Agent": self.user_agent},
+            timeout=ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    def __enter__(self):
+        raise RuntimeError("Use async with")
+
+    async def __aexit__(self, exc_type, exc_value, traceback):  # type: ignore
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> ClientSession:
+        """
+        The shared session.
+
+        :return: The session.
+        :rtype: ClientSession
+        :raises RuntimeError: If the client is not opened.
+        """
+        if self._session is None:
+            raise RuntimeError(
+                "Session is not initialized, have you init class with async context?"
+            )
+        return self._session
@@ -0,0 +1,537 @@
+"""Output sinks, writing one serialized stream to plain and compressed files at once."""
+
+import os
+from asyncio import get_running_loop
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from gzip import compress as gzip_compress
+from io import BufferedWriter, FileIO, RawIOBase, TextIOWrapper
+from pathlib import Path
+from secrets import token_hex
+from tempfile import TMP_MAX
+from typing import IO, Any, BinaryIO, Callable, Iterator, Literal, TypeVar
+
+try:
+    import zstandard as zstd
+except ImportError:  # pragma: no cover
+    zstd = None  # type: ignore
+
+CompressFormat = Literal["gzip", "zstd"]
+"""Supported compression formats"""
+
+COMPRESS_SUFFIXES: dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+"""File suffix of each compression format"""
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+"""Bytes collected before they are handed to the sinks"""
+
+DEFAULT_COMPRESS_LEVEL = 6
+"""Compression level, same as the ``gzip`` command"""
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+"""Uncompressed bytes per independently compressed block"""
+
+IO_WORKERS = 4
+"""Threads serializing and writing files for the async exports"""
+
+_io_pool = ThreadPoolExecutor(IO_WORKERS, thread_name_prefix="bokusu-io")
+
+COMPRESS_WORKERS = os.cpu_count() or 1
+"""Threads compressing blocks, shared by every compressor"""
+
+_compress_pool = ThreadPoolExecutor(COMPRESS_WORKERS, thread_name_prefix="bokusu-compress")
+
+T = TypeVar("T")
+
+
+class ParallelCompressor:
+    """
+    Compresses a stream in independent blocks on a thread pool
+
+    Each block becomes a complete gzip member or zstd frame. Concatenated,
+    they form a standard multi-member gzip or multi-frame zstd file that any
+    decompressor reads back as one stream. zlib and zstd release the GIL, so
+    blocks are compressed in parallel while the caller keeps serializing.
+    Every compressor shares one pool of ``COMPRESS_WORKERS`` threads. Blocks
+    are written in order, at most ``2 * workers`` are held in memory.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compress_format: CompressFormat = "gzip",
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        workers: int | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        Initialize the compressor
+
+        :param fileobj: File to write compressed blocks to, closed with the compressor
+        :type fileobj: BinaryIO
+        :param compress_format: Compression format
+        :type compress_format: Literal["gzip", "zstd"]
+        :param compress_level: Compression level
+        :type compress_level: int
+        :param workers: Blocks compressed at once. Defaults to ``COMPRESS_WORKERS``.
+        :type workers: int | None
+        :param block_size: Uncompressed bytes per block
+        :type block_size: int
+        :raises ImportError: If zstd is requested without ``zstandard`` installed
+        """
+        if compress_format == "zstd":
+            if zstd is None:
+                raise ImportError("zstd compression requires the zstandard package")
+            # a ZstdCompressor must not be used by several threads at once
+            self._compress = lambda block: zstd.ZstdCompressor(level=compress_level).compress(
+                block
+            )
+        else:
+            self._compress = partial(gzip_compress, compresslevel=compress_level, mtime=0)
+        self.fileobj = fileobj
+        self.workers = workers or COMPRESS_WORKERS
+        self.block_size = block_size
+        self._pending: deque[Future[bytes]] = deque()
+        self._buffer = bytearray()
+        self._written = False
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(_compress_pool.submit(self._compress, block))
+        self._written = True
+        while len(self._pending) > 2 * self.workers:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data: bytes) -> None:
+        """
+        Queue data to be compressed
+
+        :param data: Uncompressed data
+        :type data: bytes
+        """
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+
+    def close(self) -> None:
+        """Compress the last block, write every pending block and close the file"""
+        try:
+            if self._buffer or not self._written:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            for pending in self._pending:
+                pending.cancel()
+            self._pending.clear()
+            self.fileobj.close()
+
+
+class TeeWriter(RawIOBase):
+    """
+    Binary file-like object copying every byte to several sinks
+
+    Writes are collected up to ``buffer_size`` bytes, then the same buffer is
+    handed to each sink, so the document is serialized once whatever the
+    number of outputs.
+    """
+
+    def __init__(
+        self,
+        sinks: list[BinaryIO | ParallelCompressor],
+        paths: list[Path] | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        """
+        Initialize the writer
+
+        :param sinks: Sinks, closed with the writer
+        :type sinks: list[BinaryIO | ParallelCompressor]
+        :param paths: Paths written by the sinks, for the caller
+        :type paths: list[Path] | None
+        :param buffer_size: Bytes collected before they are handed to the sinks
+        :type buffer_size: int
+        """
+        super().__init__()
+        self.sinks = sinks
+        self.paths = paths or []
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self._drain()
+        return len(data)
+
+    def _drain(self) -> None:
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        for sink in self.sinks:
+            sink.write(chunk)
+
+    def flush(self) -> None:
+        if not self.closed:
+            self._drain()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._drain()
+        finally:
+            errors: list[BaseException] = []
+            for sink in self.sinks:
+                try:
+                    sink.close()
+                except BaseException as err:
+                    errors.append(err)
+            super().close()
+            if errors:
+                raise errors[0]
+
+
+def open_output(
+    path: str | Path,
+    compress_to_gzip: Literal["both"] | bool = False,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    compress_format: CompressFormat = "gzip",
+    workers: int | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    fsync: bool = False,
+) -> TeeWriter:
+    """
+    Open an export for writing, following ``MalXmlSettings.compress_to_gzip``
+
+    - ``False``: ``path`` only
+    - ``True``: compressed copy only, ``path.gz`` or ``path.zst``
+    - ``"both"``: ``path`` and its compressed copy, from a single stream
+
+    The compressed copy is written by a ``ParallelCompressor``.
+
+    :param path: Path of the uncompressed file
+    :type path: str | Path
+    :param compress_to_gzip: Which files to write
+    :type compress_to_gzip: Literal["both"] | bool
+    :param compress_level: Compression level
+    :type compress_level: int
+    :param buffer_size: Bytes collected before they are handed to the sinks
+    :type buffer_size: int
+    :param compress_format: Compression format of the compressed copy
+    :type compress_format: Literal["gzip", "zstd"]
+    :param workers: Blocks compressed at once. Defaults to the number of CPUs.
+    :type workers: int | None
+    :param block_size: Uncompressed bytes per compressed block
+    :type block_size: int
+    :param fsync: Flush every file to disk when the writer is closed
+    :type fsync: bool
+    :return: Binary writer, use it as a context manager
+    :rtype: TeeWriter
+    """
+    path = Path(path)
+    compressed_path = path.with_name(path.name + COMPRESS_SUFFIXES[compress_format])
+
+    def sink(target: Path) -> BufferedWriter:
+        return _SyncedWriter(FileIO(target, "wb")) if fsync else open(target, "wb")
+
+    sinks: list[BinaryIO | ParallelCompressor] = []
+    paths: list[Path] = []
+    try:
+        if compress_to_gzip is not True:
+            paths.append(path)
+            sinks.append(sink(path))
+        if compress_to_gzip:
+            paths.append(compressed_path)
+            raw = sink(compressed_path)
+            try:
+                sinks.append(
+                    ParallelCompressor(
+                        raw,  # type: ignore[arg-type]
+                        compress_format,
+                        compress_level,
+                        workers,
+                        block_size,
+                    )
+                )
+            except BaseException:
+                raw.close()
+                raise
+    except BaseException:
+        for sink in sinks:
+            sink.close()
+        for created in paths:
+            created.unlink(missing_ok=True)
+        raise
+    return TeeWriter(sinks, paths, buffer_size)
+
+
+# Atomic and async writes
+##########################
+
+
+def _fsync_directory(path: Path) -> None:
+    """Persist a rename, directories can not be opened on Windows"""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_file(file: IO[Any]) -> None:
+    """
+    Flush an open file to disk, before it is closed and renamed
+
+    :param file: File open for writing
+    :type file: IO[Any]
+    """
+    file.flush()
+    os.fsync(file.fileno())
+
+
+class _SyncedWriter(BufferedWriter):
+    """Buffered file flushed to disk when closed"""
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            fsync_file(self)
+        finally:
+            super().close()
+
+
+def _temporary(path: Path) -> tuple[int, Path]:
+    """
+    Create an empty temporary file next to ``path``
+
+    Unlike ``tempfile``, the file is created with mode 0o666 and the umask
+    applied, as a plain open() would, so new files get the usual mode.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(TMP_MAX):
+        tmp = path.with_name(f".{path.name}.{token_hex(4)}.tmp")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No usable temporary name next to {path}")
+
+
+def replace_file(source: str | Path, target: str | Path, fsync: bool = True) -> Path:
+    """
+    Move a finished file over ``target`` atomically, both must be on the
+    same file system
+
+    The content is not flushed here: call :func:`fsync_file` on the file
+    before closing it, Windows can not fsync a read-only handle.
+
+    :param source: Finished file
+    :type source: str | Path
+    :param target: Path of the file
+    :type target: str | Path
+    :param fsync: Flush the rename to disk
+    :type fsync: bool
+    :return: Path of the file
+    :rtype: Path
+    """
+    target = Path(target)
+    try:
+        # keep the mode of the file being replaced
+        os.chmod(source, os.stat(target).st_mode & 0o777)
+    except FileNotFoundError:
+        pass
+    os.replace(source, target)
+    if fsync:
+        _fsync_directory(target.parent)
+    return target
+
+
+@contextmanager
+def atomic_write(
+    path: str | Path,
+    mode: Literal["w", "wb"] = "wb",
+    encoding: str | None = None,
+    fsync: bool = True,
+) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file next to ``path``, renamed over it once written
+
+    Readers see either the old file or the complete new one, never a partial
+    write. The temporary file is removed if the block raises.
+
+    :param path: Path of the file
+    :type path: str | Path
+    :param mode: ``"w"`` for text, ``"wb"`` for bytes
+    :type mode: Literal["w", "wb"]
+    :param encoding: Encoding in text mode. Defaults to UTF-8.
+    :type encoding: str | None
+    :param fsync: Flush the file and the rename to disk
+    :type fsync: bool
+    :return: The temporary file
+    :rtype: Iterator[IO[Any]]
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = _temporary(path)
+    try:
+        text_encoding = (encoding or "utf-8") if mode == "w" else None
+        with os.fdopen(fd, mode, encoding=text_encoding) as tmp:
+            yield tmp
+            if fsync:
+                fsync_file(tmp)
+        replace_file(name, path, fsync)
+    except BaseException:
+        name.unlink(missing_ok=True)
+        raise
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking serialization or disk I/O on the bounded I/O thread pool
+
+    :param func: Blocking function
+    :type func: Callable[..., T]
+    :return: Value returned by ``func``
+    :rtype: T
+    """
+    return await get_running_loop().run_in_executor(
+        _io_pool, partial(func, *args, **kwargs)
+    )
+
+
+def _write_file(
+    path: Path,
+    data: str | bytes | Callable[[IO[Any]], object],
+    encoding: str,
+    fsync: bool,
+) -> Path:
+    if isinstance(data, bytes):
+        with atomic_write(path, "wb", fsync=fsync) as file:
+            file.write(data)
+    else:
+        with atomic_write(path, "w", encoding, fsync) as file:
+            if isinstance(data, str):
+                file.write(data)
+            else:
+                data(file)
+    return path
+
+
+async def write_file(
+    path: str | Path,
+    data: str | bytes | Callable[[IO[Any]], object],
+    encoding: str = "utf-8",
+    fsync: bool = True,
+) -> Path:
+    """
+    Write a file atomically without blocking the event loop
+
+    :param path: Path of the file
+    :type path: str | Path
+    :param data: Content, or a function serializing into the text file
+    :type data: str | bytes | Callable[[IO[Any]], object]
+    :param encoding: Encoding of text content
+    :type encoding: str
+    :param fsync: Flush the file and the rename to disk
+    :type fsync: bool
+    :return: Path of the file
+    :rtype: Path
+    """
+    return await run_io(_write_file, Path(path), data, encoding, fsync)
+
+
+def save_output(
+    path: str | Path,
+    data: str | bytes | Callable[[IO[Any]], object],
+    mode: Literal["w", "wb"] = "wb",
+    encoding: str = "utf-8",
+    fsync: bool = True,
+    **options: Any,
+) -> list[Path]:
+    """
+    Write an export atomically through :func:`open_output`, blocking
+
+    See :func:`write_output` for the parameters.
+
+    :return: Paths of the written files
+    :rtype: list[Path]
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _temporary(path)
+    os.close(fd)
+    written: list[Path] = []
+    try:
+        with open_output(tmp, **options, fsync=fsync) as out:
+            written = out.paths
+            if isinstance(data, bytes):
+                out.write(data)
+            elif isinstance(data, str):
+                out.write(data.encode(encoding))
+            elif mode == "w":
+                text = TextIOWrapper(out, encoding=encoding, newline="")  # type: ignore[arg-type]
+                with text:
+                    data(text)
+            else:
+                data(out)
+        if tmp not in written:
+            tmp.unlink()
+        # compressed copies are named after the temporary file, plus their suffix
+        targets = [path.with_name(path.name + p.name[len(tmp.name) :]) for p in written]
+        for source, target in zip(written, targets):
+            replace_file(source, target, fsync)
+    except BaseException:
+        for created in {tmp, *written}:
+            created.unlink(missing_ok=True)
+        raise
+    if options.get("compress_to_gzip") is True:
+        # only the compressed copy is kept, drop the one left by earlier runs
+        path.unlink(missing_ok=True)
+    return targets
+
+
+async def write_output(
+    path: str | Path,
+    data: str | bytes | Callable[[IO[Any]], object],
+    mode: Literal["w", "wb"] = "wb",
+    encoding: str = "utf-8",
+    fsync: bool = True,
+    **options: Any,
+) -> list[Path]:
+    """
+    Write an export atomically through :func:`open_output`, without blocking
+    the event loop
+
+    Every file is written under a temporary name and renamed once complete.
+    With ``compress_to_gzip=True``, an uncompressed copy left by an earlier
+    run is removed.
+
+    :param path: Path of the uncompressed file
+    :type path: str | Path
+    :param data: Content, or a function serializing into the file
+    :type data: str | bytes | Callable[[IO[Any]], object]
+    :param mode: Whether a serializing function gets a text (``"w"``) or binary file
+    :type mode: Literal["w", "wb"]
+    :param encoding: Encoding of text content
+    :type encoding: str
+    :param fsync: Flush the files and the renames to disk
+    :type fsync: bool
+    :param options: Keyword arguments of :func:`open_output`, see
+        ``MalXmlSettings.output_options``
+    :type options: Any
+    :return: Paths of the written files
+    :rtype: list[Path]
+    """
+    return await run_io(save_output, path, data, mode, encoding, fsync, **options)
@@ -0,0 +1,140 @@
+"""
+Package resources, read through ``importlib.resources`` and kept in memory.
+
+Resources are addressed by their ``/``-separated path inside the bokusu
+package, e.g. ``services/anilist/anime_query.gql``, and are read the same
+way from a source tree, an installed wheel or a zipapp.
+"""
+
+import re
+from functools import lru_cache
+from importlib.resources import files
+from pathlib import Path
+
+try:
+    from importlib.resources.abc import Traversable
+except ImportError:  # pragma: no cover
+    from importlib.abc import Traversable  # Python 3.10
+
+PACKAGE = "bokusu"
+"""Package resources are looked up in"""
+
+CACHE_SIZE = 64
+"""Resources and queries kept in memory, least recently used are dropped first"""
+
+_GQL_TOKEN = re.compile(
+    r"""
+    (?P<ignored>[\s,\ufeff]+|\#[^\n\r]*)
+  | (?P<block>\"\"\"(?:\\\"\"\"|[^"]|"(?!""))*\"\"\")
+  | (?P<string>"(?:\\.|[^"\\\n\r])*")
+  | (?P<word>-?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<other>\.\.\.|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+"""GraphQL lexical tokens; commas, whitespace and comments are ignored tokens"""
+
+
+class ResourceNotFoundError(Exception):
+    """Exception raised when a resource is not found."""
+
+
+def _locate(path: str) -> Traversable:
+    """Resolve a resource path, raising if it is not a file"""
+    resource = files(PACKAGE)
+    for part in path.strip("/").split("/"):
+        resource = resource.joinpath(part)
+    if not resource.is_file():
+        raise ResourceNotFoundError(f"File '{path}' not found inside {PACKAGE} package.")
+    return resource
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def read_bytes(path: str) -> bytes:
+    """
+    Read a resource
+
+    :param path: Path inside the package, e.g. ``assets/logo.ans``
+    :type path: str
+    :return: Resource content
+    :rtype: bytes
+    :raises ResourceNotFoundError: If the resource does not exist
+    """
+    return _locate(path).read_bytes()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def read_text(path: str, encoding: str = "utf-8") -> str:
+    """
+    Read a text resource
+
+    :param path: Path inside the package, e.g. ``assets/logo.ans``
+    :type path: str
+    :param encoding: Text encoding
+    :type encoding: str
+    :return: Resource content
+    :rtype: str
+    :raises ResourceNotFoundError: If the resource does not exist
+    """
+    return read_bytes(path).decode(encoding)
+
+
+def resource_path(path: str) -> Path:
+    """
+    Filesystem path of a resource, for callers that need to open it themselves
+
+    :param path: Path inside the package
+    :type path: str
+    :return: Resource path
+    :rtype: Path
+    :raises ResourceNotFoundError: If the resource does not exist, or is
+        inside an archive and has no path of its own
+    """
+    resource = _locate(path)
+    if not isinstance(resource, Path):
+        raise ResourceNotFoundError(f"File '{path}' is packed in an archive, read it instead.")
+    return resource
+
+
+def minify_graphql(query: str) -> str:
+    """
+    Strip comments, commas and whitespace from a GraphQL document
+
+    Strings are kept verbatim, and a space is only kept between two names
+    or numbers, where it separates tokens.
+
+    :param query: GraphQL document
+    :type query: str
+    :return: Equivalent document
+    :rtype: str
+    """
+    out: list[str] = []
+    word = False
+    for match in _GQL_TOKEN.finditer(query):
+        kind = match.lastgroup
+        if kind == "ignored":
+            continue
+        if kind == "word" and word:
+            out.append(" ")
+        word = kind == "word"
+        out.append(match.group())
+    return "".join(out)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def load_query(path: str, *fragments: str) -> str:
+    """
+    Read a GraphQL query resource, minified to shrink request bodies
+
+    Fragments shared between queries live in their own resources and are
+    appended to the query, which must only spread them.
+
+    :param path: Path inside the package, e.g. ``services/anilist/anime_query.gql``
+    :type path: str
+    :param fragments: Paths of the fragment definitions the query uses
+    :type fragments: str
+    :return: Minified query, followed by its fragments
+    :rtype: str
+    :raises ResourceNotFoundError: If a resource does not exist
+    """
+    return minify_graphql("\n".join(read_text(part) for part in (path, *fragments)))
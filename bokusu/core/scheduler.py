@@ -0,0 +1,176 @@
+"""Asynchronous job scheduler with concurrency caps and rate-limit budgets."""
+
+from asyncio import Lock, Semaphore, gather, sleep
+from dataclasses import dataclass, field
+from time import monotonic
+from traceback import print_exc
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class RateLimit:
+    """Request budget of a service"""
+
+    requests: int
+    """Number of requests allowed per period, also the burst size"""
+    period: float
+    """Period length in seconds"""
+    min_interval: float = 0.0
+    """Minimum gap in seconds between two requests"""
+
+
+SERVICE_RATE_LIMITS: dict[str, RateLimit] = {
+    "anilist": RateLimit(requests=90, period=60.0),
+    "animeplanet": RateLimit(requests=30, period=60.0, min_interval=1.0),
+    "wayback": RateLimit(requests=1, period=6.0, min_interval=6.0),
+}
+"""Known rate limits: AniList allows 90 req/min, and the Wayback Machine needs
+a 6 second gap between captures. Anime-Planet goes through MAL-Scraper, kept
+polite. AniDB paces its own UDP packets, see ``ANIDB_FLOOD_LIMITS``."""
+
+
+class RateLimiter:
+    """Token bucket limiter, shared by every job of a service"""
+
+    def __init__(self, limit: RateLimit):
+        """
+        Initialize the limiter with a full bucket
+
+        :param limit: Request budget
+        :type limit: RateLimit
+        """
+        self.limit = limit
+        self.tokens = float(limit.requests)
+        self.updated = monotonic()
+        self.last_request: float | None = None
+        self._lock = Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request is allowed, then consume one token"""
+        async with self._lock:
+            while True:
+                now = monotonic()
+                rate = self.limit.requests / self.limit.period
+                self.tokens = min(
+                    float(self.limit.requests),
+                    self.tokens + (now - self.updated) * rate,
+                )
+                self.updated = now
+                wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / rate
+                if self.last_request is not None:
+                    gap = self.limit.min_interval - (now - self.last_request)
+                    wait = max(wait, gap)
+                if wait <= 0:
+                    self.tokens -= 1
+                    self.last_request = now
+                    return
+                await sleep(wait)
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:  # type: ignore
+        """Tokens are not given back, requests are counted when sent"""
+
+
+@dataclass
+class BackupJob:
+    """A unit of work for the scheduler"""
+
+    profile: str
+    """Profile name the job belongs to"""
+    service: str
+    """Service key, used to pick the rate limit"""
+    host: str
+    """Remote host, used for the per-host cap"""
+    name: str
+    """Human readable job name"""
+    run: Callable[[RateLimiter | None], Awaitable[Any]]
+    """Coroutine function, receives the service limiter to wrap each request"""
+
+
+@dataclass
+class JobResult:
+    """Outcome of a job"""
+
+    job: BackupJob
+    """The job"""
+    success: bool
+    """Whether the job finished without raising"""
+    result: Any = None
+    """Value returned by the job"""
+    error: BaseException | None = None
+    """Exception raised by the job"""
+    elapsed: float = 0.0
+    """Wall time in seconds, including time waiting for a slot"""
+
+
+@dataclass
+class BackupScheduler:
+    """Runs jobs concurrently under global, per-host and per-service limits"""
+
+    max_concurrency: int = 8
+    """Maximum number of jobs running at once"""
+    per_host: int = 2
+    """Maximum number of jobs running at once against the same host"""
+    rate_limits: dict[str, RateLimit] = field(
+        default_factory=lambda: dict(SERVICE_RATE_LIMITS)
+    )
+    """Rate limits per service, services without one are not throttled"""
+    jobs: list[BackupJob] = field(default_factory=list)
+    """Queued jobs"""
+
+    def __post_init__(self):
+        self._global = Semaphore(self.max_concurrency)
+        self._hosts: dict[str, Semaphore] = {}
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def add(self, job: BackupJob) -> None:
+        """
+        Queue a job
+
+        :param job: Job to queue
+        :type job: BackupJob
+        """
+        self.jobs.append(job)
+
+    def limiter(self, service: str) -> RateLimiter | None:
+        """
+        Get the shared limiter of a service
+
+        :param service: Service key
+        :type service: str
+        :return: Limiter, or None if the service has no rate limit
+        :rtype: RateLimiter | None
+        """
+        if service not in self._limiters:
+            limit = self.rate_limits.get(service)
+            if limit is None:
+                return None
+            self._limiters[service] = RateLimiter(limit)
+        return self._limiters[service]
+
+    async def _run_job(self, job: BackupJob) -> JobResult:
+        start = monotonic()
+        host = self._hosts.setdefault(job.host, Semaphore(self.per_host))
+        # wait for the host first, so jobs queued on a busy host hold no global slot
+        async with host, self._global:
+            try:
+                result = await job.run(self.limiter(job.service))
+            except Exception as err:
+                print_exc()
+                return JobResult(job, False, error=err, elapsed=monotonic() - start)
+        return JobResult(job, True, result=result, elapsed=monotonic() - start)
+
+    async def run(self) -> list[JobResult]:
+        """
+        Run every queued job and wait for all of them
+
+        A failing job does not stop the others.
+
+        :return: Results, in the order jobs were added
+        :rtype: list[JobResult]
+        """
+        jobs, self.jobs = self.jobs, []
+        return list(await gather(*(self._run_job(job) for job in jobs)))
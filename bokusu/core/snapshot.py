@@ -0,0 +1,318 @@
+"""Content-addressed, deduplicated snapshot store for backups."""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from hashlib import sha256
+from json import dump, load
+from pathlib import Path
+from random import Random
+from typing import Any, Iterator
+from zlib import compress, decompress
+
+from bokusu.core.folder import get_box_root
+from bokusu.core.output import atomic_write
+
+_np: Any = None
+
+
+def _numpy() -> Any:
+    """NumPy, imported on the first large input since importing it is slow"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            numpy = False  # type: ignore
+        _np = numpy
+    return _np or None
+
+
+_rng = Random(0x626F6B75)
+GEAR: list[int] = [_rng.getrandbits(32) for _ in range(256)]
+"""Gear table of the rolling hash, seeded so boundaries never change between runs"""
+
+HASH_BITS = 32
+"""Width of the rolling hash, the hash only depends on the last 32 bytes"""
+
+NUMPY_THRESHOLD = 1 << 16
+"""Minimum data size before boundaries are computed with NumPy"""
+
+
+def _boundary_mask(avg_size: int) -> int:
+    """Mask on the high bits of the hash, matching once every ``avg_size`` bytes"""
+    bits = max(avg_size.bit_length() - 1, 1)
+    return ((1 << bits) - 1) << (HASH_BITS - bits)
+
+
+def _candidates_python(data: bytes | memoryview, mask: int) -> Iterator[int]:
+    """Yield offsets right after a byte where the rolling hash matches the mask"""
+    gear = GEAR
+    full = (1 << HASH_BITS) - 1
+    hsh = 0
+    for index, byte in enumerate(data):
+        hsh = ((hsh << 1) + gear[byte]) & full
+        if not hsh & mask:
+            yield index + 1
+
+
+def _candidates_numpy(data: bytes | memoryview, mask: int) -> Iterator[int]:
+    """Same as ``_candidates_python``, vectorized over the 32 byte window"""
+    np = _numpy()
+    values = np.asarray(GEAR, dtype=np.uint32)[np.frombuffer(data, dtype=np.uint8)]
+    hsh = values.copy()
+    for shift in range(1, HASH_BITS):
+        hsh[shift:] += values[:-shift] << np.uint32(shift)
+    return iter((np.flatnonzero((hsh & np.uint32(mask)) == 0) + 1).tolist())
+
+
+def chunk_data(
+    data: bytes | memoryview,
+    avg_size: int = 16384,
+    min_size: int = 4096,
+    max_size: int = 65536,
+) -> Iterator[memoryview]:
+    """
+    Split data in content-defined chunks
+
+    Boundaries are placed where a Gear rolling hash of the last 32 bytes
+    matches a mask, so an edit only changes the chunks around it and the
+    rest of the data still deduplicates against older snapshots.
+
+    :param data: Data to split
+    :type data: bytes | memoryview
+    :param avg_size: Expected chunk size, rounded down to a power of two
+    :type avg_size: int
+    :param min_size: Minimum chunk size, except for the last chunk
+    :type min_size: int
+    :param max_size: Maximum chunk size
+    :type max_size: int
+    :return: Chunks, as views of ``data``
+    :rtype: Iterator[memoryview]
+    """
+    view = memoryview(data).cast("B")
+    mask = _boundary_mask(avg_size)
+    if len(view) >= NUMPY_THRESHOLD and _numpy() is not None:
+        candidates = _candidates_numpy(view, mask)
+    else:
+        candidates = _candidates_python(view, mask)
+    start = 0
+    for cut in candidates:
+        while cut - start > max_size:
+            yield view[start : start + max_size]
+            start += max_size
+        if cut - start >= min_size:
+            yield view[start:cut]
+            start = cut
+    while len(view) - start > max_size:
+        yield view[start : start + max_size]
+        start += max_size
+    if start < len(view):
+        yield view[start:]
+
+
+@dataclass
+class Manifest:
+    """A stored snapshot"""
+
+    source: str
+    """Name of the backed up file, e.g. ``default/anilist_anime.json``"""
+    snapshot_id: str
+    """Snapshot ID, sortable by creation time"""
+    created: str
+    """Creation time, in ISO 8601"""
+    size: int
+    """Size of the data in bytes"""
+    sha256: str
+    """SHA-256 of the data"""
+    chunks: list[str] = field(default_factory=list)
+    """SHA-256 of each chunk, in order"""
+    new_bytes: int = 0
+    """Size of the chunks that were not stored yet, 0 when loaded from disk"""
+
+
+class SnapshotStore:
+    """
+    Store of backup snapshots under the Bokusu root
+
+    Each snapshot is split with ``chunk_data``, chunks are stored once under
+    ``chunks/`` by their SHA-256 and compressed, and each run is recorded as
+    a small JSON manifest under ``manifests/<source>/``.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        avg_size: int = 16384,
+        min_size: int = 4096,
+        max_size: int = 65536,
+    ):
+        """
+        Initialize the store
+
+        :param root: Store directory. Defaults to ``<box root>/snapshots``.
+        :type root: Path | None
+        :param avg_size: Expected chunk size
+        :type avg_size: int
+        :param min_size: Minimum chunk size
+        :type min_size: int
+        :param max_size: Maximum chunk size
+        :type max_size: int
+        """
+        self.root = root or get_box_root() / "snapshots"
+        self.avg_size = avg_size
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.root / "chunks" / digest[:2] / digest
+
+    def _manifest_dir(self, source: str) -> Path:
+        return self.root / "manifests" / source
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        """Write a file atomically, readers never see a partial file"""
+        with atomic_write(path) as file:
+            file.write(data)
+
+    def save(self, source: str, data: bytes) -> Manifest:
+        """
+        Store a snapshot, only chunks not stored yet are written
+
+        :param source: Name of the backed up file
+        :type source: str
+        :param data: Content of the file
+        :type data: bytes
+        :return: Manifest of the snapshot
+        :rtype: Manifest
+        """
+        now = datetime.now(timezone.utc)
+        digests: list[str] = []
+        new_bytes = 0
+        for chunk in chunk_data(data, self.avg_size, self.min_size, self.max_size):
+            digest = sha256(chunk).hexdigest()
+            path = self._chunk_path(digest)
+            if not path.exists():
+                self._write(path, compress(chunk))
+                new_bytes += len(chunk)
+            digests.append(digest)
+        full = sha256(data).hexdigest()
+        manifest = Manifest(
+            source=source,
+            snapshot_id=f"{now:%Y%m%dT%H%M%S%fZ}-{full[:8]}",
+            created=now.isoformat(),
+            size=len(data),
+            sha256=full,
+            chunks=digests,
+            new_bytes=new_bytes,
+        )
+        record = asdict(manifest)
+        del record["new_bytes"]
+        path = self._manifest_dir(source) / f"{manifest.snapshot_id}.json"
+        with atomic_write(path, "w") as file:
+            dump(record, file)
+        return manifest
+
+    def save_file(self, source: str, path: Path | str) -> Manifest:
+        """
+        Store a snapshot of a file
+
+        :param source: Name of the backed up file
+        :type source: str
+        :param path: Path of the file
+        :type path: Path | str
+        :return: Manifest of the snapshot
+        :rtype: Manifest
+        """
+        with open(path, "rb") as file:
+            return self.save(source, file.read())
+
+    def snapshots(self, source: str) -> list[Manifest]:
+        """
+        List snapshots of a source, oldest first
+
+        :param source: Name of the backed up file
+        :type source: str
+        :return: Manifests
+        :rtype: list[Manifest]
+        """
+        folder = self._manifest_dir(source)
+        if not folder.is_dir():
+            return []
+        manifests: list[Manifest] = []
+        for path in sorted(folder.glob("*.json")):
+            with open(path, "r", encoding="utf-8") as file:
+                manifests.append(Manifest(**load(file)))
+        return manifests
+
+    def sources(self) -> list[str]:
+        """
+        List every source with at least one snapshot
+
+        :return: Source names
+        :rtype: list[str]
+        """
+        folder = self.root / "manifests"
+        if not folder.is_dir():
+            return []
+        return sorted(
+            {
+                path.parent.relative_to(folder).as_posix()
+                for path in folder.rglob("*.json")
+                if path.is_file()
+            }
+        )
+
+    def get(self, source: str, snapshot_id: str | None = None) -> Manifest:
+        """
+        Get a snapshot manifest
+
+        :param source: Name of the backed up file
+        :type source: str
+        :param snapshot_id: Snapshot ID. Defaults to the latest snapshot.
+        :type snapshot_id: str | None
+        :return: Manifest
+        :rtype: Manifest
+        :raises FileNotFoundError: If there is no such snapshot
+        """
+        manifests = self.snapshots(source)
+        if snapshot_id is None and manifests:
+            return manifests[-1]
+        for manifest in manifests:
+            if manifest.snapshot_id == snapshot_id:
+                return manifest
+        raise FileNotFoundError(f"No snapshot {snapshot_id or ''} for {source}")
+
+    def load(self, manifest: Manifest) -> bytes:
+        """
+        Rebuild the data of a snapshot
+
+        :param manifest: Manifest of the snapshot
+        :type manifest: Manifest
+        :return: Content of the file, byte for byte
+        :rtype: bytes
+        :raises ValueError: If the rebuilt data does not match its checksum
+        """
+        parts: list[bytes] = []
+        for digest in manifest.chunks:
+            with open(self._chunk_path(digest), "rb") as file:
+                parts.append(decompress(file.read()))
+        data = b"".join(parts)
+        if sha256(data).hexdigest() != manifest.sha256:
+            raise ValueError(f"Snapshot {manifest.snapshot_id} is corrupted")
+        return data
+
+    def restore(self, manifest: Manifest, target: Path | str) -> Path:
+        """
+        Restore a snapshot to a file
+
+        :param manifest: Manifest of the snapshot
+        :type manifest: Manifest
+        :param target: Path to write to
+        :type target: Path | str
+        :return: Path of the restored file
+        :rtype: Path
+        """
+        target = Path(target)
+        self._write(target, self.load(manifest))
+        return target
@@ -3,7 +3,7 @@
 from pathlib import Path
 from typing import Literal, Any, Union
 
-from pydantic import BaseModel, Field, HttpUrl, DirectoryPath
+from pydantic import BaseModel, Field, HttpUrl, DirectoryPath, model_validator
 from pydantic_extra_types.language_code import LanguageAlpha2
 
 # Base Class
@@ -29,6 +29,15 @@ class WaybackConfig(BaseModel):
     snap_homepage: bool = Field(
         default=False, description="Whether to snapshot homepage of the service too."
     )
+    skip_recent_hours: float = Field(
+        default=24,
+        ge=0,
+        description="Skip URLs captured less than this many hours ago. Set to 0 to always capture.",
+    )
+    check_availability: bool = Field(
+        default=False,
+        description="Whether to ask the Wayback Machine for its latest capture before submitting, to skip URLs someone else archived recently.",
+    )
 
 
 class MalXmlSettings(BaseModel):
@@ -55,6 +64,47 @@ class MalXmlSettings(BaseModel):
             "both",
         ],
     )
+    compress_level: int = Field(
+        default=6,
+        ge=1,
+        le=22,
+        description="Compression level, from 1 (fastest) to 9 (smallest) for gzip, or 22 for zstd.",
+    )
+    compress_format: Literal["gzip", "zstd"] = Field(
+        default="gzip",
+        description="Compression format. zstd requires the zstandard package.",
+    )
+    compress_workers: Union[int, None] = Field(
+        default=None,
+        ge=1,
+        description="Blocks compressed in parallel, on threads shared by every export. Defaults to the number of CPUs.",
+    )
+    buffer_size: int = Field(
+        default=65536,
+        ge=4096,
+        description="Bytes written to the output files at once.",
+    )
+
+    @model_validator(mode="after")
+    def _check_level(self) -> "MalXmlSettings":
+        if self.compress_format == "gzip" and self.compress_level > 9:
+            raise ValueError("gzip compression level must be from 1 to 9")
+        return self
+
+    def output_options(self) -> dict[str, Any]:
+        """
+        Keyword arguments of ``bokusu.core.output.open_output`` for these settings
+
+        :return: Output options
+        :rtype: dict[str, Any]
+        """
+        return {
+            "compress_to_gzip": self.compress_to_gzip,
+            "compress_level": self.compress_level,
+            "buffer_size": self.buffer_size,
+            "compress_format": self.compress_format,
+            "workers": self.compress_workers,
+        }
 
 
 # Base Fields
@@ -106,6 +156,10 @@ AniListExports = Literal["automail-json", "json", "rymsf-yaml", "malxml", "all"]
 class AniListConfig(BaseServiceConfig):
     """AniList configuration."""
 
+    username: Union[str, None] = Field(
+        default=None,
+        description="Username. By default, the owner of the access token.",
+    )
     client: AniListClient = Field(..., description="AniList client configuration.")
     credentials: AniListCredentials = Field(..., description="AniList credentials.")
     exports: Union[list[AniListExports], AniListExports] = Field(
@@ -117,6 +171,10 @@ class AniListConfig(BaseServiceConfig):
         ],
     )
     malxml_settings: Union[MalXmlSettings, None] = MalXMLField
+    incremental: bool = Field(
+        default=False,
+        description="Only fetch entries updated since the last backup and merge them into it.",
+    )
 
     def __init__(self, **data: dict[str, Any]):
         super().__init__(**data)  # type: ignore
@@ -146,11 +204,6 @@ class AnimePlanetConfig(BaseServiceConfig):
         if self.override_useragent is not None:
             self.override_useragent = self.override_useragent.strip()
 
-    def __init__(self, **data: dict[str, Any]):
-        super().__init__(**data)  # type: ignore
-        if isinstance(self.exports, str):
-            self.exports = [self.exports]
-
 
 # Annict Config
 ################
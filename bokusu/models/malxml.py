@@ -3,8 +3,40 @@
 from dataclasses import dataclass as dcls
 from datetime import datetime as dtm
 from enum import Enum
+from functools import lru_cache
+from io import TextIOBase
+from pathlib import Path
+from typing import BinaryIO, ClassVar, Iterable, Iterator, Literal, TextIO
+
+from bokusu.core.output import (
+    DEFAULT_BUFFER_SIZE,
+    DEFAULT_COMPRESS_LEVEL,
+    CompressFormat,
+    open_output,
+)
+from bokusu.models.xml import XML, Tag, TagTemplate
+
+################################################################################
+# SHARED HELPERS
+################################################################################
+
+
+@lru_cache(maxsize=4096)
+def _strftime(date: dtm) -> str:
+    return date.strftime("%Y-%m-%d")
+
+
+def format_date(date: dtm | None) -> str:
+    """
+    Formats a date for MAL XML, caching the result as lists share many dates.
+
+    :param date: The date.
+    :type date: datetime | None
+    :return: The formatted date, or ``0000-00-00`` if unset.
+    :rtype: str
+    """
+    return _strftime(date) if date else "0000-00-00"
 
-from bokusu.models.xml import XML, Tag
 
 ################################################################################
 # SHARED ENUMS
@@ -422,63 +454,91 @@ class Anime:
     my_sns: PostToSNS = PostToSNS.DEFAULT
     """The user's SNS settings."""
 
+    _template: ClassVar[TagTemplate] = TagTemplate(
+        "anime",
+        (
+            "series_animedb_id",
+            "series_title",
+            "series_type",
+            "series_episodes",
+            "my_id",
+            "my_watched_episodes",
+            "my_start_date",
+            "my_finish_date",
+            "my_score",
+            "my_status",
+            "my_rated",
+            "my_storage",
+            "my_storage_value",
+            "my_comments",
+            "my_times_watched",
+            "my_rewatch_value",
+            "my_rewatching",
+            "my_rewatching_ep",
+            "my_priority",
+            "my_tags",
+            "my_discuss",
+            "my_sns",
+            "update_on_import",
+        ),
+        cdata=("series_title", "my_comments", "my_tags"),
+    )
+    """Compiled field layout, shared by every entry."""
+
+    def _values(self) -> tuple[str, ...]:
+        """
+        Converts an anime entry to the text of each field, in template order.
+
+        :return: The field values.
+        :rtype: tuple[str, ...]
+        """
+        return (
+            str(self.series_animedb_id),
+            self.series_title or "",
+            self.series_type.value if self.series_type else "",
+            str(self.series_episodes or ""),
+            str(self.my_id),
+            str(self.my_watched_episodes),
+            format_date(self.my_start_date),
+            format_date(self.my_finish_date),
+            str(self.my_score),
+            self.my_status.value,
+            self.my_rated or "",
+            self.my_storage.value if self.my_storage else "",
+            str(self.my_storage_value or 0.00),
+            self.my_comments,
+            str(self.my_times_watched),
+            self.my_rewatch_value.value if self.my_rewatch_value else "",
+            "1" if self.my_rewatching else "0",
+            str(self.my_rewatching_ep),
+            self.my_priority.value if self.my_priority else "",
+            ",".join(self.my_tags) if self.my_tags else "",
+            "1" if self.my_discuss else "0",
+            self.my_sns.value,
+            "1" if self.update_on_import else "0",
+        )
+
     @property
     def as_tag(self) -> Tag:
         """
         Converts an anime entry to a MAL XML tag.
 
-        :param anime: The anime entry.
-        :type anime: Anime
         :return: The MAL XML tag.
         :rtype: Tag
         """
-        anime_tag = Tag("anime")
+        return self._template.as_tag(self._values())
 
-        fields = [
-            ("series_animedb_id", str(self.series_animedb_id)),
-            ("series_title", self.series_title or ""),
-            ("series_type", self.series_type.value if self.series_type else ""),
-            ("series_episodes", str(self.series_episodes or "")),
-            ("my_id", str(self.my_id)),
-            ("my_watched_episodes", str(self.my_watched_episodes)),
-            (
-                "my_start_date",
-                self.my_start_date.strftime("%Y-%m-%d")
-                if self.my_start_date
-                else "0000-00-00",
-            ),
-            (
-                "my_finish_date",
-                self.my_finish_date.strftime("%Y-%m-%d")
-                if self.my_finish_date
-                else "0000-00-00",
-            ),
-            ("my_score", str(self.my_score)),
-            ("my_status", self.my_status.value),
-            ("my_rated", self.my_rated or ""),
-            ("my_storage", self.my_storage.value if self.my_storage else ""),
-            ("my_storage_value", str(self.my_storage_value or 0.00)),
-            ("my_comments", self.my_comments),
-            ("my_times_watched", str(self.my_times_watched)),
-            (
-                "my_rewatch_value",
-                self.my_rewatch_value.value if self.my_rewatch_value else "",
-            ),
-            ("my_rewatching", "1" if self.my_rewatching else "0"),
-            ("my_rewatching_ep", str(self.my_rewatching_ep)),
-            ("my_priority", self.my_priority.value if self.my_priority else ""),
-            ("my_tags", ",".join(self.my_tags) if self.my_tags else ""),
-            ("my_discuss", "1" if self.my_discuss else "0"),
-            ("my_sns", self.my_sns.value),
-            ("update_on_import", "1" if self.update_on_import else "0"),
-        ]
+    @property
+    def as_string(self) -> str:
+        """
+        Converts an anime entry to a MAL XML string in a single pass.
 
-        req_cdata = ["series_title", "my_comments", "my_tags"]
-        """Fields that require to be wrapped in CDATA."""
-        for field, value in fields:
-            anime_tag.add_child(Tag(field, value, cdata=field in req_cdata))
+        Byte-identical to ``as_tag.to_string()``, without building the tags.
 
-        return anime_tag
+        :return: The MAL XML string.
+        :rtype: str
+        """
+        return self._template.render(self._values())
 
 
 ################################################################################
@@ -600,63 +660,91 @@ class Manga:
     my_sns: PostToSNS = PostToSNS.DEFAULT
     """The user's SNS settings."""
 
+    _template: ClassVar[TagTemplate] = TagTemplate(
+        "manga",
+        (
+            "manga_mangadb_id",
+            "manga_title",
+            "manga_volumes",
+            "manga_chapters",
+            "my_id",
+            "my_read_volumes",
+            "my_read_chapters",
+            "my_start_date",
+            "my_finish_date",
+            "my_score",
+            "my_status",
+            "my_scanlation_group",
+            "my_storage",
+            "my_retail_volumes",
+            "my_comments",
+            "my_times_read",
+            "my_reread_value",
+            "my_rereading",
+            "my_priority",
+            "my_tags",
+            "my_discuss",
+            "my_sns",
+            "update_on_import",
+        ),
+        cdata=("manga_title", "my_comments", "my_scanlation_group", "my_tags"),
+    )
+    """Compiled field layout, shared by every entry."""
+
+    def _values(self) -> tuple[str, ...]:
+        """
+        Converts a manga entry to the text of each field, in template order.
+
+        :return: The field values.
+        :rtype: tuple[str, ...]
+        """
+        return (
+            str(self.manga_mangadb_id),
+            self.manga_title or "",
+            str(self.manga_volumes or ""),
+            str(self.manga_chapters or ""),
+            str(self.my_id),
+            str(self.my_read_volumes),
+            str(self.my_read_chapters),
+            format_date(self.my_start_date),
+            format_date(self.my_finish_date),
+            str(self.my_score),
+            self.my_status.value,
+            self.my_scanlation_group,
+            self.my_storage.value if self.my_storage else "",
+            str(self.my_retail_volumes),
+            self.my_comments,
+            str(self.my_times_read),
+            self.my_reread_value.value if self.my_reread_value else "",
+            "YES" if self.my_rereading else "NO",
+            self.my_priority.value if self.my_priority else "",
+            ",".join(self.my_tags) if self.my_tags else "",
+            "YES" if self.my_discuss else "NO",
+            self.my_sns.value,
+            "1" if self.update_on_import else "0",
+        )
+
     @property
     def as_tag(self) -> Tag:
         """
         Converts a manga entry to a MAL XML tag.
 
-        :param manga: The manga entry.
-        :type manga: Manga
         :return: The MAL XML tag.
         :rtype: Tag
         """
-        manga_tag = Tag("manga")
+        return self._template.as_tag(self._values())
 
-        fields = [
-            ("manga_mangadb_id", str(self.manga_mangadb_id)),
-            ("manga_title", self.manga_title or ""),
-            ("manga_volumes", str(self.manga_volumes or "")),
-            ("manga_chapters", str(self.manga_chapters or "")),
-            ("my_id", str(self.my_id)),
-            ("my_read_volumes", str(self.my_read_volumes)),
-            ("my_read_chapters", str(self.my_read_chapters)),
-            (
-                "my_start_date",
-                self.my_start_date.strftime("%Y-%m-%d")
-                if self.my_start_date
-                else "0000-00-00",
-            ),
-            (
-                "my_finish_date",
-                self.my_finish_date.strftime("%Y-%m-%d")
-                if self.my_finish_date
-                else "0000-00-00",
-            ),
-            ("my_score", str(self.my_score)),
-            ("my_status", self.my_status.value),
-            ("my_scanlation_group", self.my_scanlation_group),
-            ("my_storage", self.my_storage.value if self.my_storage else ""),
-            ("my_retail_volumes", str(self.my_retail_volumes)),
-            ("my_comments", self.my_comments),
-            ("my_times_read", str(self.my_times_read)),
-            (
-                "my_reread_value",
-                self.my_reread_value.value if self.my_reread_value else "",
-            ),
-            ("my_rereading", "YES" if self.my_rereading else "NO"),
-            ("my_priority", self.my_priority.value if self.my_priority else ""),
-            ("my_tags", ",".join(self.my_tags) if self.my_tags else ""),
-            ("my_discuss", "YES" if self.my_discuss else "NO"),
-            ("my_sns", self.my_sns.value),
-            ("update_on_import", "1" if self.update_on_import else "0"),
-        ]
+    @property
+    def as_string(self) -> str:
+        """
+        Converts a manga entry to a MAL XML string in a single pass.
 
-        req_cdata = ["manga_title", "my_comments", "my_scanlation_group", "my_tags"]
-        """Fields that require to be wrapped in CDATA."""
-        for field, value in fields:
-            manga_tag.add_child(Tag(field, value, cdata=field in req_cdata))
+        Byte-identical to ``as_tag.to_string()``, without building the tags.
 
-        return manga_tag
+        :return: The MAL XML string.
+        :rtype: str
+        """
+        return self._template.render(self._values())
 
 
 ################################################################################
@@ -670,8 +758,8 @@ class MalXML:
 
     user: AnimeMyStatus | MangaMyStatus
     """The user's status."""
-    entries: list[Anime | Manga]
-    """The user's entries."""
+    entries: Iterable[Anime | Manga]
+    """The user's entries. Pass a generator to keep memory usage constant when streaming."""
 
     @property
     def as_xml(self) -> XML:
@@ -693,3 +781,79 @@ class MalXML:
         xml.add_child(mal)
 
         return xml
+
+    def iter_string(self) -> Iterator[str]:
+        """
+        Serializes the export incrementally, one entry at a time.
+
+        Only one entry's tag is alive at any time, so the whole document is
+        never held in memory. Joining the chunks is byte-identical to
+        ``as_xml.to_string()``.
+
+        :return: Iterator of XML chunks.
+        :rtype: Iterator[str]
+        """
+        root = Tag("myanimelist")
+
+        yield XML().declaration
+        yield root.start_tag
+        yield self.user.as_tag.to_string()
+        for entry in self.entries:
+            yield entry.as_string
+        yield root.end_tag
+
+    def write_to(self, fileobj: TextIO | BinaryIO, encoding: str = "utf-8") -> None:
+        """
+        Writes the export to a file-like object incrementally.
+
+        :param fileobj: Text or binary file-like object, e.g. ``open(..., "w")``
+            or ``gzip.open(..., "wb")``.
+        :type fileobj: TextIO | BinaryIO
+        :param encoding: Encoding used when ``fileobj`` is binary.
+        :type encoding: str
+        """
+        if isinstance(fileobj, TextIOBase):
+            for chunk in self.iter_string():
+                fileobj.write(chunk)
+            return
+        for chunk in self.iter_string():
+            fileobj.write(chunk.encode(encoding))  # type: ignore
+
+    def save(
+        self,
+        path: str | Path,
+        compress_to_gzip: Literal["both"] | bool = False,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        compress_format: CompressFormat = "gzip",
+        compress_workers: int | None = None,
+    ) -> list[Path]:
+        """
+        Saves the export, serialized once even when writing both XML and a
+        compressed copy, which is compressed in parallel blocks.
+
+        :param path: Path of the uncompressed XML.
+        :type path: str | Path
+        :param compress_to_gzip: ``MalXmlSettings.compress_to_gzip``.
+        :type compress_to_gzip: Literal["both"] | bool
+        :param compress_level: Compression level, 1 to 9 for gzip, or 22 for zstd.
+        :type compress_level: int
+        :param buffer_size: Bytes written to the files at once.
+        :type buffer_size: int
+        :param compress_format: Compression format, gzip or zstd.
+        :type compress_format: CompressFormat
+        :param compress_workers: Blocks compressed at once. Defaults to the number of CPUs.
+        :type compress_workers: int | None
+        :return: Paths of the written files.
+        :rtype: list[Path]
+        """
+        with open_output(
+            path,
+            compress_to_gzip,
+            compress_level,
+            buffer_size,
+            compress_format,
+            compress_workers,
+        ) as out:
+            self.write_to(out)
+        return out.paths
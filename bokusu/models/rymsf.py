@@ -1,12 +1,25 @@
+from collections import Counter
 from datetime import datetime
 from datetime import time as dt_tm
 from datetime import timezone as dt_tz
 from enum import Enum
-from typing import Any, Literal
-from fractions import Fraction as Frac
+from itertools import islice
+from json import load as json_load
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Literal, Sequence, TextIO
 
 from pydantic import BaseModel, ConfigDict, Field
+from yaml import load as yaml_load
+from yaml.composer import Composer
+from yaml.events import (
+    MappingEndEvent,
+    MappingStartEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+    StreamEndEvent,
+)
 
+from bokusu.core.codec import JsonStream
 from bokusu.models.malxml import (
     Anime,
     AnimeStatus,
@@ -24,6 +37,16 @@ from bokusu.models.malxml import (
 )
 from bokusu.models.malxml import Priority as MALPriority
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore
+
 
 class MediaType(str, Enum):
     """List of allowed media type"""
@@ -79,6 +102,10 @@ class Date(BaseModel):
 class ExtendedDate(Date):
     """Extended date and time"""
 
+    model_config = ConfigDict(  # type: ignore
+        arbitrary_types_allowed=True,
+    )
+
     season: Season | None = Field(None, description="Season of the year")
     time: dt_tm | None = Field(None, description="Time of the day")
     timezone: dt_tz | None = Field(None, description="Timezone")
@@ -189,150 +216,20 @@ class MediaEntry(BaseModel):
 
     @property
     def to_malxml(self) -> Anime | Manga:
-        title = self.title.transliterated or self.title.native
-        mal_id = self.mappings.get("myanimelist", None) if self.mappings else None
-        mal_id = int(mal_id) if mal_id else 0  # type: ignore
-        score = self.score.value if self.score.value else 0
-        # calculate scores based on maximum score allowed by platform
-        # 5 max > 0, 2, 4, 6, 8, 10
-        # 100 max > 0..10 # divide by 10
-        # 10 max > 0..10
-        # 3 max > 0, 3, 6, 10
-        score_mx = self.score.maximum if self.score.maximum else 0
-        if score_mx != 3:
-            score = Frac(f'{score}') / Frac(f'{score_mx}') * 10
-            score = round(float(score))
-        else:
-            scores = (0, 3, 6, 10)
-            score = int(scores[score])  # type: ignore
-        if isinstance(self.tags, str):
-            self.tags = [self.tags]
+        """
+        Convert the entry to a MAL XML entry
+
+        Use ``MalXmlConverter`` or ``convert_to_malxml`` for whole lists.
+
+        :return: MAL XML entry
+        :rtype: Anime | Manga
+        """
+        score = normalize_scores([self.score])[0]
         if self.type == MediaType.animation:
-            status = {
-                UserEntryStatus.current: AnimeStatus.WATCHING,
-                UserEntryStatus.completed: AnimeStatus.COMPLETED,
-                UserEntryStatus.dropped: AnimeStatus.DROPPED,
-                UserEntryStatus.paused: AnimeStatus.ON_HOLD,
-                UserEntryStatus.planned: AnimeStatus.PLAN_TO_WATCH,
-                UserEntryStatus.repeat: AnimeStatus.COMPLETED,
-            }
-            final_status = status.get(self.status, AnimeStatus.PLAN_TO_WATCH)
-            episodes = (
-                self.progress.episode
-                if isinstance(self.progress, VideoProgress)
-                else None
-            )
-            episodes = episodes or 0
-            ueps = (
-                self.upstream_progress.episode
-                if isinstance(self.upstream_progress, VideoProgress)
-                else None
-            )
-            ueps = ueps or 0
-            if self.priority == Priority.very_low or not self.priority:
-                self.priority = Priority.low
-            elif self.priority == Priority.very_high:
-                self.priority = Priority.high
-
-            return Anime(
-                my_comments=self.notes or "",
-                my_discuss=False,
-                my_finish_date=self.date.finish,
-                my_id=0,
-                my_priority=MALPriority.from_str(self.priority),
-                my_rated=None,
-                my_rewatch_value=ReplayValue.from_str(self.replaylikelihood)
-                if self.replaylikelihood
-                else None,
-                my_rewatching_ep=0,
-                my_rewatching=self.status == UserEntryStatus.repeat,
-                my_score=score,
-                my_sns=PostToSNS.DISALLOW if self.is_private else PostToSNS.DEFAULT,
-                my_start_date=self.date.start,
-                my_status=final_status,
-                my_storage_value=0.00,
-                my_storage=AnimeStorageMedium.from_str(self.storage_medium)
-                if self.storage_medium
-                else None,
-                my_tags=self.tags,
-                my_times_watched=self.repeat_count or 0,
-                my_watched_episodes=episodes,
-                series_animedb_id=mal_id,
-                series_episodes=ueps,
-                series_title=title,
-                series_type=AnimeType.from_str(self.subtype) if self.subtype else None,
-                update_on_import=True,
-            )
-        elif self.type in [MediaType.comic, MediaType.book]:
-            status = {
-                UserEntryStatus.current: MangaStatus.READING,
-                UserEntryStatus.completed: MangaStatus.COMPLETED,
-                UserEntryStatus.dropped: MangaStatus.DROPPED,
-                UserEntryStatus.paused: MangaStatus.ON_HOLD,
-                UserEntryStatus.planned: MangaStatus.PLAN_TO_READ,
-                UserEntryStatus.repeat: MangaStatus.COMPLETED,
-            }
-            final_status = status.get(self.status, MangaStatus.PLAN_TO_READ)
-            chapters = (
-                self.progress.chapter
-                if isinstance(self.progress, BookProgress)
-                else None
-            )
-            chapters = chapters or 0
-            volumes = (
-                self.progress.volume
-                if isinstance(self.progress, BookProgress)
-                else None
-            )
-            volumes = volumes or 0
-            uchs = (
-                self.upstream_progress.chapter
-                if isinstance(self.upstream_progress, BookProgress)
-                else None
-            )
-            uchs = uchs or 0
-            uvols = (
-                self.upstream_progress.volume
-                if isinstance(self.upstream_progress, BookProgress)
-                else None
-            )
-            uvols = uvols or 0
-            if self.priority == Priority.very_low or not self.priority:
-                self.priority = Priority.low
-            elif self.priority == Priority.very_high:
-                self.priority = Priority.high
-
-            return Manga(
-                manga_chapters=chapters,
-                manga_mangadb_id=mal_id,
-                manga_title=title,
-                manga_volumes=uvols,
-                my_comments=self.notes or "",
-                my_discuss=False,
-                my_finish_date=self.date.finish,
-                my_id=0,
-                my_priority=MALPriority.from_str(self.priority),
-                my_read_chapters=uchs,
-                my_read_volumes=volumes,
-                my_reread_value=ReplayValue.from_str(self.replaylikelihood)
-                if self.replaylikelihood
-                else None,
-                my_rereading=self.status == UserEntryStatus.repeat,
-                my_retail_volumes=0,
-                my_scanlation_group="",
-                my_score=score,
-                my_sns=PostToSNS.DISALLOW if self.is_private else PostToSNS.DEFAULT,
-                my_start_date=self.date.start,
-                my_status=final_status,
-                my_storage=MangaStorageMedium.from_str(self.storage_medium)
-                if self.storage_medium
-                else None,
-                my_tags=self.tags,
-                my_times_read=self.repeat_count or 0,
-                update_on_import=True,
-            )
-        else:
-            raise ValueError("Media type is not defined")
+            return _to_anime(self, score)
+        if self.type in MANGA_MEDIA_TYPES:
+            return _to_manga(self, score)
+        raise ValueError("Media type is not defined")
 
 
 class Header(BaseModel):
@@ -358,61 +255,317 @@ class Header(BaseModel):
     )
 
 
-def convert_to_malxml(data: list[MediaEntry]) -> MalXML:
-    """Convert data to MALXML"""
-    childs: list[Anime | Manga] = []
-    mtype: MediaType | None = None
-    totals = {
-        UserEntryStatus.current: 0,
-        UserEntryStatus.completed: 0,
-        UserEntryStatus.dropped: 0,
-        UserEntryStatus.paused: 0,
-        UserEntryStatus.planned: 0,
-        UserEntryStatus.repeat: 0,
-    }
-    head: AnimeMyStatus | MangaMyStatus | None = None
-    for entry in data:
-        if len(childs) > 1:
-            # check if media type is same with previous entry
-            if isinstance(childs[-1], Anime) and entry.type == MediaType.animation:
-                childs.append(entry.to_malxml)
-                mtype = MediaType.animation
-                totals[entry.status] += 1
-            elif isinstance(childs[-1], Manga) and entry.type in [
-                MediaType.comic,
-                MediaType.book,
-            ]:
-                childs.append(entry.to_malxml)
-                mtype = MediaType.comic
-                totals[entry.status] += 1
-            else:
-                raise ValueError("Media type is different from previous entry")
-    if mtype == MediaType.animation:
-        head = AnimeMyStatus(
-            user_export_type=ExportType.ANIME,
-            user_total_anime=len(data),
-            user_total_watching=totals[UserEntryStatus.current],
-            user_total_completed=totals[UserEntryStatus.completed]
-            + totals[UserEntryStatus.repeat],
-            user_total_onhold=totals[UserEntryStatus.paused],
-            user_total_dropped=totals[UserEntryStatus.dropped],
-            user_total_plantowatch=totals[UserEntryStatus.planned],
-        )
-    elif mtype in [MediaType.comic, MediaType.book]:
-        head = MangaMyStatus(
-            user_export_type=ExportType.MANGA,
-            user_total_manga=len(data),
-            user_total_reading=totals[UserEntryStatus.current],
-            user_total_completed=totals[UserEntryStatus.completed]
-            + totals[UserEntryStatus.repeat],
-            user_total_onhold=totals[UserEntryStatus.paused],
-            user_total_dropped=totals[UserEntryStatus.dropped],
-            user_total_plantoread=totals[UserEntryStatus.planned],
+# MAL XML conversion
+#####################
+
+ANIME_STATUS: dict[UserEntryStatus, AnimeStatus] = {
+    UserEntryStatus.current: AnimeStatus.WATCHING,
+    UserEntryStatus.completed: AnimeStatus.COMPLETED,
+    UserEntryStatus.dropped: AnimeStatus.DROPPED,
+    UserEntryStatus.paused: AnimeStatus.ON_HOLD,
+    UserEntryStatus.planned: AnimeStatus.PLAN_TO_WATCH,
+    UserEntryStatus.repeat: AnimeStatus.COMPLETED,
+}
+"""RYMSF entry status to MAL anime status"""
+
+MANGA_STATUS: dict[UserEntryStatus, MangaStatus] = {
+    UserEntryStatus.current: MangaStatus.READING,
+    UserEntryStatus.completed: MangaStatus.COMPLETED,
+    UserEntryStatus.dropped: MangaStatus.DROPPED,
+    UserEntryStatus.paused: MangaStatus.ON_HOLD,
+    UserEntryStatus.planned: MangaStatus.PLAN_TO_READ,
+    UserEntryStatus.repeat: MangaStatus.COMPLETED,
+}
+"""RYMSF entry status to MAL manga status"""
+
+MAL_PRIORITY: dict[Priority, MALPriority] = {
+    Priority.very_low: MALPriority.LOW,
+    Priority.low: MALPriority.LOW,
+    Priority.medium: MALPriority.MEDIUM,
+    Priority.high: MALPriority.HIGH,
+    Priority.very_high: MALPriority.HIGH,
+}
+"""RYMSF priority to MAL priority, MAL only has 3 levels"""
+
+REPLAY_VALUE: dict[Priority, ReplayValue] = {
+    Priority.very_low: ReplayValue.VLOW,
+    Priority.low: ReplayValue.LOW,
+    Priority.medium: ReplayValue.MEDIUM,
+    Priority.high: ReplayValue.HIGH,
+    Priority.very_high: ReplayValue.VHIGH,
+}
+"""RYMSF replay likelihood to MAL replay value"""
+
+MANGA_MEDIA_TYPES = (MediaType.comic, MediaType.book)
+"""Media types exported as MAL manga"""
+
+THREE_POINT_SCORES = (0, 3, 6, 10)
+"""MAL score for each value of a 3-point score system"""
+
+NUMPY_THRESHOLD = 512
+"""Minimum batch size before scores are normalized with NumPy"""
+
+
+def normalize_scores(scores: Sequence[Score | None]) -> list[int]:
+    """
+    Normalize a column of scores to MAL's 0..10 scale
+
+    Scores are scaled by the maximum allowed by the platform:
+    5 max > 0, 2, 4, 6, 8, 10; 100 max > 0..10; 10 max > 0..10;
+    3 max > 0, 3, 6, 10. Unscored entries, or entries without a maximum,
+    are 0. Large batches are computed with NumPy when it is installed.
+
+    :param scores: Scores of each entry
+    :type scores: Sequence[Score | None]
+    :return: MAL scores, in the same order
+    :rtype: list[int]
+    """
+    values = [(score.value or 0) if score else 0 for score in scores]
+    maximums = [(score.maximum or 0) if score else 0 for score in scores]
+    if np is not None and len(values) >= NUMPY_THRESHOLD:
+        vals = np.asarray(values, dtype=np.float64)
+        maxs = np.asarray(maximums, dtype=np.float64)
+        scaled = np.rint(
+            np.divide(vals * 10, maxs, out=np.zeros_like(vals), where=maxs > 0)
         )
-    else:
+        three = maxs == 3
+        if three.any():
+            index = np.clip(vals[three].astype(np.int64), 0, 3)
+            scaled[three] = np.asarray(THREE_POINT_SCORES)[index]
+        return scaled.astype(np.int64).tolist()
+    normalized: list[int] = []
+    for value, maximum in zip(values, maximums):
+        if maximum == 3:
+            normalized.append(THREE_POINT_SCORES[min(max(int(value), 0), 3)])
+        elif maximum:
+            # round half to even, same as NumPy's rint
+            normalized.append(round(value * 10 / maximum))
+        else:
+            normalized.append(0)
+    return normalized
+
+
+def _mal_id(entry: MediaEntry) -> int:
+    """Get MyAnimeList ID from entry mappings, 0 if unmapped"""
+    mal_id = entry.mappings.get("myanimelist", None) if entry.mappings else None
+    return int(mal_id) if mal_id else 0  # type: ignore
+
+
+def _tags(entry: MediaEntry) -> list[str] | None:
+    """Get entry tags as a list"""
+    return [entry.tags] if isinstance(entry.tags, str) else entry.tags
+
+
+def _to_anime(entry: MediaEntry, score: int) -> Anime:
+    """
+    Convert an animation entry to MAL XML anime
+
+    :param entry: RYMSF entry
+    :type entry: MediaEntry
+    :param score: Normalized MAL score
+    :type score: int
+    :return: MAL XML anime
+    :rtype: Anime
+    """
+    progress = entry.progress if isinstance(entry.progress, VideoProgress) else None
+    upstream = (
+        entry.upstream_progress
+        if isinstance(entry.upstream_progress, VideoProgress)
+        else None
+    )
+    return Anime(
+        my_comments=entry.notes or "",
+        my_discuss=False,
+        my_finish_date=entry.date.finish,
+        my_id=0,
+        my_priority=MAL_PRIORITY.get(entry.priority, MALPriority.LOW),  # type: ignore
+        my_rated=None,
+        my_rewatch_value=REPLAY_VALUE[entry.replaylikelihood]
+        if entry.replaylikelihood
+        else None,
+        my_rewatching_ep=0,
+        my_rewatching=entry.status == UserEntryStatus.repeat,
+        my_score=score,
+        my_sns=PostToSNS.DISALLOW if entry.is_private else PostToSNS.DEFAULT,
+        my_start_date=entry.date.start,
+        my_status=ANIME_STATUS.get(entry.status, AnimeStatus.PLAN_TO_WATCH),
+        my_storage_value=0.00,
+        my_storage=AnimeStorageMedium.from_str(entry.storage_medium)
+        if entry.storage_medium
+        else None,
+        my_tags=_tags(entry),
+        my_times_watched=entry.repeat_count or 0,
+        my_watched_episodes=(progress.episode if progress else None) or 0,
+        series_animedb_id=_mal_id(entry),
+        series_episodes=(upstream.episode if upstream else None) or 0,
+        series_title=entry.title.transliterated or entry.title.native,
+        series_type=AnimeType.from_str(entry.subtype) if entry.subtype else None,
+        update_on_import=True,
+    )
+
+
+def _to_manga(entry: MediaEntry, score: int) -> Manga:
+    """
+    Convert a comic or book entry to MAL XML manga
+
+    :param entry: RYMSF entry
+    :type entry: MediaEntry
+    :param score: Normalized MAL score
+    :type score: int
+    :return: MAL XML manga
+    :rtype: Manga
+    """
+    progress = entry.progress if isinstance(entry.progress, BookProgress) else None
+    upstream = (
+        entry.upstream_progress
+        if isinstance(entry.upstream_progress, BookProgress)
+        else None
+    )
+    return Manga(
+        manga_chapters=(upstream.chapter if upstream else None) or 0,
+        manga_mangadb_id=_mal_id(entry),
+        manga_title=entry.title.transliterated or entry.title.native,
+        manga_volumes=(upstream.volume if upstream else None) or 0,
+        my_comments=entry.notes or "",
+        my_discuss=False,
+        my_finish_date=entry.date.finish,
+        my_id=0,
+        my_priority=MAL_PRIORITY.get(entry.priority, MALPriority.LOW),  # type: ignore
+        my_read_chapters=(progress.chapter if progress else None) or 0,
+        my_read_volumes=(progress.volume if progress else None) or 0,
+        my_reread_value=REPLAY_VALUE[entry.replaylikelihood]
+        if entry.replaylikelihood
+        else None,
+        my_rereading=entry.status == UserEntryStatus.repeat,
+        my_retail_volumes=0,
+        my_scanlation_group="",
+        my_score=score,
+        my_sns=PostToSNS.DISALLOW if entry.is_private else PostToSNS.DEFAULT,
+        my_start_date=entry.date.start,
+        my_status=MANGA_STATUS.get(entry.status, MangaStatus.PLAN_TO_READ),
+        my_storage=MangaStorageMedium.from_str(entry.storage_medium)
+        if entry.storage_medium
+        else None,
+        my_tags=_tags(entry),
+        my_times_read=entry.repeat_count or 0,
+        update_on_import=True,
+    )
+
+
+class MalXmlConverter:
+    """
+    Batch converter from RYMSF entries to MAL XML entries
+
+    Batches can be fed one after another; the converter keeps the list type
+    and status totals across batches so the MAL XML header can be built
+    after the last one.
+    """
+
+    def __init__(self) -> None:
+        self.media_type: MediaType | None = None
+        """Media type of the list, set by the first entry"""
+        self.totals: Counter[AnimeStatus | MangaStatus] = Counter()
+        """Number of converted entries per MAL status"""
+        self.count: int = 0
+        """Number of converted entries"""
+
+    def tally(
+        self, media_type: MediaType, status: UserEntryStatus
+    ) -> AnimeStatus | MangaStatus:
+        """
+        Count an entry in the totals without converting it
+
+        :param media_type: Media type of the entry
+        :type media_type: MediaType
+        :param status: Status of the entry
+        :type status: UserEntryStatus
+        :return: MAL status of the entry
+        :rtype: AnimeStatus | MangaStatus
+        :raises ValueError: If the media type is undefined or mixed
+        """
+        final_status: AnimeStatus | MangaStatus
+        if media_type == MediaType.animation:
+            mtype = MediaType.animation
+            final_status = ANIME_STATUS.get(status, AnimeStatus.PLAN_TO_WATCH)
+        elif media_type in MANGA_MEDIA_TYPES:
+            mtype = MediaType.comic
+            final_status = MANGA_STATUS.get(status, MangaStatus.PLAN_TO_READ)
+        else:
+            raise ValueError("Media type is not defined")
+        if self.media_type is None:
+            self.media_type = mtype
+        elif self.media_type != mtype:
+            raise ValueError("Media type is different from previous entry")
+        self.totals[final_status] += 1
+        self.count += 1
+        return final_status
+
+    def convert(self, entries: Iterable[MediaEntry]) -> list[Anime | Manga]:
+        """
+        Convert a batch of entries, scores are normalized for the whole batch
+
+        :param entries: RYMSF entries
+        :type entries: Iterable[MediaEntry]
+        :return: MAL XML entries
+        :rtype: list[Anime | Manga]
+        :raises ValueError: If the media type is undefined or mixed
+        """
+        batch = entries if isinstance(entries, Sequence) else list(entries)
+        scores = normalize_scores([entry.score for entry in batch])
+        childs: list[Anime | Manga] = []
+        for entry, score in zip(batch, scores):
+            self.tally(entry.type, entry.status)
+            if entry.type == MediaType.animation:
+                childs.append(_to_anime(entry, score))
+            else:
+                childs.append(_to_manga(entry, score))
+        return childs
+
+    @property
+    def user(self) -> AnimeMyStatus | MangaMyStatus:
+        """
+        MAL XML user header from the totals of converted entries
+
+        :return: MAL XML user header
+        :rtype: AnimeMyStatus | MangaMyStatus
+        :raises ValueError: If no entry has been converted
+        """
+        if self.media_type == MediaType.animation:
+            return AnimeMyStatus(
+                user_export_type=ExportType.ANIME,
+                user_total_anime=self.count,
+                user_total_watching=self.totals[AnimeStatus.WATCHING],
+                user_total_completed=self.totals[AnimeStatus.COMPLETED],
+                user_total_onhold=self.totals[AnimeStatus.ON_HOLD],
+                user_total_dropped=self.totals[AnimeStatus.DROPPED],
+                user_total_plantowatch=self.totals[AnimeStatus.PLAN_TO_WATCH],
+            )
+        if self.media_type == MediaType.comic:
+            return MangaMyStatus(
+                user_export_type=ExportType.MANGA,
+                user_total_manga=self.count,
+                user_total_reading=self.totals[MangaStatus.READING],
+                user_total_completed=self.totals[MangaStatus.COMPLETED],
+                user_total_onhold=self.totals[MangaStatus.ON_HOLD],
+                user_total_dropped=self.totals[MangaStatus.DROPPED],
+                user_total_plantoread=self.totals[MangaStatus.PLAN_TO_READ],
+            )
         raise ValueError("Media type is not defined")
+
+
+def convert_to_malxml(data: Iterable[MediaEntry]) -> MalXML:
+    """
+    Convert data to MALXML in one pass
+
+    :param data: RYMSF entries
+    :type data: Iterable[MediaEntry]
+    :return: MAL XML export
+    :rtype: MalXML
+    """
+    converter = MalXmlConverter()
+    childs = converter.convert(data)
     return MalXML(
-        user=head,
+        user=converter.user,
         entries=childs,
     )
 
@@ -431,3 +584,277 @@ class HeaderedRymsf(BaseModel):
     @property
     def to_malxml(self) -> MalXML:
         return convert_to_malxml(self.data)
+
+
+# Lazy loading
+###############
+
+
+class LazyEntries(Sequence[MediaEntry]):
+    """
+    Sequence of media entries validated on first access
+
+    Each raw entry is replaced by its model once accessed, so an entry is
+    only ever validated once and the raw data is released afterwards.
+    """
+
+    def __init__(self, raw: list[dict[str, Any]]) -> None:
+        """
+        Initialize the sequence
+
+        :param raw: Raw entries as parsed from the file, taken over without copying
+        :type raw: list[dict[str, Any]]
+        """
+        self._items: list[dict[str, Any] | MediaEntry] = raw
+
+    def _load(self, index: int) -> MediaEntry:
+        item = self._items[index]
+        if isinstance(item, MediaEntry):
+            return item
+        entry = MediaEntry.model_validate(item)
+        self._items[index] = entry
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._load(i) for i in range(*index.indices(len(self._items)))]
+        return self._load(index)
+
+    def __iter__(self) -> Iterator[MediaEntry]:
+        for index in range(len(self._items)):
+            yield self._load(index)
+
+
+class LazyRymsf:
+    """
+    RYMSF file with an eagerly parsed header and lazily validated entries
+
+    Use this instead of ``HeaderedRymsf`` when only the header or the entry
+    count is needed, or when entries are consumed one at a time.
+    """
+
+    def __init__(self, header: Header, data: LazyEntries) -> None:
+        self.header = header
+        """Header of the file"""
+        self.data = data
+        """Exported data, validated on access"""
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "LazyRymsf":
+        """
+        Create from a parsed document
+
+        :param raw: Parsed RYMSF document
+        :type raw: dict[str, Any]
+        :return: Lazy RYMSF
+        :rtype: LazyRymsf
+        """
+        return cls(
+            header=Header.model_validate(raw["header"]),
+            data=LazyEntries(raw.get("data") or []),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "LazyRymsf":
+        """
+        Load a RYMSF file, YAML or JSON depending on the file extension
+
+        :param path: Path to the file
+        :type path: str | Path
+        :return: Lazy RYMSF
+        :rtype: LazyRymsf
+        """
+        path = Path(path)
+        with open(path, "r", encoding="utf-8") as file:
+            if path.suffix.lower() == ".json":
+                raw = json_load(file)
+            else:
+                raw = yaml_load(file, Loader=YamlLoader)
+        return cls.from_dict(raw)
+
+    @property
+    def to_malxml(self) -> MalXML:
+        return convert_to_malxml(self.data)
+
+
+# Streaming
+############
+
+
+class _YamlStreamLoader(YamlLoader, Composer):  # type: ignore
+    """YAML loader able to compose one node at a time, even with libyaml"""
+
+    def __init__(self, stream: TextIO) -> None:
+        YamlLoader.__init__(self, stream)
+        Composer.__init__(self)
+
+    def load_next(self) -> Any:
+        """Compose and construct the next node only"""
+        return self.construct_document(self.compose_node(None, None))  # type: ignore
+
+
+def _iter_yaml(file: TextIO) -> Iterator[tuple[str, Any]]:
+    """
+    Iterate a RYMSF YAML document as (key, value) pairs, ``data`` items are
+    yielded one by one with the ``data`` key
+
+    :param file: YAML file
+    :type file: TextIO
+    :return: Iterator of top level keys and values
+    :rtype: Iterator[tuple[str, Any]]
+    """
+    loader = _YamlStreamLoader(file)
+    try:
+        loader.get_event()  # stream start
+        if loader.check_event(StreamEndEvent):
+            return
+        loader.get_event()  # document start
+        if not loader.check_event(MappingStartEvent):
+            raise ValueError("RYMSF document must be a mapping")
+        loader.get_event()
+        while not loader.check_event(MappingEndEvent):
+            key = loader.load_next()
+            if key == "data" and loader.check_event(SequenceStartEvent):
+                loader.get_event()
+                while not loader.check_event(SequenceEndEvent):
+                    yield key, loader.load_next()
+                loader.get_event()
+            else:
+                yield key, loader.load_next()
+    finally:
+        loader.dispose()
+
+
+def _iter_json(file: TextIO, chunk_size: int = 65536) -> Iterator[tuple[str, Any]]:
+    """
+    Iterate a RYMSF JSON document as (key, value) pairs, ``data`` items are
+    yielded one by one with the ``data`` key
+
+    :param file: JSON file
+    :type file: TextIO
+    :param chunk_size: Characters read at once
+    :type chunk_size: int = 65536
+    :return: Iterator of top level keys and values
+    :rtype: Iterator[tuple[str, Any]]
+    """
+    stream = JsonStream(file, chunk_size)
+    stream.expect("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key == "data" and stream.peek() == "[":
+            stream.expect("[")
+            while stream.peek() != "]":
+                yield key, stream.value()
+                if stream.peek() == ",":
+                    stream.expect(",")
+            stream.expect("]")
+        else:
+            yield key, stream.value()
+        if stream.peek() == ",":
+            stream.expect(",")
+    stream.expect("}")
+
+
+class RymsfReader:
+    """
+    Streaming RYMSF reader, yields entries one at a time from YAML or JSON
+
+    The ``data`` array is never materialized, so memory stays constant
+    regardless of the list size. ``header`` is set once it has been read,
+    which is before the first entry for files written with the header first.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Initialize the reader
+
+        :param path: Path to the file, JSON if the extension is ``.json``,
+            YAML otherwise
+        :type path: str | Path
+        """
+        self.path = Path(path)
+        self.header: Header | None = None
+        """Header of the file, None until read"""
+
+    def iter_raw(self) -> Iterator[dict[str, Any]]:
+        """
+        Iterate raw entries without validation
+
+        :return: Iterator of raw entries
+        :rtype: Iterator[dict[str, Any]]
+        """
+        with open(self.path, "r", encoding="utf-8") as file:
+            pairs = (
+                _iter_json(file)
+                if self.path.suffix.lower() == ".json"
+                else _iter_yaml(file)
+            )
+            for key, value in pairs:
+                if key == "data":
+                    if value is not None:
+                        yield value
+                elif key == "header":
+                    self.header = Header.model_validate(value)
+
+    def __iter__(self) -> Iterator[MediaEntry]:
+        for raw in self.iter_raw():
+            yield MediaEntry.model_validate(raw)
+
+
+def iter_malxml(
+    entries: Iterable[MediaEntry],
+    converter: MalXmlConverter,
+    batch_size: int = 1024,
+) -> Iterator[Anime | Manga]:
+    """
+    Convert entries lazily, in batches of ``batch_size``
+
+    :param entries: RYMSF entries
+    :type entries: Iterable[MediaEntry]
+    :param converter: Converter keeping the totals
+    :type converter: MalXmlConverter
+    :param batch_size: Entries converted at once
+    :type batch_size: int = 1024
+    :return: Iterator of MAL XML entries
+    :rtype: Iterator[Anime | Manga]
+    """
+    iterator = iter(entries)
+    while batch := list(islice(iterator, batch_size)):
+        yield from converter.convert(batch)
+
+
+def stream_to_malxml(
+    path: str | Path,
+    fileobj: TextIO | BinaryIO,
+    batch_size: int = 1024,
+) -> AnimeMyStatus | MangaMyStatus:
+    """
+    Convert a RYMSF file to MAL XML in constant memory
+
+    The file is read twice: a first pass over the raw entries counts the
+    totals for the MAL XML header, and the second pass validates, converts
+    and writes entries batch by batch.
+
+    :param path: Path to the RYMSF file
+    :type path: str | Path
+    :param fileobj: Text or binary file-like object to write MAL XML to
+    :type fileobj: TextIO | BinaryIO
+    :param batch_size: Entries converted at once
+    :type batch_size: int = 1024
+    :return: MAL XML user header that was written
+    :rtype: AnimeMyStatus | MangaMyStatus
+    """
+    reader = RymsfReader(path)
+    counter = MalXmlConverter()
+    for raw in reader.iter_raw():
+        counter.tally(MediaType(raw["type"]), UserEntryStatus(raw["status"]))
+    user = counter.user
+    MalXML(
+        user=user,
+        entries=iter_malxml(reader, MalXmlConverter(), batch_size),
+    ).write_to(fileobj)
+    return user
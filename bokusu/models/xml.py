@@ -5,6 +5,25 @@ Design a XML-like dataclass to create a XML file.
 """
 
 from dataclasses import dataclass
+from re import compile as re_compile
+from typing import Iterable
+
+ESCAPE_TABLE = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&apos;",
+        "\n": "&#10;",
+        "\r": "&#13;",
+        "\t": "&#9;",
+    }
+)
+"""Translation table for escaping XML text and attribute values."""
+
+ESCAPE_PATTERN = re_compile("[&<>\"'\n\r\t]")
+"""Pattern matching any character that needs escaping."""
 
 
 class XMLException(Exception):
@@ -13,6 +32,82 @@ class XMLException(Exception):
     """
 
 
+def escape_text(text: str) -> str:
+    """
+    Escape text for XML.
+
+    Most values (numbers, plain titles) have nothing to escape, so a single
+    scan is done first and the original string is returned untouched;
+    otherwise one translation pass is done.
+    :param text: Text to escape.
+    :type text: str
+    :return: Escaped text.
+    :rtype: str
+    """
+    if ESCAPE_PATTERN.search(text) is None:
+        return text
+    return text.translate(ESCAPE_TABLE)
+
+
+class TagTemplate:
+    """
+    Precompiled serializer for a tag whose children only contain text.
+
+    The field layout is compiled once into a ``str.format`` template, so
+    rendering an entry is a single pass over its values instead of building
+    one ``Tag`` per field.
+    :param tag: Tag name.
+    :type tag: str
+    :param fields: Child tag names, in order.
+    :type fields: Iterable[str]
+    :param cdata: Child tag names wrapped in CDATA instead of being escaped.
+    :type cdata: Iterable[str], optional
+    """
+
+    __slots__ = ("tag", "fields", "_template", "_escape")
+
+    def __init__(self, tag: str, fields: Iterable[str], cdata: Iterable[str] = ()):
+        self.tag = tag
+        self.fields = tuple(fields)
+        cdata = frozenset(cdata)
+        children = "".join(
+            f"<{field}><![CDATA[{{}}]]></{field}>"
+            if field in cdata
+            else f"<{field}>{{}}</{field}>"
+            for field in self.fields
+        )
+        self._template = f"<{tag}>{children}</{tag}>"
+        self._escape = tuple(field not in cdata for field in self.fields)
+
+    def as_tag(self, values: Iterable[str]) -> "Tag":
+        """
+        Build a ``Tag`` tree from values, for callers that need the tree.
+        :param values: Text of each child, in the same order as ``fields``.
+        :type values: Iterable[str]
+        :return: Tag.
+        :rtype: Tag
+        """
+        tag = Tag(self.tag)
+        for field, escape, value in zip(self.fields, self._escape, values):
+            tag.add_child(Tag(field, value, cdata=not escape))
+        return tag
+
+    def render(self, values: Iterable[str]) -> str:
+        """
+        Render values into the compiled template.
+        :param values: Text of each child, in the same order as ``fields``.
+        :type values: Iterable[str]
+        :return: XML string.
+        :rtype: str
+        """
+        return self._template.format(
+            *[
+                escape_text(value) if escape else value
+                for escape, value in zip(self._escape, values)
+            ]
+        )
+
+
 @dataclass
 class Tag:
     """
@@ -64,39 +159,62 @@ class Tag:
         if self.cdata:
             return f"<![CDATA[{text}]]>"
 
-        return (
-            text.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
-            .replace("\n", "&#10;")
-            .replace("\r", "&#13;")
-            .replace("\t", "&#9;")
-        )
+        return escape_text(text)
 
-    def to_string(self) -> str:
+    def _attributes_string(self) -> str:
         """
-        Convert to string.
-        :return: XML string.
+        Convert attributes to string, prefixed with a space if any.
+        :return: Attributes string.
         :rtype: str
         """
-
         attributes = (
             " ".join(
-                f'{k}="{self.sanitize_text(v)}"' for k, v in self.attributes.items()
+                f'{k}="{escape_text(v)}"' for k, v in self.attributes.items()
             )
             if self.attributes
             else ""
         )
-        attributes = f" {attributes}" if attributes else ""
+        return f" {attributes}" if attributes else ""
+
+    @property
+    def start_tag(self) -> str:
+        """
+        Opening tag, used to stream children without building them first.
+        :return: Opening tag string.
+        :rtype: str
+        :raises XMLException: If the tag is a comment.
+        """
+        if self.is_comment:
+            raise XMLException("Comment tags can't be streamed.")
+        return f"<{self.tag}{self._attributes_string()}>"
+
+    @property
+    def end_tag(self) -> str:
+        """
+        Closing tag, used to stream children without building them first.
+        :return: Closing tag string.
+        :rtype: str
+        :raises XMLException: If the tag is a comment.
+        """
+        if self.is_comment:
+            raise XMLException("Comment tags can't be streamed.")
+        return f"</{self.tag}>"
+
+    def to_string(self) -> str:
+        """
+        Convert to string.
+        :return: XML string.
+        :rtype: str
+        """
+
+        attributes = self._attributes_string()
 
         children = ""
         if self.children:
             children = "".join([child.to_string() for child in self.children])
 
-        self.text = self.sanitize_text(self.text)
-        final = f"{self.tag}{attributes}>{self.text}{children}</{self.tag}"
+        text = self.sanitize_text(self.text)
+        final = f"{self.tag}{attributes}>{text}{children}</{self.tag}"
         if self.is_comment:
             final = final.replace("--", "&#45;&#45;")
             return f"<!-- {final} -->"
@@ -131,6 +249,15 @@ class XML:
             self.children = []
         self.children.append(child)
 
+    @property
+    def declaration(self) -> str:
+        """
+        XML declaration.
+        :return: XML declaration string.
+        :rtype: str
+        """
+        return f'<?xml version="{self.version}" encoding="{self.encoding}"?>'
+
     def to_string(self) -> str:
         """
         Convert to string.
@@ -139,6 +266,6 @@ class XML:
         """
 
         if not self.children:
-            return f'<?xml version="{self.version}" encoding="{self.encoding}"?>'
+            return self.declaration
         children = "".join([child.to_string() for child in self.children])
-        return f'<?xml version="{self.version}" encoding="{self.encoding}"?>{children}'
+        return f"{self.declaration}{children}"
@@ -1,41 +1,382 @@
 import logging
-from asyncio import sleep
+import zlib
+from asyncio import (
+    CancelledError,
+    Future,
+    Queue,
+    Task,
+    create_task,
+    gather,
+    get_running_loop,
+    shield,
+    wait_for,
+)
+from asyncio import TimeoutError as AsyncTimeoutError
+from dataclasses import replace
 from datetime import datetime, timezone
-from typing import Literal
+from functools import partial
+from itertools import count
+from pathlib import Path
+from time import monotonic
+from typing import Iterable, Literal, Sequence
 
 import asyncudp  # type: ignore
+from aiohttp import ClientSession
 
-from bokusu.services.anidb.models import AniDBAuth, AniDBResponse, AniDBResponseCode
+from bokusu.core.folder import add_directory
+from bokusu.core.output import run_io
+from bokusu.core.scheduler import RateLimit, RateLimiter
+from bokusu.services.anidb.cache import AniDBCache, cache_key
+from bokusu.services.anidb.export import (
+    download_export,
+    export_url,
+    is_export_message,
+    pushed_message,
+    unpack_export,
+)
+from bokusu.services.anidb.models import (
+    AniDBAuth,
+    AniDBResponse,
+    AniDBResponseCode,
+    AniDBRow,
+    AniDBStats,
+    AniDBTimeout,
+)
+
+ANIDB_FLOOD_LIMITS: tuple[RateLimit, ...] = (
+    RateLimit(requests=3, period=6.0, min_interval=1.0),
+    RateLimit(requests=30, period=120.0),
+)
+"""AniDB UDP flood rules, a packet must pass both buckets. Short term: one
+packet every 2 seconds, after a burst of 5 packets one second apart (3
+tokens refilled at 0.5/s). Long term: one packet every 4 seconds on average
+once the 30 token bucket is drained."""
+
+ANIDB_DEFAULT_MTU = 1400
+"""Largest datagram AniDB sends when the client did not set ``mtu``"""
+
+PUSH_CODES = frozenset(
+    {
+        AniDBResponseCode.NOTIFICATION_NEW_FILE,
+        AniDBResponseCode.NOTIFICATION_BUDDY_EVENT,
+        AniDBResponseCode.NOTIFICATION_NEW_MESSAGE,
+    }
+)
+"""Untagged packets AniDB pushes to subscribed clients, each must be acknowledged"""
+
+KEEPALIVE_INTERVAL = 300.0
+"""Seconds between PINGs keeping the session and NAT mapping alive while waiting"""
+
+EXPORT_WAIT = 3600.0
+"""Seconds to wait for a queued MyList export"""
+
+COMPRESSED_PREFIX = b"\x00\x00"
+"""Marks a deflated datagram, sent once ``comp=1`` was set on AUTH"""
+
+
+def inflate_datagram(data: bytes) -> tuple[bytes, bool]:
+    """
+    Inflate a datagram if AniDB deflated it
+
+    :param data: Datagram as received
+    :type data: bytes
+    :return: Payload, and whether the datagram was compressed
+    :rtype: tuple[bytes, bool]
+    """
+    if not data.startswith(COMPRESSED_PREFIX):
+        return data, False
+    body = data[len(COMPRESSED_PREFIX) :]
+    try:
+        return zlib.decompress(body), True
+    except zlib.error:
+        # raw deflate stream, without the zlib header
+        return zlib.decompress(body, -zlib.MAX_WBITS), True
 
 
 class AniDB:
-    def __init__(self, host: str, port: int) -> None:
+    """
+    AniDB UDP API client
+
+    Commands are tagged with a unique ``tag=`` and may be sent concurrently;
+    a single receiver task matches replies to their command by tag. Sends are
+    paced by the flood rules only, lost packets are retransmitted with the
+    same tag after ``timeout`` seconds.
+
+    With a ``cache``, lookups (``ANIME``, ``EPISODE``, ``MYLIST``...) are
+    answered from it while fresh. Stale replies are returned at once and
+    refreshed in the background, which is awaited on exit.
+
+    Compression is requested on login unless disabled; deflated replies are
+    inflated transparently and counted in ``stats``.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float = 30.0,
+        retries: int = 2,
+        limiters: Sequence[RateLimiter] | None = None,
+        cache: AniDBCache | None = None,
+        compress: bool = True,
+    ) -> None:
+        """
+        Initialize the client, the socket is opened on enter
+
+        :param host: AniDB API host
+        :type host: str
+        :param port: AniDB API port
+        :type port: int
+        :param timeout: Seconds to wait for a reply before retransmitting
+        :type timeout: float
+        :param retries: Retransmissions before giving up on a command
+        :type retries: int
+        :param limiters: Send pacing. Defaults to ``ANIDB_FLOOD_LIMITS``.
+        :type limiters: Sequence[RateLimiter] | None
+        :param cache: Persistent cache of lookup replies, owned by the caller
+        :type cache: AniDBCache | None
+        :param compress: Ask AniDB to deflate replies on login
+        :type compress: bool
+        """
         self.host = host
         self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.limiters = (
+            list(limiters)
+            if limiters is not None
+            else [RateLimiter(limit) for limit in ANIDB_FLOOD_LIMITS]
+        )
         self.socket = None
         self.session = ""
+        self._tags = count(1)
+        self._pending: dict[str, Future[bytes]] = {}
+        self._receiver: Task[None] | None = None
+        self.cache = cache
+        self._inflight: dict[str, Task[AniDBResponse]] = {}
+        self.compress = compress
+        self.mtu = ANIDB_DEFAULT_MTU
+        self.stats = AniDBStats()
+        self.notifications: Queue[AniDBResponse] = Queue()
+        self._acks: set[Task[AniDBResponse]] = set()
+        self._pushed: set[str] = set()
 
     async def __aenter__(self):
         self.socket = await asyncudp.create_socket(remote_addr=(self.host, self.port))  # type: ignore
+        self._receiver = create_task(self._receive())
         return self
 
     def __enter__(self):
         raise RuntimeError("Use async with")
 
     async def __aexit__(self, exc_type, exc_value, traceback):  # type: ignore
+        if self._inflight:
+            # let background refreshes reach the cache
+            await gather(*self._inflight.values(), return_exceptions=True)
+        if self._acks:
+            await gather(*self._acks, return_exceptions=True)
+        if self._receiver is not None:
+            self._receiver.cancel()
+            try:
+                await self._receiver
+            except CancelledError:
+                pass
+            self._receiver = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        logging.debug(
+            f"AniDB traffic: {self.stats.sent} sent, {self.stats.received} received "
+            f"({self.stats.compressed} compressed), {self.stats.wire_bytes} bytes "
+            f"on the wire, {self.stats.saved_bytes} saved by compression"
+        )
         self.socket.close() if self.socket else None
 
-    async def __send_cmd(self, command: str) -> tuple[str, str]:
+    async def _receive(self) -> None:
+        """Receive replies and hand each one to the command with its tag"""
+        while True:
+            try:
+                data, addr = await self.socket.recvfrom()  # type: ignore
+            except asyncudp.ClosedError:
+                return
+            except OSError as err:
+                # e.g. ICMP port unreachable, the command times out and is resent
+                logging.debug(f"Socket error: {err}")
+                continue
+            payload = self._unpack(data)
+            if payload is None:
+                continue
+            logging.debug(f"Received response {payload[:80]!r} from {addr}")
+            tag = payload.split(b" ", 1)[0].decode("ascii", errors="replace")
+            future = self._pending.pop(tag, None)
+            if future is None and tag.isdigit():
+                self._on_push(payload)
+            elif future is None:
+                # late reply to a retransmitted command, or an untagged error
+                logging.debug(f"Dropping response without a waiting command: {payload[:80]!r}")
+            elif not future.done():
+                future.set_result(payload)
+
+    def _on_push(self, payload: bytes) -> None:
+        """Acknowledge a pushed notification and queue it, once"""
+        try:
+            push = AniDBResponse.from_bytes(payload)
+        except ValueError:
+            logging.debug(f"Dropping unknown untagged packet: {payload[:80]!r}")
+            return
+        if push.return_code not in PUSH_CODES:
+            logging.debug(f"Dropping untagged {push.return_code}: {push.return_string}")
+            return
+        nid = push.return_string.split(" ", 1)[0]
+        # unacknowledged pushes are resent, the ack may have been lost
+        task = create_task(self._pushack(nid))
+        self._acks.add(task)
+        task.add_done_callback(self._acks.discard)
+        if nid not in self._pushed:
+            self._pushed.add(nid)
+            self.notifications.put_nowait(push)
+
+    def _unpack(self, data: bytes) -> bytes | None:
+        """Inflate a datagram and count it, None if it can not be read"""
+        self.stats.received += 1
+        self.stats.wire_bytes += len(data)
+        try:
+            payload, compressed = inflate_datagram(data)
+        except zlib.error as err:
+            logging.debug(f"Dropping corrupt compressed datagram: {err}")
+            return None
+        self.stats.payload_bytes += len(payload)
+        if compressed:
+            self.stats.compressed += 1
+        if len(data) >= self.mtu:
+            # AniDB cuts replies at the MTU, there is no continuation packet
+            logging.warning(
+                f"Reply of {len(data)} bytes reached the MTU of {self.mtu}, it may be truncated"
+            )
+        return payload
+
+    def _tagged(self, command: str, tag: str) -> bytes:
+        """Append ``tag=`` to the command parameters"""
+        separator = "&" if " " in command else " "
+        return f"{command}{separator}tag={tag}".encode("utf-8")
+
+    async def _send_raw(self, command: str) -> bytes:
+        """
+        Send a command and wait for its reply
+
+        :param command: Command with its parameters, without ``tag``
+        :type command: str
+        :return: Reply, inflated
+        :rtype: bytes
+        :raises AniDBTimeout: If no reply came after every retransmission
+        """
         if not self.socket:
             raise RuntimeError(
                 "Socket is not initialized, have you init class with async context?"
             )
-        logging.debug(f"Sending command {command}")
-        await self.socket.sendto(command.encode("utf-8"))  # type: ignore
-        get_resp, addr = await self.socket.recvfrom()  # type: ignore
-        await self._delay()
-        logging.debug(f"Received response {get_resp} from {addr}")
-        return (get_resp, addr)  # type: ignore
+        tag = f"b{next(self._tags)}"
+        packet = self._tagged(command, tag)
+        if len(packet) > self.mtu:
+            raise ValueError(
+                f"{command.split(' ', 1)[0]} is {len(packet)} bytes, over the MTU of {self.mtu}"
+            )
+        future: Future[bytes] = get_running_loop().create_future()
+        self._pending[tag] = future
+        try:
+            for attempt in range(self.retries + 1):
+                for limiter in self.limiters:
+                    await limiter.acquire()
+                if future.done():
+                    # a late reply came while waiting for the limiters
+                    break
+                logging.debug(
+                    f"Sending command {command.split(' ', 1)[0]} ({tag}, try {attempt + 1})"
+                )
+                self.socket.sendto(packet)  # type: ignore
+                self.stats.sent += 1
+                try:
+                    # shielded, the same future waits for a retransmission
+                    reply = await wait_for(shield(future), self.timeout)
+                except AsyncTimeoutError:
+                    continue
+                return reply
+            else:
+                raise AniDBTimeout(
+                    f"No reply to {command.split(' ', 1)[0]} after {self.retries + 1} tries"
+                )
+        finally:
+            self._pending.pop(tag, None)
+        return future.result()
+
+    async def _send(self, command: str) -> AniDBResponse:
+        """
+        Send a command and wait for its reply
+
+        :param command: Command with its parameters, without ``tag``
+        :type command: str
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        :raises AniDBTimeout: If no reply came after every retransmission
+        """
+        return AniDBResponse.from_bytes(await self._send_raw(command))
+
+    async def _store(self, command: str) -> AniDBResponse:
+        """Send a lookup and store its reply in the cache"""
+        reply = await self._send_raw(command)
+        response = AniDBResponse.from_bytes(reply)
+        if self.cache is not None:
+            self.cache.put(command, response.return_code, reply)
+        return response
+
+    def _fetch(self, command: str) -> Task[AniDBResponse]:
+        """Send a lookup, sharing the request with identical ones in flight"""
+        _, key = cache_key(command)
+        task = self._inflight.get(key)
+        if task is None:
+            task = create_task(self._store(command))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._fetched, key))
+        return task
+
+    def _fetched(self, key: str, task: Task[AniDBResponse]) -> None:
+        """Forget a finished lookup, logging failed background refreshes"""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.debug(f"Lookup {key.split(' ', 1)[0]} failed: {task.exception()}")
+
+    async def _lookup(self, command: str) -> AniDBResponse:
+        """
+        Send a lookup, answered from the cache when possible
+
+        Fresh replies are returned without any traffic, stale ones are
+        returned and refreshed in the background.
+
+        :param command: Command with its parameters, without ``tag``
+        :type command: str
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        :raises AniDBTimeout: If not cached and no reply came
+        """
+        if self.cache is None or not self.cache.cacheable(command):
+            return await self._send(command)
+        hit = self.cache.get(command)
+        if hit is None:
+            return await shield(self._fetch(command))
+        if hit.stale:
+            logging.debug(f"Refreshing stale {command.split(' ', 1)[0]} in background")
+            self._fetch(command)
+        return AniDBResponse.from_bytes(hit.reply)
+
+    async def _send_many(self, commands: Iterable[str]) -> list[AniDBResponse]:
+        """
+        Send commands concurrently, as fast as the flood rules allow
+
+        :param commands: Commands with their parameters, without ``tag``
+        :type commands: Iterable[str]
+        :return: AniDB response dataclasses, in the order of the commands
+        :rtype: list[AniDBResponse]
+        """
+        return list(await gather(*(self._lookup(command) for command in commands)))
 
     async def _login(self, auth: AniDBAuth) -> AniDBResponse:
         """
@@ -46,8 +387,11 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd(f"AUTH {auth.params}")
-        resp = AniDBResponse.from_string(get_resp)
+        if self.compress and not auth.comp:
+            auth = replace(auth, comp=True)
+        resp = await self._send(f"AUTH {auth.params}")
+        if auth.mtu:
+            self.mtu = auth.mtu
         if resp.return_code == AniDBResponseCode.LOGIN_ACCEPTED:
             self.session = resp.additional_return_string
             logging.debug(f"Logged in with session {self.session}")
@@ -60,8 +404,7 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd(f"LOGOUT s={self.session}")
-        return AniDBResponse.from_string(get_resp)
+        return await self._send(f"LOGOUT s={self.session}")
 
     async def _ping(self) -> AniDBResponse:
         """
@@ -70,8 +413,7 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd("PING")
-        return AniDBResponse.from_string(get_resp)
+        return await self._send("PING")
 
     async def _notify(self, buddy: bool = False) -> AniDBResponse:
         """
@@ -82,11 +424,10 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        cmd = "NOTIFY s={self.session}"
+        cmd = f"NOTIFY s={self.session}"
         if buddy:
             cmd += "&buddy=1"
-        get_resp, _ = await self.__send_cmd(f"NOTIFY s={self.session}")
-        return AniDBResponse.from_string(get_resp)
+        return await self._send(cmd)
 
     async def _notifylist(self) -> AniDBResponse:
         """
@@ -95,8 +436,7 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd(f"NOTIFYLIST s={self.session}")
-        return AniDBResponse.from_string(get_resp)
+        return await self._send(f"NOTIFYLIST s={self.session}")
 
     async def _notifyget(self, msgtype: Literal["M", "N"], msgid: int) -> AniDBResponse:
         """
@@ -109,10 +449,9 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd(
+        return await self._send(
             f"NOTIFYGET s={self.session}&type={msgtype}&id={msgid}"
         )
-        return AniDBResponse.from_string(get_resp)
 
     async def _mylistexport(self, template: str = "xml") -> AniDBResponse:
         """
@@ -121,75 +460,185 @@ class AniDB:
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        get_resp, _ = await self.__send_cmd(
+        return await self._send(
             f"MYLISTEXPORT template={template}&s={self.session}"
         )
-        return AniDBResponse.from_string(get_resp)
 
-    # give each process a delay to prevent API violation
+    async def _anime(self, aid: int, amask: str | None = None) -> AniDBResponse:
+        """
+        Get anime information
+
+        :param aid: Anime ID
+        :type aid: int
+        :param amask: Hex mask of the fields to return, defaults to AniDB's
+        :type amask: str | None, optional
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        cmd = f"ANIME aid={aid}&s={self.session}"
+        if amask:
+            cmd += f"&amask={amask}"
+        return await self._lookup(cmd)
+
+    async def _episode(self, eid: int) -> AniDBResponse:
+        """
+        Get episode information
+
+        :param eid: Episode ID
+        :type eid: int
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        return await self._lookup(f"EPISODE eid={eid}&s={self.session}")
+
+    async def _mylist(self, lid: int) -> AniDBResponse:
+        """
+        Get a MyList entry
+
+        :param lid: MyList entry ID
+        :type lid: int
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        return await self._lookup(f"MYLIST lid={lid}&s={self.session}")
+
+    async def _push(
+        self, notify: bool = False, msg: bool = True, buddy: bool = False
+    ) -> AniDBResponse:
+        """
+        Subscribe to pushed notifications, for the rest of the session
+
+        :param notify: Push new file notifications
+        :type notify: bool, optional
+        :param msg: Push new messages
+        :type msg: bool, optional
+        :param buddy: Push buddy events
+        :type buddy: bool, optional
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        return await self._send(
+            f"PUSH notify={int(notify)}&msg={int(msg)}&buddy={int(buddy)}&s={self.session}"
+        )
+
+    async def _pushack(self, nid: str) -> AniDBResponse:
+        """
+        Acknowledge a pushed notification, so AniDB stops resending it
+
+        :param nid: Notification packet ID
+        :type nid: str
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        return await self._send(f"PUSHACK nid={nid}&s={self.session}")
 
-    async def _delay(self, seconds: float = 0.5) -> None:
+    async def _wait_export(
+        self, wait: float = EXPORT_WAIT, keepalive: float = KEEPALIVE_INTERVAL
+    ) -> AniDBRow | None:
         """
-        Delay the process
+        Wait for the pushed message announcing a finished export, pinging
+        AniDB while idle
 
-        :param seconds: Seconds to delay
-        :type seconds: float
+        :param wait: Seconds to wait
+        :type wait: float, optional
+        :param keepalive: Seconds between PINGs
+        :type keepalive: float, optional
+        :return: Message row, in the NOTIFYGET layout, None if it did not come in time
+        :rtype: AniDBRow | None
         """
-        await sleep(seconds)
+        deadline = monotonic() + wait
+        while (remaining := deadline - monotonic()) > 0:
+            try:
+                push = await wait_for(self.notifications.get(), min(keepalive, remaining))
+            except AsyncTimeoutError:
+                await self._ping()
+                continue
+            if push.return_code != AniDBResponseCode.NOTIFICATION_NEW_MESSAGE:
+                continue
+            for row in push.data:
+                try:
+                    message = pushed_message(row)
+                except ValueError:
+                    logging.debug(f"Dropping malformed pushed message: {row!r}")
+                    continue
+                if is_export_message(message):
+                    return message
+        return None
 
-    async def run(self, auth: AniDBAuth) -> None:
+    async def run(
+        self,
+        auth: AniDBAuth,
+        session: ClientSession | None = None,
+        profile: str = "default",
+        template: str = "xml",
+        wait: float = EXPORT_WAIT,
+    ) -> list[Path]:
         """
-        Run the AniDB service
+        Run the AniDB service: queue a MyList export, wait for the pushed
+        message announcing it, then download and unpack it
 
         :param auth: AniDB authentication dataclass
         :type auth: AniDBAuth
+        :param session: HTTP session for the download, one is opened if None
+        :type session: ClientSession | None, optional
+        :param profile: Profile name, used as the backup subdirectory
+        :type profile: str, optional
+        :param template: Export template
+        :type template: str, optional
+        :param wait: Seconds to wait for the export
+        :type wait: float, optional
+        :return: Extracted files, empty if the export did not come in time
+        :rtype: list[Path]
         """
         try:
-            await self._login(auth)
+            login = await self._login(auth)
         except Exception:
             logging.exception("Failed to login")
             raise Exception("Failed to login")
-        await self._ping()
-        ntf = await self._notify()
-        # run additional notification checks
-        if ntf.data and ntf.data[1]:
-            logging.debug(f"Message notifications: {ntf.data[1]}")
-            msglist = await self._notifylist()
-            if msglist.data:
-                for msg in msglist.data:
-                    if msg[0] != "M":
-                        continue
-                    logging.debug(f"Message notification: {msg}")
-                    msgget = await self._notifyget("M", int(msg[1]))
-                    if msgget.data:
-                        logging.debug(f"Message notification data: {msgget.data}")
-                        dta = msgget.data[0]
-                        # check if it's from the system with title starts with "[MY LIST EXPORT]"
-                        if dta[4] != "2":
-                            continue
-                        if not dta[5].startswith("[MY LIST EXPORT]"):
-                            continue
-                        print(f"""MyList export notification:
-Date: {datetime.fromtimestamp(int(dta[3]), tz=timezone.utc)}
-From: {dta[2]}
-Subject: {dta[5]}
-
-{dta[6]}
+        if not self.session:
+            raise Exception(f"Failed to login: {login.return_code}")
+        try:
+            await self._ping()
+            pushed = await self._push(msg=True)
+            if pushed.return_code != AniDBResponseCode.NOTIFICATION_ENABLED:
+                raise Exception(f"Failed to subscribe to notifications: {pushed.return_code}")
+            queued = await self._mylistexport(template)
+            if queued.return_code not in (
+                AniDBResponseCode.EXPORT_QUEUED,
+                AniDBResponseCode.EXPORT_ALREADY_IN_QUEUE,
+            ):
+                raise Exception(f"Failed to queue the export: {queued.return_code}")
+            logging.debug(f"Export queued, waiting up to {wait:.0f}s for AniDB")
+            message = await self._wait_export(wait)
+        finally:
+            await self._logout()
+
+        if message is None:
+            print(f"""MyList export was queued, but AniDB did not announce it within {wait:.0f} seconds.
+The export link will be sent to your AniDB inbox: https://anidb.net/user/mail/
+""")
+            return []
+        url = export_url(message[6])
+        if url is None:
+            print(f"""MyList export notification:
+Date: {datetime.fromtimestamp(int(message[3]), tz=timezone.utc)}
+From: {message[2]}
+Subject: {message[5]}
+
+{message[6]}
 
 ----------
 Notice from cartridge:
-To prevent API violation, you must manually read the message from following link:
-https://anidb.net/user/mail/{dta[0]}
-Then, bokusu will attempt to send the export request once message is read and
-your list is ready to be exported.
-
-AniDB cartridge for bokusu will exit.
+No download link was found in the message, read it from following link:
+https://anidb.net/user/mail/{message[0]}
 """)
-                        await self._logout()
-                        return
-            else:
-                logging.debug("No message notifications")
+            return []
+
+        folder = add_directory("backup", profile, name="AniDB")
+        archive = folder / f"anidb_mylist{'.zip' if url.endswith('.zip') else '.tgz'}"
+        if session is None:
+            async with ClientSession() as own:
+                await download_export(own, url, archive)
         else:
-            logging.debug("No notifications")
-        await self._mylistexport()
-        await self._logout()
+            await download_export(session, url, archive)
+        return await run_io(unpack_export, archive, folder / "anidb")
@@ -0,0 +1,196 @@
+"""Persistent SQLite cache of AniDB UDP lookups."""
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from time import time
+
+from bokusu.core.folder import get_box_root
+from bokusu.services.anidb.models import AniDBResponseCode
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+COMMAND_TTLS: dict[str, float] = {
+    "ANIME": 7 * DAY,
+    "ANIMEDESC": 30 * DAY,
+    "CHARACTER": 30 * DAY,
+    "CREATOR": 30 * DAY,
+    "EPISODE": 7 * DAY,
+    "FILE": 30 * DAY,
+    "GROUP": 30 * DAY,
+    "MYLIST": 1 * HOUR,
+}
+"""Seconds a reply stays fresh, per command. Other commands are not cached."""
+
+NEGATIVE_TTL = 1 * DAY
+"""Seconds a "no such ..." reply stays fresh"""
+
+STALE_WINDOW = 7 * DAY
+"""Seconds after expiry during which the cached reply is still returned while
+it is refreshed in the background"""
+
+IGNORED_PARAMS = frozenset({"s", "tag"})
+"""Parameters that do not change the reply: session key and tag"""
+
+NEGATIVE_CODES = frozenset(
+    code
+    for code in AniDBResponseCode
+    if code.name.startswith("NO_SUCH_") and 300 <= code.value < 500
+)
+"""Replies telling the requested data does not exist"""
+
+
+def cache_key(command: str) -> tuple[str, str]:
+    """
+    Normalize a command to its cache key
+
+    Parameters are sorted and the session key and tag are dropped, so the
+    same lookup always maps to the same key.
+
+    :param command: Command with its parameters
+    :type command: str
+    :return: Command name and normalized key
+    :rtype: tuple[str, str]
+    """
+    name, _, params = command.partition(" ")
+    pairs = sorted(
+        pair
+        for pair in params.split("&")
+        if pair and pair.partition("=")[0] not in IGNORED_PARAMS
+    )
+    return name.upper(), f"{name.upper()} {'&'.join(pairs)}"
+
+
+@dataclass
+class CacheHit:
+    """A cached reply"""
+
+    reply: bytes
+    """Reply, as received after inflating"""
+    stale: bool
+    """Whether the reply is expired and should be refreshed"""
+
+
+class AniDBCache:
+    """
+    Replies of AniDB lookups, keyed by command and parameters
+
+    A reply is fresh for the TTL of its command, or ``NEGATIVE_TTL`` for
+    "no such ..." replies. For ``STALE_WINDOW`` seconds after that it is
+    still returned, flagged stale so the caller can refresh it. Errors and
+    replies of uncached commands are never stored.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        ttls: dict[str, float] | None = None,
+        negative_ttl: float = NEGATIVE_TTL,
+        stale_window: float = STALE_WINDOW,
+    ):
+        """
+        Open the cache, creating the database if needed
+
+        :param path: Database path. Defaults to ``<box root>/cache/anidb.sqlite3``.
+        :type path: Path | str | None
+        :param ttls: Seconds a reply stays fresh per command. Defaults to ``COMMAND_TTLS``.
+        :type ttls: dict[str, float] | None
+        :param negative_ttl: Seconds a "no such ..." reply stays fresh
+        :type negative_ttl: float
+        :param stale_window: Seconds an expired reply is still served
+        :type stale_window: float
+        """
+        if path is None:
+            path = get_box_root() / "cache" / "anidb.sqlite3"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = ttls if ttls is not None else dict(COMMAND_TTLS)
+        self.negative_ttl = negative_ttl
+        self.stale_window = stale_window
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS replies ("
+            "key TEXT PRIMARY KEY, command TEXT NOT NULL, code INTEGER NOT NULL, "
+            "reply BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def close(self) -> None:
+        """Close the database"""
+        self.db.close()
+
+    def cacheable(self, command: str) -> bool:
+        """
+        Whether replies of a command are cached
+
+        :param command: Command with its parameters
+        :type command: str
+        :return: True if the command has a TTL
+        :rtype: bool
+        """
+        return cache_key(command)[0] in self.ttls
+
+    def get(self, command: str) -> CacheHit | None:
+        """
+        Get the cached reply of a command
+
+        :param command: Command with its parameters
+        :type command: str
+        :return: Cached reply, or None if missing or too old to serve
+        :rtype: CacheHit | None
+        """
+        _, key = cache_key(command)
+        row = self.db.execute(
+            "SELECT reply, expires FROM replies WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        reply, expires = row
+        now = time()
+        if now >= expires + self.stale_window:
+            return None
+        return CacheHit(reply, now >= expires)
+
+    def put(self, command: str, code: AniDBResponseCode, reply: bytes) -> bool:
+        """
+        Store the reply of a command, if it can be cached
+
+        :param command: Command with its parameters
+        :type command: str
+        :param code: Reply code
+        :type code: AniDBResponseCode
+        :param reply: Reply, as received after inflating
+        :type reply: bytes
+        :return: True if the reply was stored
+        :rtype: bool
+        """
+        name, key = cache_key(command)
+        ttl = self.ttls.get(name)
+        if ttl is None:
+            return False
+        if code in NEGATIVE_CODES:
+            ttl = self.negative_ttl
+        elif not 200 <= code.value < 300:
+            # errors, bans and busy servers are not answers
+            return False
+        self.db.execute(
+            "INSERT OR REPLACE INTO replies (key, command, code, reply, expires) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, name, code.value, reply, time() + ttl),
+        )
+        self.db.commit()
+        return True
+
+    def purge(self) -> int:
+        """
+        Delete replies too old to be served
+
+        :return: Number of deleted replies
+        :rtype: int
+        """
+        cursor = self.db.execute(
+            "DELETE FROM replies WHERE expires + ? <= ?", (self.stale_window, time())
+        )
+        self.db.commit()
+        return cursor.rowcount
@@ -0,0 +1,142 @@
+"""Download and unpack AniDB MyList exports."""
+
+import re
+import tarfile
+import zipfile
+from pathlib import Path
+
+from aiohttp import ClientSession
+
+from bokusu.core.output import fsync_file, replace_file, run_io
+from bokusu.services.anidb.models import AniDBRow
+
+EXPORT_TITLE = "[MY LIST EXPORT]"
+"""Title prefix of the system message sent when an export is ready"""
+
+SYSTEM_MESSAGE = "2"
+"""Message type of AniDB system messages"""
+
+DOWNLOAD_BLOCK_SIZE = 1 << 16
+"""Bytes read from the response at a time"""
+
+_EXPORT_URL = re.compile(r"https?://[^\s\[\]<>\"']+?\.(?:tgz|tar\.gz|zip)\b")
+
+
+def pushed_message(row: AniDBRow) -> AniDBRow:
+    """
+    Reorder a pushed message row (794 NOTIFICATION_NEW_MESSAGE) like a
+    NOTIFYGET message row
+
+    Pushed rows are ``type|date|from_user_id|from_user_name|title|body|id``.
+
+    :param row: Pushed message row
+    :type row: AniDBRow
+    :return: ``id|from_user_id|from_user_name|date|type|title|body`` row
+    :rtype: AniDBRow
+    :raises ValueError: If the row is too short
+    """
+    if len(row) < 7:
+        raise ValueError(f"Pushed message has {len(row)} fields, expected 7")
+    kind, date, uid, name, title, body, mid = row[:7]
+    return (mid, uid, name, date, kind, title, body)
+
+
+def is_export_message(row: AniDBRow) -> bool:
+    """
+    Whether a message row announces a finished MyList export
+
+    Message rows are laid out as returned by ``NOTIFYGET type=M``,
+    ``id|from_user_id|from_user_name|date|type|title|body``; reorder pushed
+    rows with :func:`pushed_message` first.
+
+    :param row: Message row
+    :type row: AniDBRow
+    :return: True for the export system message
+    :rtype: bool
+    """
+    return len(row) > 6 and row[4] == SYSTEM_MESSAGE and row[5].startswith(EXPORT_TITLE)
+
+
+def export_url(body: str) -> str | None:
+    """
+    Find the archive link in an export message
+
+    :param body: Message body
+    :type body: str
+    :return: Archive URL, None if the message has none
+    :rtype: str | None
+    """
+    match = _EXPORT_URL.search(body)
+    return match.group(0) if match else None
+
+
+def _within(root: Path, name: str) -> bool:
+    """Whether an archive member stays under the destination"""
+    return (root / name).resolve().is_relative_to(root)
+
+
+def unpack_export(archive: Path, destination: Path) -> list[Path]:
+    """
+    Extract an export archive, refusing members outside the destination
+
+    :param archive: Downloaded ``.tgz`` or ``.zip``
+    :type archive: Path
+    :param destination: Folder to extract to, created if needed
+    :type destination: Path
+    :return: Extracted files
+    :rtype: list[Path]
+    :raises ValueError: If a member would escape the destination
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    root = destination.resolve()
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zfile:
+            names = [info.filename for info in zfile.infolist() if not info.is_dir()]
+            if not all(_within(root, name) for name in names):
+                raise ValueError(f"{archive.name} has members outside the export")
+            zfile.extractall(root)
+    else:
+        with tarfile.open(archive) as tfile:
+            members = tfile.getmembers()
+            if not all(
+                (member.isfile() or member.isdir()) and _within(root, member.name)
+                for member in members
+            ):
+                raise ValueError(f"{archive.name} has links or members outside the export")
+            names = [member.name for member in members if member.isfile()]
+            if hasattr(tarfile, "data_filter"):
+                # also strips special permission bits and foreign ownership
+                tfile.extractall(root, members, filter="data")
+            else:  # pragma: no cover
+                # Python without extraction filters, members were checked above
+                tfile.extractall(root, members)
+    return [root / name for name in names]
+
+
+async def download_export(session: ClientSession, url: str, path: Path) -> Path:
+    """
+    Stream an export archive to disk, replacing ``path`` once complete
+
+    :param session: HTTP session
+    :type session: ClientSession
+    :param url: Archive URL from the export message
+    :type url: str
+    :param path: Path of the archive
+    :type path: Path
+    :return: Path of the archive
+    :rtype: Path
+    """
+    part = path.with_name(f".{path.name}.part")
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        file = await run_io(open, part, "wb")
+        try:
+            async for block in resp.content.iter_chunked(DOWNLOAD_BLOCK_SIZE):
+                await run_io(file.write, block)
+            await run_io(fsync_file, file)
+        except BaseException:
+            await run_io(file.close)
+            part.unlink(missing_ok=True)
+            raise
+        await run_io(file.close)
+    return await run_io(replace_file, part, path)
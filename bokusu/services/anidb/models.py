@@ -1,5 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 from typing import Literal
 
 
@@ -38,6 +39,10 @@ class AniDBInvalidType(Exception):
     """AniDB invalid type exception"""
 
 
+class AniDBTimeout(Exception):
+    """AniDB did not answer a command, even after retransmitting it"""
+
+
 class AniDBResponseCode(Enum):
     """Enum of known AniDB response codes"""
 
@@ -184,12 +189,40 @@ class AniDBResponseCode(Enum):
     API_VIOLATION = 666
     PUSHACK_CONFIRMED = 701
     NO_SUCH_PACKET_PENDING = 702
+    NOTIFICATION_NEW_FILE = 720
+    NOTIFICATION_BUDDY_EVENT = 753
+    NOTIFICATION_NEW_MESSAGE = 794
     VERSION = 998
 
     def __str__(self) -> str:
         return str(self.name).replace("_", " ").title()
 
 
+@dataclass
+class AniDBStats:
+    """Traffic counters of an AniDB client"""
+
+    sent: int = 0
+    """Datagrams sent, retransmissions included"""
+    received: int = 0
+    """Datagrams received"""
+    compressed: int = 0
+    """Datagrams received deflated"""
+    wire_bytes: int = 0
+    """Bytes received, as sent by AniDB"""
+    payload_bytes: int = 0
+    """Bytes received, after inflating"""
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes compression kept off the wire"""
+        return self.payload_bytes - self.wire_bytes
+
+
+AniDBRow = tuple[str, ...]
+"""One line of an AniDB reply, split on ``|``"""
+
+
 @dataclass
 class AniDBResponse:
     """AniDB response dataclass"""
@@ -202,30 +235,42 @@ class AniDBResponse:
     """AniDB response tag"""
     additional_return_string: str | None = None
     """AniDB additional response string, usually session key"""
-    data: list[str | list[str]] = []
-    """AniDB response data"""
+    body: memoryview = field(default_factory=lambda: memoryview(b""), repr=False)
+    """Undecoded lines after the header, a view of the received reply"""
+
+    @cached_property
+    def data(self) -> list[AniDBRow]:
+        """AniDB response data, one row per line, decoded on first access"""
+        text = str(self.body, "utf-8", "replace")
+        if "\r" in text:
+            text = text.replace("\r", "")
+        return [tuple(line.split("|")) for line in text.split("\n") if line]
 
     @staticmethod
-    def from_string(data: str) -> "AniDBResponse":
+    def from_bytes(data: bytes) -> "AniDBResponse":
         """
-        Convert a string to a dataclass
+        Parse a reply as received, after inflating
 
-        :param data: String to convert
-        :type data: str
+        Only the header line is decoded here, the rest is kept as a view of
+        ``data`` and decoded if ``data`` is read.
+
+        :param data: Reply to parse
+        :type data: bytes
         :return: AniDB response dataclass
         :rtype: AniDBResponse
         """
-        procdat = data.split("\n")
-        header = procdat[0].split(" ")
-        retcode = 0
-        retstring = ""
+        view = memoryview(data)
+        newline = data.find(b"\n")
+        if newline == -1:
+            newline = len(data)
+        header = str(view[:newline], "utf-8", "replace").rstrip("\r").split(" ")
         tag = None
         additional_return_string = None
 
         if header[0].isdigit():
             retcode = int(header[0])
             retstring = " ".join(header[1:])
-        elif header[1].isdigit():
+        elif len(header) > 1 and header[1].isdigit():
             retcode = int(header[1])
             tag = header[0]
             if (
@@ -240,27 +285,26 @@ class AniDBResponse:
         else:
             raise ValueError(f"Invalid response header {header}")
 
-        retdatsplit: list[str | list[str]] = []
-
-        if len(procdat) > 1:
-            retdat = "`n".join(procdat[1:])
-            if "`n" in retdat:
-                retdat = retdat.split("`n")
-            retdatsplit = []
-            for i in range(len(retdat)):
-                if "|" in retdat[i]:
-                    retdatsplit.append(retdat[i].split("|"))
-        else:
-            retdatsplit = []
-
         return AniDBResponse(
             AniDBResponseCode(retcode),
             retstring,
             tag,
             additional_return_string,
-            retdatsplit,
+            view[newline + 1 :],
         )
 
+    @staticmethod
+    def from_string(data: str) -> "AniDBResponse":
+        """
+        Convert a string to a dataclass
+
+        :param data: String to convert
+        :type data: str
+        :return: AniDB response dataclass
+        :rtype: AniDBResponse
+        """
+        return AniDBResponse.from_bytes(data.encode("utf-8"))
+
 
 @dataclass
 class AniDBAuth:
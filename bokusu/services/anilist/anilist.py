@@ -1,30 +1,93 @@
-from json import dumps, loads
-from typing import Literal, TypedDict, Any
-import requests as req
-import aiohttp
+from asyncio import create_task, gather, sleep
+from contextlib import nullcontext
+from math import ceil
+from pathlib import Path
+from shutil import copyfileobj
+from tempfile import TemporaryDirectory, TemporaryFile
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterator,
+    Literal,
+    TypedDict,
+    TypeVar,
+)
+from aiohttp import ClientResponse, ClientSession
 from traceback import print_exc
 
-from bokusu.core.commons import read_resource
-from bokusu.core.secrets import (
-    ANILIST_USERNAME,
-    ANILIST_ACCESSTOKEN,
-    ANILIST_REFRESHTOKEN,
-    ANILIST_CLIENTID,
-    ANILIST_CLIENTSECRET,
-    ANILIST_REDIRECTURI,
-    ANILIST_EXPIRESIN,
-)
+from bokusu.core.codec import JsonPath, JsonStream, dumpb, dumps, loads
 from bokusu.core.folder import add_directory
+from bokusu.core.output import (
+    COMPRESS_SUFFIXES,
+    fsync_file,
+    replace_file,
+    run_io,
+    save_output,
+    write_file,
+    write_output,
+)
+from bokusu.core.resources import load_query
+from bokusu.core.scheduler import RateLimiter
+from bokusu.models.config import MalXmlSettings
+
+
+ANILIST_GRAPHQL = "https://graphql.anilist.co"
+"""AniList GraphQL endpoint"""
+
+PER_CHUNK_MAX = 500
+"""Maximum entries per MediaListCollection chunk allowed by AniList"""
+
+PER_PAGE_MAX = 50
+"""Maximum entries per Page allowed by AniList"""
 
+STREAM_BLOCK_SIZE = 1 << 16
+"""Bytes read at once when streaming a response to disk"""
 
-class GqlVariables(TypedDict):
+T = TypeVar("T")
+
+STATUS_LIST_NAMES: dict[str, dict[str, str]] = {
+    "anime": {
+        "CURRENT": "Watching",
+        "REPEATING": "Rewatching",
+        "COMPLETED": "Completed",
+        "PAUSED": "Paused",
+        "DROPPED": "Dropped",
+        "PLANNING": "Planning",
+    },
+    "manga": {
+        "CURRENT": "Reading",
+        "REPEATING": "Rereading",
+        "COMPLETED": "Completed",
+        "PAUSED": "Paused",
+        "DROPPED": "Dropped",
+        "PLANNING": "Planning",
+    },
+}
+"""Default AniList names of status lists, used when a list has to be created"""
+
+
+class AniListError(Exception):
+    """Exception raised when AniList returns GraphQL errors"""
+
+
+class GqlVariables(TypedDict, total=False):
     """GraphQL variables type"""
 
-    user: str
+    name: str
+    chunk: int
+    perChunk: int
+    withUser: bool
+    page: int
+    perPage: int
 
 
 def load_anilist_gql(
-    media_type: Literal["anime", "manga"], variables: GqlVariables
+    media_type: Literal["anime", "manga"],
+    variables: GqlVariables,
+    kind: Literal["query", "updates"] = "query",
 ) -> dict[str, str | GqlVariables]:
     """
     Load GraphQL variables and return the dict
@@ -33,59 +96,662 @@ def load_anilist_gql(
     :type media_type: Literal["anime", "manga"]
     :param variables: GraphQL variables
     :type variables: GqlVariables
+    :param kind: Full list query, or recently updated entries query
+    :type kind: Literal["query", "updates"] = "query"
 
     :return: GraphQL variables
     :rtype: dict[str, str | GqlVariables]
     """
 
-    # load gql file from module's directory (hikaru/anilist/{media_type}_query.gql)
-    gql_file = f"{media_type}_query.gql"
-    gql_content = read_resource(__name__, gql_file)
+    # minified query, read once per process (services/anilist/{media_type}_{kind}.gql),
+    # with the list entry fragment both kinds share
+    gql_content = load_query(
+        f"services/anilist/{media_type}_{kind}.gql",
+        f"services/anilist/{media_type}_entry.gql",
+    )
 
     # return the dict with query and variables keys
     return {"query": gql_content, "variables": variables}
 
 
-async def export_anilist(media_type: Literal["anime", "manga"]) -> tuple(
-    dict[str, Any] | None, bool
-):
+class _ListGroup:
+    """List group metadata and its spilled entries"""
+
+    def __init__(self, meta: dict[str, Any]):
+        self.meta = meta
+        self.file: IO[str] = TemporaryFile("w+", encoding="utf-8")
+        self.count = 0
+
+
+class ChunkMerger:
     """
-    Export list from AniList
+    Merge MediaListCollection chunks into a single export
+
+    A list group (e.g. "Watching") can be split over several chunks. Entries
+    of each group are spilled to a temporary file as chunks arrive, so memory
+    only holds the chunk being merged instead of the whole list.
+    """
+
+    def __init__(self):
+        self.groups: dict[tuple[str | None, bool], _ListGroup] = {}
+        self.user: dict[str, Any] | None = None
+        self.count = 0
+        self.media_ids: set[int] = set()
+        self.updated_at = 0
+
+    def __enter__(self) -> "ChunkMerger":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):  # type: ignore
+        for group in self.groups.values():
+            group.file.close()
+
+    def add(self, path: Path) -> bool:
+        """
+        Merge a chunk saved to disk, entries are decoded one at a time
+
+        Entries are grouped by the metadata of their list, which must come
+        before ``entries``. GraphQL responses keep the field order of the
+        query, and the queries select ``entries`` last.
+
+        :param path: Raw GraphQL response of the chunk
+        :type path: Path
+        :return: True if AniList has another chunk
+        :rtype: bool
+        :raises AniListError: If the response has errors, or list metadata
+            after its entries
+        """
+        has_next = False
+        current: str | int | None = None
+        meta: dict[str, Any] = {}
+        group: _ListGroup | None = None
+        with open(path, "r", encoding="utf-8") as file:
+            for where, value in JsonStream(file).walk(_descend_chunk):
+                if where[0] == "errors" and value:
+                    raise AniListError(value)
+                if where[:2] == ("data", "User") and value is not None:
+                    self.user = value
+                elif where[2:] == ("hasNextChunk",):
+                    has_next = bool(value)
+                if len(where) < 5:
+                    continue
+                if where[3] != current:
+                    current, meta, group = where[3], {}, None
+                if len(where) == 5:
+                    # list metadata, in query order so before the entries
+                    if where[4] != "entries":
+                        if group is not None:
+                            raise AniListError(
+                                f"List metadata {where[4]!r} came after its entries"
+                            )
+                        meta[where[4]] = value
+                else:
+                    if group is None:
+                        key = (meta.get("name"), bool(meta.get("isCustomList")))
+                        group = self.groups.get(key)
+                        if group is None:
+                            group = self.groups[key] = _ListGroup(meta)
+                    self._add_entry(group, value)
+        return has_next
+
+    def _add_entry(self, group: _ListGroup, entry: dict[str, Any]) -> None:
+        if group.count:
+            group.file.write(",")
+        group.file.write(dumps(entry))
+        group.count += 1
+        self.count += 1
+        self.media_ids.add(entry.get("mediaId"))
+        self.updated_at = max(self.updated_at, entry.get("updatedAt") or 0)
+
+    def write(self, fileobj: IO[str]) -> None:
+        """
+        Write the merged export, in the same shape as a single full response
+
+        :param fileobj: Text file to write to
+        :type fileobj: IO[str]
+        """
+        fileobj.write('{"data":{"MediaListCollection":{"hasNextChunk":false,"lists":[')
+        for index, group in enumerate(self.groups.values()):
+            if index:
+                fileobj.write(",")
+            meta = dumps(group.meta)[:-1]
+            fileobj.write(f'{meta},"entries":[' if group.meta else '{"entries":[')
+            group.file.seek(0)
+            copyfileobj(group.file, fileobj)
+            fileobj.write("]}")
+        fileobj.write(f']}},"User":{dumps(self.user)}}}}}')
+
+
+def _descend_chunk(path: JsonPath) -> bool:
+    """Walk a chunk down to single entries, see ``ChunkMerger.add``"""
+    depth = len(path)
+    if depth <= 1:
+        return path != ("errors",)
+    if path[:2] != ("data", "MediaListCollection"):
+        return False
+    # collection, lists, one list, its entries
+    return depth == 2 or (path[2] == "lists" and (depth in (3, 4) or path[4:] == ("entries",)))
+
+
+def iter_entries(path: str | Path) -> Iterator[dict[str, Any]]:
+    """
+    Iterate entries of an AniList export or chunk one at a time, without
+    decoding the whole file
+
+    An entry in several lists (e.g. a status list and custom lists) is
+    yielded once per list.
+
+    :param path: Path to the export
+    :type path: str | Path
+    :return: Iterator of MediaList entries
+    :rtype: Iterator[dict[str, Any]]
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for where, value in JsonStream(file).walk(_descend_chunk):
+            if len(where) == 6:
+                yield value
+
+
+async def _request(
+    session: ClientSession,
+    headers: dict[str, str],
+    query: dict[str, Any],
+    limiter: RateLimiter | None,
+    handle: Callable[[ClientResponse], Awaitable[T]],
+    retries: int = 3,
+) -> T:
+    """
+    Send a GraphQL request, waiting on HTTP 429 as told by AniList
+
+    :param session: Shared HTTP session
+    :type session: ClientSession
+    :param headers: Request headers
+    :type headers: dict[str, str]
+    :param query: GraphQL query and variables
+    :type query: dict[str, Any]
+    :param limiter: Rate limiter shared by AniList requests
+    :type limiter: RateLimiter | None
+    :param handle: Reads the successful response
+    :type handle: Callable[[ClientResponse], Awaitable[T]]
+    :param retries: Attempts when rate limited
+    :type retries: int = 3
+    :return: Value returned by ``handle``
+    :rtype: T
+    :raises AniListError: If AniList answers with an HTTP error
+    """
+    for attempt in range(retries):
+        async with limiter or nullcontext():
+            async with session.post(
+                ANILIST_GRAPHQL, headers=headers, data=dumpb(query)
+            ) as resp:
+                if resp.status == 429 and attempt < retries - 1:
+                    wait = float(resp.headers.get("Retry-After", 60))
+                elif resp.status >= 400:
+                    raise AniListError(f"HTTP {resp.status}: {await resp.text()}")
+                else:
+                    return await handle(resp)
+        await sleep(wait)
+    raise AniListError("Rate limited")
+
+
+async def _fetch_json(
+    session: ClientSession,
+    headers: dict[str, str],
+    query: dict[str, Any],
+    limiter: RateLimiter | None,
+) -> dict[str, Any]:
+    """
+    Fetch a small GraphQL response and decode it
+
+    :return: GraphQL ``data``
+    :rtype: dict[str, Any]
+    :raises AniListError: If AniList returns errors
+    """
+
+    async def handle(resp: ClientResponse) -> dict[str, Any]:
+        body = loads(await resp.read())
+        if body.get("errors"):
+            raise AniListError(body["errors"])
+        return body["data"]
+
+    return await _request(session, headers, query, limiter, handle)
+
+
+async def _fetch_to_file(
+    session: ClientSession,
+    headers: dict[str, str],
+    query: dict[str, Any],
+    limiter: RateLimiter | None,
+    path: Path,
+    fsync: bool = False,
+) -> Path:
+    """
+    Stream a GraphQL response to disk as is, without decoding it
+
+    :param fsync: Flush the file to disk, for a response kept as the export
+    :type fsync: bool
+    :return: Path of the raw response
+    :rtype: Path
+    """
+
+    async def handle(resp: ClientResponse) -> Path:
+        file = await run_io(open, path, "wb")
+        try:
+            async for block in resp.content.iter_chunked(STREAM_BLOCK_SIZE):
+                await run_io(file.write, block)
+            if fsync:
+                await run_io(fsync_file, file)
+        finally:
+            await run_io(file.close)
+        return path
+
+    return await _request(session, headers, query, limiter, handle)
+
+
+def _status_key(entry: dict[str, Any], split: bool) -> tuple[str, str | None]:
+    """Status list an entry belongs to, completed lists may be split by format"""
+    status = entry.get("status") or ""
+    if split and status == "COMPLETED":
+        return status, (entry.get("media") or {}).get("format")
+    return status, None
+
+
+def _custom_lists(entry: dict[str, Any]) -> set[str]:
+    """Names of custom lists an entry is in, anime uses the array form"""
+    lists = entry.get("customLists") or {}
+    if isinstance(lists, list):
+        return {lst["name"] for lst in lists if lst.get("enabled")}
+    return {name for name, enabled in lists.items() if enabled}
+
+
+def merge_updates(
+    snapshot: dict[str, Any],
+    updates: list[dict[str, Any]],
+    media_type: Literal["anime", "manga"],
+) -> dict[str, Any]:
+    """
+    Merge updated entries into a previous export, in place
+
+    An updated entry replaces the old one where it stays in the same list,
+    is removed from lists it left, and is put first in lists it joined.
+
+    :param snapshot: Previous export
+    :type snapshot: dict[str, Any]
+    :param updates: Entries updated since the previous export
+    :type updates: list[dict[str, Any]]
+    :param media_type: Media type of the export
+    :type media_type: Literal["anime", "manga"]
+    :return: The merged export
+    :rtype: dict[str, Any]
+    """
+    collection = snapshot["data"]["MediaListCollection"]
+    lists: list[dict[str, Any]] = collection["lists"]
+    split = any(lst.get("isSplitCompletedList") for lst in lists)
+    changed = {entry["mediaId"]: entry for entry in updates}
+
+    status_lists: dict[tuple[str, str | None], dict[str, Any]] = {}
+    custom_lists: dict[str, dict[str, Any]] = {}
+    for lst in lists:
+        if lst.get("isCustomList"):
+            custom_lists[lst["name"]] = lst
+        elif lst["entries"]:
+            status_lists.setdefault(_status_key(lst["entries"][0], split), lst)
+
+    def targets(entry: dict[str, Any]) -> list[dict[str, Any]]:
+        found: list[dict[str, Any]] = []
+        if not entry.get("hiddenFromStatusLists"):
+            key = _status_key(entry, split)
+            if key not in status_lists:
+                name = STATUS_LIST_NAMES[media_type].get(key[0], key[0].title())
+                status_lists[key] = {
+                    "name": f"{name} {key[1]}" if key[1] else name,
+                    "isCustomList": False,
+                    "isSplitCompletedList": key[1] is not None,
+                    "entries": [],
+                }
+                lists.append(status_lists[key])
+            found.append(status_lists[key])
+        for name in sorted(_custom_lists(entry)):
+            if name not in custom_lists:
+                custom_lists[name] = {
+                    "name": name,
+                    "isCustomList": True,
+                    "isSplitCompletedList": False,
+                    "entries": [],
+                }
+                lists.append(custom_lists[name])
+            found.append(custom_lists[name])
+        return found
+
+    placed = {media_id: targets(entry) for media_id, entry in changed.items()}
+    for lst in lists:
+        kept: list[dict[str, Any]] = []
+        for entry in lst["entries"]:
+            media_id = entry.get("mediaId")
+            if media_id not in changed:
+                kept.append(entry)
+            elif any(target is lst for target in placed[media_id]):
+                kept.append(changed[media_id])
+                placed[media_id] = [t for t in placed[media_id] if t is not lst]
+        lst["entries"] = kept
+    for media_id, entry in reversed(changed.items()):
+        for target in placed[media_id]:
+            target["entries"].insert(0, entry)
+
+    collection["lists"] = [lst for lst in lists if lst["entries"]]
+    return snapshot
+
+
+async def _fetch_updates(
+    session: ClientSession,
+    headers: dict[str, str],
+    media_type: Literal["anime", "manga"],
+    username: str,
+    since: int,
+    limiter: RateLimiter | None,
+) -> tuple[list[dict[str, Any]], int]:
+    """
+    Fetch entries updated at or after a watermark, newest first
+
+    :param session: Shared HTTP session
+    :type session: ClientSession
+    :param headers: Request headers
+    :type headers: dict[str, str]
     :param media_type: Media type target
     :type media_type: Literal["anime", "manga"]
-    :return: Exported list, True if successful, False if not
-    :rtype: tuple[dict[str, Any] | None, bool]
+    :param username: AniList username
+    :type username: str
+    :param since: ``updatedAt`` watermark, in UNIX timestamp
+    :type since: int
+    :param limiter: Rate limiter shared by AniList requests
+    :type limiter: RateLimiter | None
+    :return: Updated entries and the current entry count of the list
+    :rtype: tuple[list[dict[str, Any]], int]
     """
-    path = add_directory("backup", name="AniList")
-    """Path to save the exported list"""
+    gql = load_anilist_gql(media_type, {"name": username}, kind="updates")
+    updates: list[dict[str, Any]] = []
+    count = 0
+    page = 1
+    while True:
+        variables: GqlVariables = {"name": username, "page": page, "perPage": PER_PAGE_MAX}
+        data = await _fetch_json(
+            session, headers, {"query": gql["query"], "variables": variables}, limiter
+        )
+        if page == 1:
+            count = data["User"]["statistics"][media_type]["count"]
+        for entry in data["Page"]["mediaList"]:
+            # entries sharing the watermark second may not all be in the
+            # previous export, so they are fetched again
+            if (entry.get("updatedAt") or 0) < since:
+                return updates, count
+            updates.append(entry)
+        if not data["Page"]["pageInfo"]["hasNextPage"]:
+            return updates, count
+        page += 1
+
+
+async def _export_full(
+    session: ClientSession,
+    headers: dict[str, str],
+    media_type: Literal["anime", "manga"],
+    username: str,
+    target: Path,
+    limiter: RateLimiter | None,
+    per_chunk: int,
+    concurrency: int,
+    output: dict[str, Any],
+) -> dict[str, Any]:
+    """Export the whole list in chunks, returns the watermark state"""
+    gql = load_anilist_gql(media_type, {"name": username})
 
-    # create GraphQL variables
-    variables: GqlVariables = {
-        "user": ANILIST_USERNAME,
+    def chunk_query(chunk: int) -> dict[str, Any]:
+        variables: GqlVariables = {
+            "name": username,
+            "chunk": chunk,
+            "perChunk": per_chunk,
+            "withUser": chunk == 1,
+        }
+        return {"query": gql["query"], "variables": variables}
+
+    with ChunkMerger() as merger, TemporaryDirectory(
+        dir=target.parent, prefix=".anilist-"
+    ) as spool:
+        # responses are streamed to disk as is, and only decoded entry by entry
+        def fetch(num: int) -> Coroutine[Any, Any, Path]:
+            path = Path(spool) / f"chunk_{num}.json"
+            # a single first chunk is renamed to the export as is
+            return _fetch_to_file(
+                session, headers, chunk_query(num), limiter, path, fsync=num == 1
+            )
+
+        first = await fetch(1)
+        has_next = await run_io(merger.add, first)
+        # entry count lets us request the remaining chunks all at once
+        stats = ((merger.user or {}).get("statistics") or {}).get(media_type) or {}
+        total_chunks = ceil((stats.get("count") or 0) / per_chunk)
+        if not has_next:
+            # a single chunk already is the export, keep its bytes
+            if output.get("compress_to_gzip"):
+
+                def copy_first(out: IO[bytes]) -> None:
+                    with open(first, "rb") as chunk_file:
+                        copyfileobj(chunk_file, out)
+
+                await write_output(target, copy_first, **output)
+            else:
+                await run_io(replace_file, first, target)
+        chunk = 2
+        while has_next:
+            size = min(concurrency, max(1, total_chunks - chunk + 1))
+            tasks = [create_task(fetch(num)) for num in range(chunk, chunk + size)]
+            try:
+                results = await gather(*tasks)
+            except BaseException:
+                # stop the other fetches before the spool is deleted under them
+                for task in tasks:
+                    task.cancel()
+                await gather(*tasks, return_exceptions=True)
+                raise
+            for path in results:
+                has_next = await run_io(merger.add, path)
+                await run_io(path.unlink)
+            chunk += size
+            if not has_next:
+                await write_output(target, merger.write, "w", **output)
+    return {
+        "username": username,
+        "updatedAt": merger.updated_at,
+        "count": stats.get("count", len(merger.media_ids)),
     }
 
-    # create GraphQL variables dict
-    gql_variables = load_anilist_gql(media_type, variables)
-    """GraphQL variables dict"""
+
+def _apply_updates(
+    target: Path,
+    state: dict[str, Any],
+    updates: list[dict[str, Any]],
+    count: int,
+    media_type: Literal["anime", "manga"],
+    output: dict[str, Any],
+) -> dict[str, Any] | None:
+    """
+    Merge updated entries into the export on disk, blocking
+
+    :return: New watermark state, or None if a full export is needed
+    :rtype: dict[str, Any] | None
+    """
+    with open(target, "rb") as f:
+        snapshot = loads(f.read())
+    known = {
+        entry.get("mediaId")
+        for lst in snapshot["data"]["MediaListCollection"]["lists"]
+        for entry in lst["entries"]
+    }
+    added = len({entry["mediaId"] for entry in updates} - known)
+    # deleted entries never show up as updates, a count mismatch means
+    # something left the list and the snapshot has to be rebuilt
+    if state["count"] + added != count:
+        return None
+    if updates:
+        merge_updates(snapshot, updates, media_type)
+        user = snapshot["data"].get("User") or {}
+        user.setdefault("statistics", {}).setdefault(media_type, {})["count"] = count
+        save_output(target, dumpb(snapshot), **output)
+    updated_at = max([state["updatedAt"]] + [e.get("updatedAt") or 0 for e in updates])
+    return {"username": state["username"], "updatedAt": updated_at, "count": count}
+
+
+async def _export_incremental(
+    session: ClientSession,
+    headers: dict[str, str],
+    media_type: Literal["anime", "manga"],
+    username: str,
+    target: Path,
+    state: dict[str, Any],
+    limiter: RateLimiter | None,
+    output: dict[str, Any],
+) -> dict[str, Any] | None:
+    """
+    Merge entries updated since the last export into it
+
+    :return: New watermark state, or None if a full export is needed
+    :rtype: dict[str, Any] | None
+    """
+    updates, count = await _fetch_updates(
+        session, headers, media_type, username, state["updatedAt"], limiter
+    )
+    return await run_io(_apply_updates, target, state, updates, count, media_type, output)
+
+
+async def _viewer_name(
+    session: ClientSession,
+    headers: dict[str, str],
+    limiter: RateLimiter | None,
+) -> str:
+    """
+    Name of the user the access token belongs to
+
+    :return: AniList username
+    :rtype: str
+    :raises AniListError: If AniList returns errors
+    """
+    query = {"query": load_query("services/anilist/viewer.gql")}
+    data = await _fetch_json(session, headers, query, limiter)
+    return data["Viewer"]["name"]
+
+
+def _read_state(path: Path) -> dict[str, Any]:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+async def export_anilist(
+    media_type: Literal["anime", "manga"],
+    username: str | None,
+    access_token: str,
+    session: ClientSession,
+    user_agent: str | None = None,
+    profile: str = "default",
+    limiter: RateLimiter | None = None,
+    per_chunk: int = PER_CHUNK_MAX,
+    concurrency: int = 3,
+    incremental: bool = False,
+    malxml_settings: MalXmlSettings | None = None,
+) -> tuple[Path | None, bool]:
+    """
+    Export list from AniList
+
+    The list is fetched in chunks of ``per_chunk`` entries, ``concurrency``
+    chunks at a time within the rate limit, and merged to disk as they
+    arrive, so large lists stay under AniList's response limits.
+
+    With ``incremental``, only entries updated since the last successful
+    export are fetched, newest first, and merged into the previous export.
+    The watermark is kept next to the export in ``anilist_{media_type}.state.json``.
+    A full export is done instead when there is no previous export, the
+    username changed, or entries were deleted since. Exports are written as
+    ``malxml_settings.compress_to_gzip`` says; incremental merges read the
+    uncompressed JSON, so with a compressed copy only, every export is full.
+
+    :param media_type: Media type target
+    :type media_type: Literal["anime", "manga"]
+    :param username: AniList username, None for the owner of the access token
+    :type username: str | None
+    :param access_token: AniList access token
+    :type access_token: str
+    :param session: Shared HTTP session
+    :type session: ClientSession
+    :param user_agent: Override the session user agent
+    :type user_agent: str | None = None
+    :param profile: Profile name, used as the backup subdirectory
+    :type profile: str = "default"
+    :param limiter: Rate limiter shared by AniList requests
+    :type limiter: RateLimiter | None = None
+    :param per_chunk: Entries per chunk, at most 500
+    :type per_chunk: int = 500
+    :param concurrency: Chunks requested at once
+    :type concurrency: int = 3
+    :param incremental: Only fetch entries updated since the last export
+    :type incremental: bool = False
+    :param malxml_settings: Output and compression settings. Defaults to uncompressed JSON.
+    :type malxml_settings: MalXmlSettings | None = None
+    :return: Path of the exported list, the compressed copy if it is the only
+        one, True if successful, False if not
+    :rtype: tuple[Path | None, bool]
+    """
+    path = add_directory("backup", profile, name="AniList")
+    """Path to save the exported list"""
+
+    target = Path(path) / f"anilist_{media_type}.json"
+    state_path = Path(path) / f"anilist_{media_type}.state.json"
+    per_chunk = max(1, min(per_chunk, PER_CHUNK_MAX))
+    output = (malxml_settings or MalXmlSettings()).output_options()
 
     # create GraphQL headers
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json",
-        "Authorization": f"Bearer {ANILIST_ACCESSTOKEN}",
+        "Authorization": f"Bearer {access_token}",
     }
     """GraphQL headers"""
+    if user_agent:
+        headers["User-Agent"] = user_agent
 
     # export list
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://graphql.anilist.co", headers=headers, json=gql_variables
-            ) as export:
-                export_json = await export.json()
-                with open(f"{path}/anilist_{media_type}.json", "w") as f:
-                    f.write(dumps(export_json))
-                return export_json, True
+        if username is None:
+            username = await _viewer_name(session, headers, limiter)
+        state: dict[str, Any] | None = None
+        if incremental and target.is_file() and state_path.is_file():
+            previous = await run_io(_read_state, state_path)
+            if previous.get("username") == username:
+                state = await _export_incremental(
+                    session,
+                    headers,
+                    media_type,
+                    username,
+                    target,
+                    previous,
+                    limiter,
+                    output,
+                )
+        if state is None:
+            state = await _export_full(
+                session,
+                headers,
+                media_type,
+                username,
+                target,
+                limiter,
+                per_chunk,
+                concurrency,
+                output,
+            )
+        # the watermark only moves once the export is on disk
+        await write_file(state_path, dumps(state))
+        if not target.is_file():
+            suffix = COMPRESS_SUFFIXES[output["compress_format"]]
+            return target.with_name(target.name + suffix), True
+        return target, True
     except Exception as _:
         print_exc()
         return None, False
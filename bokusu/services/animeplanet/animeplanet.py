@@ -1,19 +1,42 @@
+from contextlib import nullcontext
 from typing import Literal
 from traceback import print_exc
 
-from bokusu.malscraper.client import MALScraper
+from aiohttp import ClientSession
+
+from bokusu.services.malscraper.client import MALScraper
 from bokusu.core.folder import add_directory
-from bokusu.core.secrets import ANIMEPLANET_USERNAME
+from bokusu.core.output import write_output
+from bokusu.core.scheduler import RateLimiter
+from bokusu.models.config import MalXmlSettings
 
 
 async def export_animeplanet(
     media_type: Literal["anime", "manga"],
+    username: str,
+    session: ClientSession,
+    user_agent: str | None = None,
+    profile: str = "default",
+    limiter: RateLimiter | None = None,
+    malxml_settings: MalXmlSettings | None = None,
 ) -> tuple[str | None, bool]:
     """
     Export list from Anime-Planet
 
     :param media_type: Media type target
     :type media_type: Literal["anime", "manga"]
+    :param username: Anime-Planet username
+    :type username: str
+    :param session: Shared HTTP session
+    :type session: ClientSession
+    :param user_agent: Override the session user agent
+    :type user_agent: str | None = None
+    :param profile: Profile name, used as the backup subdirectory
+    :type profile: str = "default"
+    :param limiter: Rate limiter shared by Anime-Planet requests
+    :type limiter: RateLimiter | None = None
+    :param malxml_settings: Output and compression settings. Defaults to uncompressed XML.
+    :type malxml_settings: MalXmlSettings | None = None
 
     :return: Exported list, True if successful, False if not
     :rtype: tuple[str, bool]
@@ -21,20 +44,23 @@ async def export_animeplanet(
     # create MAL-Scraper client
 
     # create directory for export
-    path = add_directory("backup", name="Anime-Planet")
+    path = add_directory("backup", profile, name="Anime-Planet")
 
     # export list
     try:
-        async with MALScraper() as client:
+        async with MALScraper(session, user_agent) as client, limiter or nullcontext():
             export = await client.export_list(
-                ANIMEPLANET_USERNAME,
+                username,
                 "animeplanet",
                 media_type,
             )
-        with open(f"{path}/{media_type}.xml", "w", encoding="utf-8") as file:
-            file.write(export)
+        await write_output(
+            f"{path}/{media_type}.xml",
+            export,
+            **(malxml_settings or MalXmlSettings()).output_options(),
+        )
         return export, True
 
     except Exception as _:
         print_exc()
-        return None, True
+        return None, False
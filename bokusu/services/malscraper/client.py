@@ -1,6 +1,5 @@
 from typing import Literal
 
-import requests as req
 import aiohttp
 
 from bokusu.core.const import USER_AGENT
@@ -9,15 +8,30 @@ from bokusu.core.const import USER_AGENT
 class MALScraper:
     """MAL-Scraper general client"""
 
-    def __init__(self):
-        """Initialize client"""
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None = None,
+        user_agent: str | None = None,
+    ):
+        """
+        Initialize client
+
+        :param session: Shared session, a private one is opened if not given
+        :type session: aiohttp.ClientSession | None = None
+        :param user_agent: Override the session user agent
+        :type user_agent: str | None = None
+        """
         self.base_url = "https://malscraper.azurewebsites.net"
-        self.user_agent = USER_AGENT
+        self.user_agent = user_agent or USER_AGENT
         self.origin = self.base_url
         self.referer = self.base_url + "/"
+        self.session = session
+        self._owns_session = session is None
 
     async def __aenter__(self):
         """Async enter"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
         return self
 
     def __enter__(self):
@@ -25,7 +39,10 @@ class MALScraper:
         raise RuntimeError("Use async with")
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        """Async exit"""
+        """Async exit, closes the session only if the client opened it"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
 
     async def export_list(
         self,
@@ -72,11 +89,15 @@ class MALScraper:
             "Origin": self.origin,
             "Referer": self.referer,
             "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": self.user_agent,
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/scrape", data=body, headers=headers
-            ) as post:
-                text = await post.text()
-                return text
+        if self.user_agent:
+            headers["User-Agent"] = self.user_agent
+        if self.session is None:
+            raise RuntimeError(
+                "Session is not initialized, have you init class with async context?"
+            )
+        async with self.session.post(
+            f"{self.base_url}/scrape", data=body, headers=headers
+        ) as post:
+            text = await post.text()
+            return text
@@ -9,7 +9,12 @@ from bokusu.core.const import USER_AGENT
 
 
 class WaybackClient:
-    """WaybackClient is a wrapper around WaybackPy to make it easier to use."""
+    """
+    WaybackClient is a wrapper around WaybackPy to make it easier to use.
+
+    It blocks while waiting between captures, async code should use
+    ``bokusu.services.wayback.submitter.WaybackSubmitter`` instead.
+    """
 
     def __init__(self):
         """Initialize client"""
@@ -0,0 +1,202 @@
+"""Persistent index of recently archived URLs, to skip redundant captures."""
+
+import sqlite3
+from datetime import datetime, timezone
+from hashlib import blake2b
+from math import ceil, log
+from pathlib import Path
+from time import time
+
+from bokusu.core.folder import get_box_root
+
+DEFAULT_CAPACITY = 100_000
+"""URLs the Bloom filter is sized for"""
+
+DEFAULT_ERROR_RATE = 0.01
+"""False positive rate of the Bloom filter at capacity"""
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """
+    Convert a Wayback timestamp to seconds since the epoch
+
+    :param timestamp: ``YYYYMMDDhhmmss`` timestamp, in UTC
+    :type timestamp: str
+    :return: Seconds since the epoch
+    :rtype: float
+    """
+    moment = datetime.strptime(timestamp[:14], "%Y%m%d%H%M%S")
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def format_timestamp(moment: float) -> str:
+    """
+    Convert seconds since the epoch to a Wayback timestamp
+
+    :param moment: Seconds since the epoch
+    :type moment: float
+    :return: ``YYYYMMDDhhmmss`` timestamp, in UTC
+    :rtype: str
+    """
+    return datetime.fromtimestamp(moment, timezone.utc).strftime("%Y%m%d%H%M%S")
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Answers "never seen" without false negatives, so most lookups of
+    unarchived URLs never reach the database.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        bits: bytes | None = None,
+    ):
+        """
+        Initialize an empty filter, or load a saved one
+
+        :param capacity: Items the filter is sized for
+        :type capacity: int
+        :param error_rate: False positive rate at capacity
+        :type error_rate: float
+        :param bits: Saved bit array of a filter of the same capacity
+        :type bits: bytes | None
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * log(2)))
+        nbytes = (self.size + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise ValueError("Saved Bloom filter does not match its size")
+        self.bits = bytearray(bits) if bits is not None else bytearray(nbytes)
+
+    def _positions(self, item: str) -> list[int]:
+        """Bit positions of an item, by double hashing"""
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        """
+        Add an item
+
+        :param item: Item to add
+        :type item: str
+        """
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class ArchiveIndex:
+    """
+    URLs captured by the Wayback Machine, with their last capture time
+
+    Stored in SQLite next to the other caches, with a Bloom filter checked
+    first. The filter is saved on close with the number of URLs it holds,
+    and rebuilt on open if the table no longer matches, e.g. after a crash.
+    """
+
+    def __init__(self, path: Path | str | None = None, capacity: int = DEFAULT_CAPACITY):
+        """
+        Open the index, creating the database if needed
+
+        :param path: Database path. Defaults to ``<box root>/cache/wayback.sqlite3``.
+        :type path: Path | str | None
+        :param capacity: URLs the Bloom filter is sized for, it is rebuilt when changed
+        :type capacity: int
+        """
+        if path is None:
+            path = get_box_root() / "cache" / "wayback.sqlite3"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS archived (url TEXT PRIMARY KEY, captured REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS bloom ("
+            "capacity INTEGER NOT NULL, count INTEGER NOT NULL, bits BLOB NOT NULL)"
+        )
+        self.db.commit()
+        (self.count,) = self.db.execute("SELECT count(*) FROM archived").fetchone()
+        row = self.db.execute(
+            "SELECT bits FROM bloom WHERE capacity = ? AND count = ?",
+            (capacity, self.count),
+        ).fetchone()
+        self._dirty = row is None
+        if row is not None:
+            self.bloom = BloomFilter(capacity, bits=row[0])
+        else:
+            self.bloom = BloomFilter(capacity)
+            for (url,) in self.db.execute("SELECT url FROM archived"):
+                self.bloom.add(url)
+
+    def close(self) -> None:
+        """Save the Bloom filter and close the database"""
+        if self._dirty:
+            self.db.execute("DELETE FROM bloom")
+            self.db.execute(
+                "INSERT INTO bloom (capacity, count, bits) VALUES (?, ?, ?)",
+                (self.bloom.capacity, self.count, bytes(self.bloom.bits)),
+            )
+            self.db.commit()
+            self._dirty = False
+        self.db.close()
+
+    def captured(self, url: str) -> float | None:
+        """
+        Last capture time of a URL
+
+        :param url: URL
+        :type url: str
+        :return: Seconds since the epoch, None if never recorded
+        :rtype: float | None
+        """
+        if url not in self.bloom:
+            return None
+        row = self.db.execute(
+            "SELECT captured FROM archived WHERE url = ?", (url,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, url: str, max_age: float) -> bool:
+        """
+        Whether a URL was captured less than ``max_age`` seconds ago
+
+        :param url: URL
+        :type url: str
+        :param max_age: Freshness window in seconds
+        :type max_age: float
+        :return: True if a new capture can be skipped
+        :rtype: bool
+        """
+        captured = self.captured(url)
+        return captured is not None and time() - captured < max_age
+
+    def record(self, url: str, captured: float | None = None) -> None:
+        """
+        Record a capture, keeping the most recent one
+
+        :param url: Captured URL
+        :type url: str
+        :param captured: Capture time in seconds since the epoch. Defaults to now.
+        :type captured: float | None
+        """
+        if self.captured(url) is None:
+            self.count += 1
+        self.db.execute(
+            "INSERT INTO archived (url, captured) VALUES (?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET captured = max(captured, excluded.captured)",
+            (url, captured if captured is not None else time()),
+        )
+        self.db.commit()
+        self.bloom.add(url)
+        self._dirty = True
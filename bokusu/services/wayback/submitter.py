@@ -0,0 +1,294 @@
+"""Asynchronous Wayback Machine capture queue, using the Save Page Now 2 API."""
+
+from asyncio import CancelledError, Queue, Task, create_task, gather, sleep
+from dataclasses import dataclass
+from time import monotonic, time
+from typing import Any, Literal
+from urllib.parse import urldefrag
+
+from aiohttp import ClientError, ClientSession
+
+from bokusu.core.codec import loads
+from bokusu.core.const import Status, pp
+from bokusu.core.scheduler import SERVICE_RATE_LIMITS, RateLimiter
+from bokusu.services.wayback.index import ArchiveIndex, format_timestamp, parse_timestamp
+
+WAYBACK_SAVE = "https://web.archive.org/save"
+"""Save Page Now 2 endpoint, captures are submitted here"""
+
+WAYBACK_STATUS = "https://web.archive.org/save/status"
+"""Capture job status endpoint"""
+
+WAYBACK_AVAILABLE = "https://archive.org/wayback/available"
+"""Availability API, returns the closest existing capture of a URL"""
+
+MAX_AGE = 24 * 3600.0
+"""Seconds a capture is recent enough to skip a new one"""
+
+RETRY_WAIT = 300.0
+"""Seconds before resubmitting a capture the Wayback Machine refused"""
+
+JobStatus = Literal["queued", "pending", "success", "skipped", "error"]
+"""State of a capture"""
+
+
+@dataclass
+class WaybackJob:
+    """A capture of one URL"""
+
+    url: str
+    """URL to capture"""
+    status: JobStatus = "queued"
+    """State of the capture"""
+    job_id: str | None = None
+    """Save Page Now job ID, once submitted"""
+    timestamp: str | None = None
+    """Wayback timestamp of the snapshot, once captured"""
+    error: str | None = None
+    """Reason of the failure"""
+    attempts: int = 0
+    """Submissions so far"""
+    max_age: float = MAX_AGE
+    """Seconds an existing capture is recent enough to skip this one"""
+    lookup: bool = False
+    """Ask the availability API for an existing capture before submitting"""
+
+    @property
+    def snapshot(self) -> str | None:
+        """URL of the snapshot, once captured"""
+        if self.timestamp is None:
+            return None
+        return f"https://web.archive.org/web/{self.timestamp}/{self.url}"
+
+
+class WaybackSubmitter:
+    """
+    Queue of Wayback Machine captures, shared by every service of a backup
+
+    URLs are deduplicated and submitted one at a time at the rate the
+    Wayback Machine allows; each submitted job is then polled on its own
+    task, so captures overlap. Refused submissions are retried after
+    ``retry_wait`` seconds on a timer, without holding up the queue or the
+    event loop.
+
+    With an ``index``, URLs captured within their freshness window are
+    skipped without any request, and successful captures are recorded.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        limiter: RateLimiter | None = None,
+        poll_interval: float = 5.0,
+        poll_timeout: float = 600.0,
+        retries: int = 1,
+        retry_wait: float = RETRY_WAIT,
+        access_key: str | None = None,
+        secret_key: str | None = None,
+        index: ArchiveIndex | None = None,
+    ):
+        """
+        Initialize the submitter, the worker starts on enter
+
+        :param session: HTTP session
+        :type session: ClientSession
+        :param limiter: Submission pacing. Defaults to the ``wayback`` rate limit.
+        :type limiter: RateLimiter | None
+        :param poll_interval: Seconds between two status checks of a job
+        :type poll_interval: float
+        :param poll_timeout: Seconds before giving up on a pending job
+        :type poll_timeout: float
+        :param retries: Resubmissions of a refused capture
+        :type retries: int
+        :param retry_wait: Seconds before resubmitting a refused capture
+        :type retry_wait: float
+        :param access_key: Internet Archive S3 access key, for higher limits
+        :type access_key: str | None
+        :param secret_key: Internet Archive S3 secret key
+        :type secret_key: str | None
+        :param index: Recently archived URLs, owned by the caller
+        :type index: ArchiveIndex | None
+        """
+        self.session = session
+        self.limiter = limiter or RateLimiter(SERVICE_RATE_LIMITS["wayback"])
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.retries = retries
+        self.retry_wait = retry_wait
+        self.headers = {"Accept": "application/json"}
+        if access_key and secret_key:
+            self.headers["Authorization"] = f"LOW {access_key}:{secret_key}"
+        self.index = index
+        self.jobs: dict[str, WaybackJob] = {}
+        self._queue: Queue[WaybackJob] = Queue()
+        self._tasks: set[Task[None]] = set()
+        self._worker: Task[None] | None = None
+
+    async def __aenter__(self) -> "WaybackSubmitter":
+        self._worker = create_task(self._work())
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:  # type: ignore
+        try:
+            if exc_type is None:
+                await self.join()
+        finally:
+            for task in [self._worker, *self._tasks]:
+                if task is not None:
+                    task.cancel()
+            await gather(*filter(None, [self._worker, *self._tasks]), return_exceptions=True)
+            self._worker = None
+
+    def submit(self, url: str, max_age: float = MAX_AGE, lookup: bool = False) -> WaybackJob:
+        """
+        Queue a URL, unless it already is or was captured recently
+
+        :param url: URL to capture
+        :type url: str
+        :param max_age: Seconds a capture is recent enough to skip a new one
+        :type max_age: float
+        :param lookup: Ask the availability API for an existing capture first
+        :type lookup: bool
+        :return: Capture of the URL, shared by every caller
+        :rtype: WaybackJob
+        """
+        url = urldefrag(url.strip())[0]
+        job = self.jobs.get(url)
+        if job is not None:
+            return job
+        job = self.jobs[url] = WaybackJob(url, max_age=max_age, lookup=lookup)
+        captured = self.index.captured(url) if self.index is not None else None
+        if captured is not None and time() - captured < max_age:
+            job.status = "skipped"
+            job.timestamp = format_timestamp(captured)
+        else:
+            self._queue.put_nowait(job)
+        return job
+
+    async def join(self) -> list[WaybackJob]:
+        """
+        Wait until every queued capture succeeded or failed
+
+        :return: Every capture
+        :rtype: list[WaybackJob]
+        """
+        while True:
+            await self._queue.join()
+            if not self._tasks:
+                return list(self.jobs.values())
+            await gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coro: Any) -> None:
+        task = create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _work(self) -> None:
+        """Submit queued captures, one per rate limit slot"""
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.lookup and job.attempts == 0 and await self._available(job):
+                    continue
+                await self.limiter.acquire()
+                await self._submit(job)
+            except CancelledError:
+                raise
+            except Exception as err:
+                self._fail(job, str(err))
+            finally:
+                self._queue.task_done()
+
+    async def _submit(self, job: WaybackJob) -> None:
+        """Start a capture, then poll it or schedule a retry"""
+        job.attempts += 1
+        async with self.session.post(
+            WAYBACK_SAVE, data={"url": job.url}, headers=self.headers
+        ) as resp:
+            body = await resp.read()
+            refused = resp.status == 429 or resp.status >= 500
+            if resp.status >= 400 and not refused:
+                self._fail(job, f"HTTP {resp.status}")
+                return
+        data = {} if refused else _json(body)
+        if refused or "job_id" not in data:
+            reason = f"HTTP {resp.status}" if refused else data.get("message", "no job ID")
+            if job.attempts > self.retries:
+                self._fail(job, reason)
+                return
+            pp.print(
+                Status.INFO,
+                f"Wayback refused {job.url} ({reason}), retrying in {self.retry_wait:.0f}s",
+            )
+            self._spawn(self._retry(job))
+            return
+        job.job_id = data["job_id"]
+        job.status = "pending"
+        self._spawn(self._poll(job))
+
+    async def _available(self, job: WaybackJob) -> bool:
+        """Skip a capture if the Wayback Machine has a recent enough one"""
+        try:
+            async with self.session.get(WAYBACK_AVAILABLE, params={"url": job.url}) as resp:
+                if resp.status != 200:
+                    return False
+                data = _json(await resp.read())
+        except ClientError:
+            return False
+        closest = (data.get("archived_snapshots") or {}).get("closest") or {}
+        timestamp = closest.get("timestamp")
+        if not closest.get("available") or not timestamp:
+            return False
+        captured = parse_timestamp(timestamp)
+        if self.index is not None:
+            self.index.record(job.url, captured)
+        if time() - captured >= job.max_age:
+            return False
+        job.status = "skipped"
+        job.timestamp = timestamp
+        return True
+
+    async def _retry(self, job: WaybackJob) -> None:
+        """Queue a refused capture again once ``retry_wait`` is over"""
+        await sleep(self.retry_wait)
+        self._queue.put_nowait(job)
+
+    async def _poll(self, job: WaybackJob) -> None:
+        """Check a submitted capture until it is done"""
+        deadline = monotonic() + self.poll_timeout
+        while monotonic() < deadline:
+            await sleep(self.poll_interval)
+            try:
+                async with self.session.get(
+                    f"{WAYBACK_STATUS}/{job.job_id}", headers=self.headers
+                ) as resp:
+                    if resp.status == 429 or resp.status >= 500:
+                        continue
+                    data = _json(await resp.read())
+            except ClientError:
+                continue
+            status = data.get("status")
+            if status == "success":
+                job.status = "success"
+                job.timestamp = data.get("timestamp") or format_timestamp(time())
+                if self.index is not None:
+                    self.index.record(job.url, parse_timestamp(job.timestamp))
+                return
+            if status == "error":
+                self._fail(job, data.get("message") or data.get("status_ext") or "error")
+                return
+        self._fail(job, f"still pending after {self.poll_timeout:.0f}s")
+
+    def _fail(self, job: WaybackJob, reason: str) -> None:
+        job.status = "error"
+        job.error = reason
+        pp.print(Status.ERROR, f"Wayback capture of {job.url} failed: {reason}")
+
+
+def _json(body: bytes) -> dict[str, Any]:
+    """Decode a JSON object, empty when the API answered with a page"""
+    try:
+        data = loads(body)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}